@@ -3,8 +3,55 @@ AI Foundry Agent Package
 
 This package provides a simple interface to interact with Azure AI Foundry agents
 through the Model Context Protocol (MCP).
+
+The public names are imported from their modules on first access, so importing the
+package, or only its configuration, does not load the Azure SDK.
 """
 
-from .agent import invoke_agent
+import importlib
+from typing import TYPE_CHECKING
+
+# Module defining each public name
+_EXPORTS = {
+    'AgentConfig': '.config',
+    'AgentConfigError': '.config',
+    'AgentNotFoundError': '.config',
+    'AgentSession': '.agent',
+    'AsyncAgentSession': '.aio',
+    'AsyncRunSteps': '.run_steps',
+    'RunSteps': '.run_steps',
+    'close_sessions': '.agent',
+    'close_sessions_async': '.aio',
+    'get_run_steps': '.agent',
+    'invoke_agent': '.agent',
+    'invoke_agent_async': '.aio',
+    'invoke_agents_batch': '.batch',
+    'load_agent_config': '.config',
+    'metrics_snapshot': '.metrics',
+    'reload_config': '.config',
+    'render_metrics': '.metrics',
+    'reset_metrics': '.metrics',
+    'stream_agent': '.agent',
+}
+
+__all__ = sorted(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .agent import AgentSession, close_sessions, get_run_steps, invoke_agent, stream_agent
+    from .aio import AsyncAgentSession, close_sessions_async, invoke_agent_async
+    from .batch import invoke_agents_batch
+    from .config import AgentConfig, AgentConfigError, AgentNotFoundError, load_agent_config, reload_config
+    from .metrics import metrics_snapshot, render_metrics, reset_metrics
+    from .run_steps import AsyncRunSteps, RunSteps
+
+def __getattr__(name):
+    """Import a public name from its module on first access"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-__all__ = ['invoke_agent']
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -5,303 +5,372 @@ This package exposes the necessary methods to interact with Azure AI Foundry age
 through the Model Context Protocol (MCP).
 """
 
-import os, time
-import yaml
+import atexit
+import concurrent.futures
+import contextvars
 import logging
-from dotenv import load_dotenv
+import time
+import threading
 from azure.ai.projects import AIProjectClient
 from azure.identity import DefaultAzureCredential
 from azure.ai.agents.models import (
+    AgentStreamEvent,
     ListSortOrder,
     McpTool,
     RequiredMcpToolCall,
     RunStepActivityDetails,
     SubmitToolApprovalAction,
+    ThreadMessageOptions,
     ToolApproval,
+    ToolSet,
 )
+from .agent_index import _config_hash, _get_index
+from .agent_pool import AgentPool
+from .approvals import ApprovalMemo, _decide_tool_calls
+from .config import RESPONSE_MODES, _load_config
+from .conversation import ConversationTracker, _summary_text
+from .history import ThreadHistory
+from .logger import _log_message, _update_log_context, log_context
+from .metrics import _count, _timed, _timed_turn, _turn_timing_results
+from .rate_limit import _rate_limited_client
+from .response_cache import _cache_key, _cacheable, _cached_results, _create_response_cache, _seed_messages
+from .run_steps import RunSteps, _should_log_run_steps
+from .single_flight import SingleFlight, SingleFlightCredential
+from .tool_catalog import _learning_tools, _narrowing_due, _record_tool_calls, _select_tools, _validate_allowed_tools
 
-# Global variables to store configuration
-config = None
-agent_name = None
-mcp_server_url = None
-mcp_server_label = None
-allowed_tools = None
-agent_instructions = None
-approval_mode = None
-logging_enabled = None
-log_path = None
-delete_agent_after_run = None
-ignore_existing_agent = None
-model_deployment_name = None
-project_endpoint = None
-auth_token = None
-logging_initialized = False
-
-def _load_config(input_agent_name):
-    """Load configuration from YAML file and environment variables"""
-    global config, agent_name, agent_description, mcp_server_url, mcp_server_label, allowed_tools
-    global agent_instructions, approval_mode, logging_enabled, log_path
-    global delete_agent_after_run, ignore_existing_agent, model_deployment_name, project_endpoint
-    global auth_token, logging_initialized
-    
-    # Get the directory where this script is located
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+# Stream events that carry the updated run
+_RUN_EVENTS = {
+    AgentStreamEvent.THREAD_RUN_CREATED,
+    AgentStreamEvent.THREAD_RUN_QUEUED,
+    AgentStreamEvent.THREAD_RUN_IN_PROGRESS,
+    AgentStreamEvent.THREAD_RUN_REQUIRES_ACTION,
+    AgentStreamEvent.THREAD_RUN_COMPLETED,
+    AgentStreamEvent.THREAD_RUN_INCOMPLETE,
+    AgentStreamEvent.THREAD_RUN_FAILED,
+    AgentStreamEvent.THREAD_RUN_CANCELLING,
+    AgentStreamEvent.THREAD_RUN_CANCELLED,
+    AgentStreamEvent.THREAD_RUN_EXPIRED,
+}
+
+def _mcp_tools_init(config, tool_selection=None):
+    """Initialize the agent MCP tools, one per MCP server of the configuration"""
+    mcp_tools = ToolSet()
+    for server in config.mcp_servers:
+        # The tool catalog can narrow the tools of servers whose Allowed_Tools is empty
+        allowed_tools = tool_selection.allowed_tools.get(server.label, server.allowed_tools) if tool_selection else server.allowed_tools
+        mcp_tool = McpTool(
+            server_label=server.label,
+            server_url=server.url,
+            allowed_tools=list(allowed_tools), # Empty list means all tools are allowed
+        )
+
+        mcp_tool.set_approval_mode(server.approval_mode) # Set approval mode: "always", "never", "on_request"
 
-    # Load environment variables from ai_foundry.env file in the script directory
-    load_dotenv(os.path.join(script_dir, 'ai_foundry.env'))
+        if server.auth_token:
+            mcp_tool.update_headers("Authorization", f"Bearer {server.auth_token}") # Adding the Authentication Header, e.g. the Snowflake PAT
 
-    # Get AI Foundry Configuration from environment variables
-    model_deployment_name = os.getenv("MODEL_DEPLOYMENT_NAME")
-    project_endpoint = os.getenv("PROJECT_ENDPOINT")
+        mcp_tools.add(mcp_tool)
+        _log_message(config, f"Initialized MCP Tool {mcp_tool}")
+
+    return mcp_tools
+
+def _mcp_headers(mcp_tools):
+    """Headers of each MCP server by server label, sent with the approvals of its tool calls"""
+    return {resource.server_label: resource.headers for resource in mcp_tools.resources.mcp or ()}
+
+def _project_init(config, tool_selection=None):
+    """Initialize AI Project Client and MCP Tools"""
+    with _timed(config, "project_init"):
+        # Initialize AI Project Client, concurrent first requests share one token request
+        project_client = AIProjectClient(
+            endpoint=config.project_endpoint,
+            credential=SingleFlightCredential(DefaultAzureCredential()),
+        )
+
+        # Initialize agent MCP tools
+        mcp_tools = _mcp_tools_init(config, tool_selection)
+
+    return project_client, mcp_tools
+
+def _find_existing_agent(agents_client, config, agent_index):
+    """
+    Find the agent by name, returns the agent and the config hash it was created with.
+
+    The agent index is checked first with a single get_agent call, listing all agents is
+    only needed when the agent is not indexed or the indexed agent no longer exists.
+    """
+    entry = agent_index.get(config.project_endpoint, config.agent_name)
+    if entry:
+        agent_id, config_hash = entry
+        try:
+            agent = agents_client.get_agent(agent_id)
+            if agent.name == config.agent_name:
+                return agent, config_hash
+        except Exception as e:
+            _log_message(config, f"Indexed agent ID: {agent_id} not found: {e}", level=logging.WARNING)
+        agent_index.invalidate(config.project_endpoint, config.agent_name)
 
-    # Load agent configuration from YAML file
     try:
-        # Look for agent_config.yaml in the same directory as this script
-        config_file_path = os.path.join(script_dir, 'agent_config.yaml')
-        with open(config_file_path, 'r') as config_file:
-            agent_config = yaml.safe_load(config_file)
-    except FileNotFoundError:
-        print(f"Error: agent_config.yaml file not found at {config_file_path}")
-        print("Please ensure agent_config.yaml exists in the same directory as agent.py")
-        exit(1)
-    except yaml.YAMLError as e:
-        print(f"Error parsing YAML file: {e}")
-        exit(1)
-
-    # Get the specified agent configuration
-    agent_name = input_agent_name
-    if agent_name not in agent_config:
-        available_agents = list(agent_config.keys())
-        print(f"Error: Agent '{agent_name}' not found in configuration.")
-        print(f"Available agents: {available_agents}")
-        exit(1)
-    config = agent_config[agent_name]
-
-    # Get Agent Configuration from agent_config.yaml
-    mcp_server_url = config.get("MCP_Server_URL")
-    mcp_server_label = config.get("MCP_Server_Label")
-    allowed_tools = config.get("Allowed_Tools", [])
-    agent_description = config.get("Agent_Description", "")
-    agent_instructions = config.get("Agent_Instruction")
-    approval_mode = config.get("Approval_Mode", "never")
-    logging_enabled = config.get("Logging", True)
-    log_path = config.get("Log_Path", "logs/agent_logs.txt")
-    delete_agent_after_run = config.get("Delete_Agent_After_Run", False)
-    ignore_existing_agent = config.get("Ignore_Existing_Agent", False)
-    auth_token = config.get("Auth_Token", "")
-    logging_initialized = False  # Reset logging flag for new config
-
-def _log_message(message):
-    """Setup logging function"""
-    global logging_initialized
-    if logging_enabled:
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        with open(log_path, 'a', encoding='utf-8') as log_file:
-            # Only write the "Starting Logging" message once
-            if not logging_initialized:
-                log_file.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - Starting Logging for Agent {agent_name}\n")
-                logging_initialized = True
-            log_file.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')} - {message}\n")
-    else:
-        print(message)
-
-def _project_init():
-    """Initialize AI Project Client and MCP Tool"""
-    # Initialize AI Project Client
-    project_client = AIProjectClient(
-        endpoint=project_endpoint,
-        credential=DefaultAzureCredential(),
-    )
+        existing_agents = agents_client.list_agents()
 
-    # Initialize agent MCP tool
-    mcp_tool = McpTool(
-        server_label=mcp_server_label,
-        server_url=mcp_server_url,
-        allowed_tools=allowed_tools, # Empty list means all tools are allowed
-    )
+        for agent_item in existing_agents:
+            if agent_item.name == config.agent_name: # Check by name and not ID.
+                return agent_item, (agent_item.metadata or {}).get("config_hash")
+    except Exception as e:
+        _log_message(config, f"Error listing agents: {e}", level=logging.ERROR)
+    return None, None
 
-    mcp_tool.set_approval_mode(approval_mode) # Set approval mode: "always", "never", "on_request"
+def _agent_create(agents_client, mcp_tools, config, config_hash=None):
+    """Create a new agent for the configuration"""
+    agent = agents_client.create_agent(
+        model=config.model_deployment_name,
+        name=config.agent_name,
+        description=config.agent_description,
+        instructions=config.agent_instructions,
+        tools=mcp_tools.definitions,
+        metadata={"config_hash": config_hash or _config_hash(config, mcp_tools)},
+    )
+    _log_message(config, f"Created new agent, Name: {config.agent_name} ID: {agent.id}")
+    return agent
 
-    if auth_token:
-        mcp_tool.update_headers("Authorization", f"Bearer {auth_token}") # Adding the Authentication Header for Snowflake PAT
-    
-    _log_message(f"Initialized MCP Tool {mcp_tool}")
+# Concurrent initializations of the same agent configuration, from one session or several,
+# share one lookup and creation
+_agent_init_flight = SingleFlight("agent_init")
 
-    return project_client, mcp_tool
+def _shared_agent_init(agents_client, mcp_tools, config):
+    """Initialize the agent, or wait for the initialization of the same configuration in flight"""
+    key = (config.project_endpoint, config.agent_name, _config_hash(config, mcp_tools))
+    return _agent_init_flight.do(key, _agent_init, agents_client, mcp_tools, config)
 
-def _agent_init(agents_client, mcp_tool):
+def _agent_init(agents_client, mcp_tools, config):
     """Check for existing agent and create agent if needed"""
-    # Check if agent with the same name already exists (unless ignoring existing agents)
-    existing_agent = None
+    with _timed(config, "agent_init"):
+        config_hash = _config_hash(config, mcp_tools)
+        agent_index = _get_index(config.agent_index_path)
+
+        # Check if agent with the same name already exists (unless ignoring existing agents)
+        existing_agent = None
+        existing_hash = None
     
-    # Only check for existing agents if not ignoring existing agents
-    if not ignore_existing_agent:
-        try:
-            existing_agents = agents_client.list_agents()
-            
-            for agent_item in existing_agents:
-                if agent_item.name == agent_name: # Check by name and not ID.
-                    existing_agent = agent_item
-                    break
-        except Exception as e:
-            _log_message(f"Error listing agents: {e}")
-            existing_agent = None
-    else:
-        _log_message("Ignoring existing agents - will create new agent")
+        # Only check for existing agents if not ignoring existing agents
+        if not config.ignore_existing_agent:
+            existing_agent, existing_hash = _find_existing_agent(agents_client, config, agent_index)
+        else:
+            _log_message(config, "Ignoring existing agents - will create new agent")
     
-    # Use existing agent if found and not ignoring existing agents
-    if existing_agent and not ignore_existing_agent:
-        agent = existing_agent
-        _log_message(f"Using existing agent, Name: {agent_name} ID: {agent.id}")
-    else:
-        # Create a new agent.
-        agent = agents_client.create_agent(
-            model=model_deployment_name,
-            name=agent_name,
-            description=agent_description,
-            instructions=agent_instructions,
-            tools=mcp_tool.definitions,
-        )
-        _log_message(f"Created new agent, Name: {agent_name} ID: {agent.id}")
-    _log_message(f"MCP Server: {mcp_tool.server_label} at {mcp_tool.server_url}")
+        # Use existing agent if found and not ignoring existing agents
+        if existing_agent and existing_hash == config_hash:
+            agent = existing_agent
+            _log_message(config, f"Using existing agent, Name: {config.agent_name} ID: {agent.id}")
+        elif existing_agent:
+            # Bring the existing agent in line with the current configuration
+            agent = agents_client.update_agent(
+                agent_id=existing_agent.id,
+                model=config.model_deployment_name,
+                description=config.agent_description,
+                instructions=config.agent_instructions,
+                tools=mcp_tools.definitions,
+                metadata={"config_hash": config_hash},
+            )
+            _log_message(config, f"Updated existing agent to current configuration, Name: {config.agent_name} ID: {agent.id}")
+        else:
+            agent = _agent_create(agents_client, mcp_tools, config, config_hash)
+
+        # Remember the agent so the next lookup by name is a single get_agent call
+        if not config.ignore_existing_agent:
+            agent_index.put(config.project_endpoint, config.agent_name, agent.id, config_hash)
+        for server in config.mcp_servers:
+            _log_message(config, f"MCP Server: {server.label} at {server.url}")
     
-    return agent
+        return agent
 
-def _agent_run(agents_client, agent, mcp_tool, user_message, agent_name, thread_id=None):
-    """Create threads, pass messages, handle approvals, and return conversation results"""
+def _tool_approvals(config, mcp_tools, tool_calls, thread_id=None, approval_memo=None):
+    """Decide the MCP tool calls of a run with the agent's approval policy, returns the approvals to submit"""
+    mcp_calls = [tool_call for tool_call in tool_calls if isinstance(tool_call, RequiredMcpToolCall)]
+    with _timed(config, "approval_policy"):
+        decisions = _decide_tool_calls(config, mcp_calls, thread_id, approval_memo)
 
-    # Create or get thread for communication
-    if thread_id:    
-        try:
-            # Use existing thread if provided
-            thread = agents_client.threads.get(thread_id=thread_id)
-            _log_message(f"Using existing thread, ID: {thread.id}. Details: {thread}")
-        except Exception as e:
-            _log_message(f"Error fetching thread {thread_id}: {e}")
-    else:
-        # Create thread for communication
-        try:
-            thread = agents_client.threads.create()
-            _log_message(f"Created thread, ID: {thread.id}")
-        except Exception as e:
-            _log_message(f"Error creating thread: {e}")
+    headers = _mcp_headers(mcp_tools)
+    tool_approvals = []
+    for tool_call, approve, reason in decisions:
+        _log_message(config, f"{'Approved' if approve else 'Declined'} tool call {tool_call.name} ID: {tool_call.id} ({reason})")
+        _count("ai_foundry_agent_tool_approvals_total", agent=config.agent_name, decision="approved" if approve else "declined")
+        tool_approvals.append(
+            ToolApproval(
+                tool_call_id=tool_call.id,
+                approve=approve,
+                headers=headers.get(tool_call.server_label, {}),
+            )
+        )
+    return tool_approvals
 
-    # Create message to thread
-    try:
-        message = agents_client.messages.create(
+def _handle_tool_approvals(agents_client, thread, run, mcp_tools, config, event_handler=None, approval_memo=None):
+    """
+    Decide the pending tool calls of a run and submit the decisions in one batch, returns False if the run was cancelled instead.
+
+    When the run is streamed, the approvals are submitted to the stream's event handler.
+    """
+    tool_calls = run.required_action.submit_tool_approval.tool_calls
+    if not tool_calls:
+        _log_message(config, "No tool calls provided - cancelling run")
+        agents_client.runs.cancel(
             thread_id=thread.id,
-            role="user",
-            content=user_message,
+            run_id=run.id
         )
-        _log_message(f"Created message, ID: {message.id}")
-    except Exception as e:
-        _log_message(f"Error creating message: {e}")
+        return False
+    _log_message(config, f"Run requires action - {len(tool_calls)} tool calls to approve")
 
-    # Create and process agent run in thread with MCP tools
-    try:
-        _log_message(f"Starting run for agent ID: {agent.id} in thread ID: {thread.id}")
-        run = agents_client.runs.create(
+    tool_approvals = _tool_approvals(config, mcp_tools, tool_calls, thread.id, approval_memo)
+    if tool_approvals and event_handler is not None:
+        agents_client.runs.submit_tool_outputs_stream(
             thread_id=thread.id,
-            agent_id=agent.id,
-            tool_resources=mcp_tool.resources
+            run_id=run.id,
+            tool_approvals=tool_approvals,
+            event_handler=event_handler
         )
-        _log_message(f"Created run, ID: {run.id}")
-    except Exception as e:
-        _log_message(f"Error creating run: {e}")
-
-    # Poll for run status and handle tool approvals if needed
-    while run.status in ["queued", "in_progress", "requires_action"]:
-        time.sleep(1)
-        run = agents_client.runs.get(
+    elif tool_approvals:
+        agents_client.runs.submit_tool_outputs(
             thread_id=thread.id,
-            run_id=run.id
+            run_id=run.id,
+            tool_approvals=tool_approvals
         )
+    return True
+
+def _poll_run(agents_client, thread, run, mcp_tools, config, approval_memo=None):
+    """Poll for run status with the agent's poll strategy and handle tool approvals if needed"""
+    intervals = config.poll_strategy.intervals()
+    while run.status in ["queued", "in_progress", "requires_action"]:
+        with _timed(config, "poll"):
+            time.sleep(next(intervals))
+            run = agents_client.runs.get(
+                thread_id=thread.id,
+                run_id=run.id
+            )
 
         # Handle Tools Approvals and Terminate if no tool calls   
         if run.status == "requires_action" and isinstance(run.required_action, SubmitToolApprovalAction):
-            tool_calls = run.required_action.submit_tool_approval.tool_calls
-            if not tool_calls:
-                _log_message("No tool calls provided - cancelling run")
-                agents_client.runs.cancel(
-                    thread_id=thread.id,
-                    run_id=run.id
-                )
+            with _timed(config, "approvals"):
+                approved = _handle_tool_approvals(agents_client, thread, run, mcp_tools, config,
+                                                  approval_memo=approval_memo)
+            if not approved:
                 break
-            _log_message(f"Run requires action - {len(tool_calls)} tool calls to approve")
-            # Auto-approve all tool calls for this example, implement your own approval logic if needed
-            tool_approvals = []
-            for tool_call in tool_calls:
-                if isinstance(tool_call, RequiredMcpToolCall):
-                    try:
-                        _log_message(f"Approving tool call: {tool_call}")
-                        tool_approvals.append(
-                            ToolApproval(
-                                tool_call_id=tool_call.id,
-                                approve=True,
-                                headers=mcp_tool.headers,
-                        )
-                        )
-                    except Exception as e:
-                        _log_message(f"Error approving tool_call {tool_call.id}: {e}")
-
-            _log_message(f"tool_approvals: {tool_approvals}")
-            if tool_approvals:
-                agents_client.runs.submit_tool_outputs(
-                    thread_id=thread.id,
-                    run_id=run.id,
-                    tool_approvals=tool_approvals
-                )
+            # The run picks up again right after the approval, so start polling quickly again
+            intervals = config.poll_strategy.intervals()
 
-        _log_message(f"Current run status: {run.status}")
+        _log_message(config, f"Current run status: {run.status}")
+    return run
 
-    _log_message(f"Run completed with status: {run.status}")
-    if run.status == "failed":
-        _log_message(f"Run failed: {run.last_error}")
+def _tool_call_event(call, status):
+    """Describe an MCP tool call of a run as a stream event"""
+    return {
+        "type": "tool_call",
+        "status": status,
+        "id": call.get("id"),
+        "name": call.get("name"),
+        "server_label": call.get("server_label"),
+        "arguments": call.get("arguments"),
+        "output": call.get("output"),
+    }
 
-    # Display run steps and tool calls
-    run_steps = agents_client.run_steps.list(
-        thread_id=thread.id,
-        run_id=run.id
-    )
+def _stream_events(agents_client, thread, agent, mcp_tools, config, approval_memo=None):
+    """
+    Create the run as a stream and yield its events until it ends, handling tool approvals if needed.
+
+    Yields run status, tool call, text delta and error events as dicts. Returns the final
+    run and the messages it completed, so they don't have to be listed again.
+    """
+    run = None
+    run_messages = []
+    # The run is followed in the poll phase, which with stream_agent includes the time the caller takes per event
+    with _timed(config, "poll"):
+        with agents_client.runs.stream(
+            thread_id=thread.id,
+            agent_id=agent.id,
+            tool_resources=mcp_tools.resources
+        ) as stream:
+            for event_type, event_data, _ in stream:
+                if event_type in _RUN_EVENTS:
+                    if run is None:
+                        _update_log_context(run_id=event_data.id)
+                        _log_message(config, f"Created run, ID: {event_data.id}")
+                    run = event_data
+                    _log_message(config, f"Current run status: {run.status}")
+                    yield {"type": "run_status", "run_id": run.id, "status": getattr(run.status, "value", run.status)}
+
+                    # Handle Tools Approvals and Terminate if no tool calls
+                    if run.status == "requires_action" and isinstance(run.required_action, SubmitToolApprovalAction):
+                        for call in run.required_action.submit_tool_approval.tool_calls or ():
+                            yield _tool_call_event(call, "requires_approval")
+                        with _timed(config, "approvals"):
+                            approved = _handle_tool_approvals(agents_client, thread, run, mcp_tools, config,
+                                                              event_handler=stream, approval_memo=approval_memo)
+                        if not approved:
+                            break
+                elif event_type == AgentStreamEvent.THREAD_RUN_STEP_COMPLETED:
+                    for call in event_data.get("step_details", {}).get("tool_calls", []):
+                        yield _tool_call_event(call, "completed")
+                elif event_type == AgentStreamEvent.THREAD_MESSAGE_DELTA:
+                    if event_data.text:
+                        yield {"type": "text", "delta": event_data.text}
+                elif event_type == AgentStreamEvent.THREAD_MESSAGE_COMPLETED:
+                    run_messages.append(event_data)
+                elif event_type == AgentStreamEvent.ERROR:
+                    _log_message(config, f"Run stream error: {event_data}", level=logging.ERROR)
+                    yield {"type": "error", "message": str(event_data)}
+                elif event_type == AgentStreamEvent.DONE:
+                    break
+    if run is None:
+        # Without a run event there is no run ID to poll the run with
+        raise RuntimeError(f"Run stream in thread ID: {thread.id} closed before the run was created")
+    return run, run_messages
 
+def _stream_run(agents_client, thread, agent, mcp_tools, config, approval_memo=None):
+    """Create the run as a stream and follow it until it ends, returns the run and the messages it completed"""
+    events = _stream_events(agents_client, thread, agent, mcp_tools, config, approval_memo)
+    while True:
+        try:
+            next(events)
+        except StopIteration as finished:
+            return finished.value
+
+def _log_run_steps(config, run_steps):
+    """Log the run steps and the tool calls they made"""
     # Loop through each step
     for step in run_steps:
-        _log_message(f"Step {step['id']} status: {step['status']}")
+        _log_message(config, f"Step {step['id']} status: {step['status']}")
 
         # Check if there are tool calls in the step details
         step_details = step.get("step_details", {})
         tool_calls = step_details.get("tool_calls", [])
 
         if tool_calls:
-            _log_message("  MCP Tool calls:")
+            _log_message(config, "  MCP Tool calls:")
             for call in tool_calls:
-                _log_message(f"    Tool Call ID: {call.get('id')}")
-                _log_message(f"    Name: {call.get('name')}")
-                _log_message(f"    Type: {call.get('type')}")
+                _log_message(config, f"    Tool Call ID: {call.get('id')}")
+                _log_message(config, f"    Name: {call.get('name')}")
+                _log_message(config, f"    Type: {call.get('type')}")
         if isinstance(step_details, RunStepActivityDetails):
             for activity in step_details.activities:
                 for function_name, function_definition in activity.tools.items():
                     _log_message(
+                        config,
                         f'  The function {function_name} with description "{function_definition.description}" will be called.:'
                     )
                     if len(function_definition.parameters) > 0:
-                        _log_message("  Function parameters:")
+                        _log_message(config, "  Function parameters:")
                         for argument, func_argument in function_definition.parameters.properties.items():
-                            _log_message(f"      {argument}")
-                            _log_message(f"      Type: {func_argument.type}")
-                            _log_message(f"      Description: {func_argument.description}")
+                            _log_message(config, f"      {argument}")
+                            _log_message(config, f"      Type: {func_argument.type}")
+                            _log_message(config, f"      Description: {func_argument.description}")
                     else:
-                        _log_message("This function has no parameters")
+                        _log_message(config, "This function has no parameters")
 
-        _log_message("")  # add an extra newline between steps
+        _log_message(config, "")  # add an extra newline between steps
 
-    # Fetch and return all messages
-    messages = agents_client.messages.list(
-        thread_id=thread.id, 
-        order=ListSortOrder.ASCENDING
-        )
-    _log_message("Conversation:")
-    _log_message("-" * 50)
+def _conversation_results(config, messages):
+    """Convert thread messages into the role/content list returned to callers"""
+    _log_message(config, "Conversation:")
+    _log_message(config, "-" * 50)
     
     conversation_results = []
     for msg in messages:
@@ -311,67 +380,675 @@ def _agent_run(agents_client, agent, mcp_tool, user_message, agent_name, thread_
             content = last_text.text.value
             conversation_results.append({"role": role, "content": content})
     
-    _log_message(f"response: {conversation_results}")
-    
+    _log_message(config, f"response: {conversation_results}")
+    return conversation_results
+
+def _previous_results(history, thread_id, response_mode):
+    """Return the conversation results already known for the thread, None if they have to be fetched"""
+    if history is None or response_mode != "full":
+        return None
+    return history.get(thread_id)
+
+def _merge_results(previous_results, turn_results, response_mode):
+    """Build the response from the known history and the results of the current turn"""
+    if response_mode == "delta":
+        return turn_results
+    return list(previous_results or ()) + turn_results
+
+def _remember_results(history, thread_id, conversation_results, response_mode):
+    """Keep the full conversation of the thread so the next turn only fetches its own messages"""
+    if history is None:
+        return
+    if response_mode == "full":
+        history.put(thread_id, tuple(conversation_results))
+    else:
+        # A delta does not extend the known history, fetch the thread in full next time
+        history.discard(thread_id)
+
+def _start_turn(agents_client, user_message, config, thread_id=None):
+    """Create or get the thread and add the user message, returns the thread and the message"""
+    with _timed(config, "create"):
+        # Create or get thread for communication
+        if thread_id:    
+            try:
+                # Use existing thread if provided
+                thread = agents_client.threads.get(thread_id=thread_id)
+                _update_log_context(thread_id=thread.id)
+                _log_message(config, f"Using existing thread, ID: {thread.id}. Details: {thread}")
+            except Exception as e:
+                _log_message(config, f"Error fetching thread {thread_id}: {e}", level=logging.ERROR)
+                raise
+        else:
+            # Create thread for communication
+            try:
+                thread = agents_client.threads.create()
+                _update_log_context(thread_id=thread.id)
+                _log_message(config, f"Created thread, ID: {thread.id}")
+            except Exception as e:
+                _log_message(config, f"Error creating thread: {e}", level=logging.ERROR)
+                raise
+
+        # Create message to thread
+        try:
+            message = agents_client.messages.create(
+                thread_id=thread.id,
+                role="user",
+                content=user_message,
+            )
+            _log_message(config, f"Created message, ID: {message.id}")
+        except Exception as e:
+            _log_message(config, f"Error creating message: {e}", level=logging.ERROR)
+            raise
+
+    return thread, message
+
+def _run_usage(run):
+    """Token usage of the run as a dict, None if the service reported none"""
+    usage = getattr(run, "usage", None)
+    if not usage:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+def _finish_turn(agents_client, agent, thread, message, run, user_message, config, thread_id=None,
+                 response_mode=None, history=None, run_messages=None):
+    """
+    Log the finished run and build the conversation results of the turn.
+
+    With response_mode "full" the response holds the whole thread, built from the history
+    cached for the thread plus the messages of this run. With "delta" it holds only the
+    user message and the messages created by this run. Messages already received from a
+    run stream are passed as run_messages and not listed again.
+    """
+    _log_message(config, f"Run completed with status: {run.status}")
+    if run.status == "failed":
+        _log_message(config, f"Run failed: {run.last_error}", level=logging.ERROR)
+
+    # Log run steps and tool calls for the runs selected by Run_Steps, listing them is an extra request
+    run_steps = None
+    if _should_log_run_steps(config, run):
+        run_steps = RunSteps(agents_client, thread.id, run.id)
+        with _timed(config, "steps"):
+            _log_run_steps(config, run_steps)
+    # Count the tool calls of the agent's first runs for the tool catalog to narrow its tools
+    if _learning_tools(config):
+        with _timed(config, "steps"):
+            _record_tool_calls(config, run_steps or RunSteps(agents_client, thread.id, run.id))
+    _count("ai_foundry_agent_runs_total", agent=config.agent_name, status=getattr(run.status, "value", run.status))
+
+    # Fetch the messages of the turn, or the whole thread if its history is not known yet
+    response_mode = response_mode or config.response_mode
+    if response_mode not in RESPONSE_MODES:
+        raise ValueError(f"Unknown response mode '{response_mode}', expected one of: {', '.join(RESPONSE_MODES)}")
+    previous_results = _previous_results(history, thread.id, response_mode)
+    with _timed(config, "messages"):
+        if response_mode == "full" and previous_results is None and thread_id:
+            messages = agents_client.messages.list(
+                thread_id=thread.id, 
+                order=ListSortOrder.ASCENDING
+                )
+            conversation_results = _conversation_results(config, messages)
+        else:
+            if run_messages is None:
+                run_messages = agents_client.messages.list(
+                    thread_id=thread.id,
+                    run_id=run.id,
+                    order=ListSortOrder.ASCENDING
+                    )
+            turn_results = [{"role": "USER", "content": user_message}] + _conversation_results(config, run_messages)
+            conversation_results = _merge_results(previous_results, turn_results, response_mode)
+    _remember_results(history, thread.id, conversation_results, response_mode)
+
     # Return in the specified JSON format with metadata
     return {
-        "agent_name": agent_name,
+        "agent_name": config.agent_name,
         "agent_id": agent.id,
         "thread_id": thread.id,
         "message_id": message.id,
-        "response": conversation_results
+        "run_id": run.id,
+        "response": conversation_results,
+        "usage": _run_usage(run),
+        "cached": False,
+        "timings": _turn_timing_results()
     }
 
-def _agent_delete(agents_client, agent, thread_id):
-    """Delete the agent"""
+def _agent_run(agents_client, agent, mcp_tools, user_message, config, thread_id=None, response_mode=None, history=None,
+               approval_memo=None):
+    """Create threads, pass messages, handle approvals, and return conversation results"""
+    thread, message = _start_turn(agents_client, user_message, config, thread_id)
+
+    # Create and process agent run in thread with MCP tools
+    run_messages = None
     try:
-        agents_client.threads.delete(thread_id=thread_id) # Delete the thread first
-        _log_message(f"Deleted thread ID: {thread_id}")   
-        agents_client.delete_agent(agent_id=agent.id)
-        _log_message(f"Deleted agent ID: {agent.id}")
+        _log_message(config, f"Starting run for agent ID: {agent.id} in thread ID: {thread.id}")
+        if config.poll_strategy.streaming:
+            run, streamed_messages = _stream_run(agents_client, thread, agent, mcp_tools, config, approval_memo)
+            # Use the streamed messages unless the stream ended before the run completed
+            if run.status == "completed":
+                run_messages = streamed_messages
+        else:
+            with _timed(config, "create"):
+                run = agents_client.runs.create(
+                    thread_id=thread.id,
+                    agent_id=agent.id,
+                    tool_resources=mcp_tools.resources
+                )
+            _update_log_context(run_id=run.id)
+            _log_message(config, f"Created run, ID: {run.id}")
+    except Exception as e:
+        _log_message(config, f"Error creating run: {e}", level=logging.ERROR)
+        raise
+
+    # Poll for run status and handle tool approvals if needed
+    if not config.poll_strategy.streaming:
+        run = _poll_run(agents_client, thread, run, mcp_tools, config, approval_memo)
+
+    return _finish_turn(agents_client, agent, thread, message, run, user_message, config, thread_id,
+                        response_mode=response_mode, history=history, run_messages=run_messages)
+
+def _agent_stream(agents_client, agent, mcp_tools, user_message, config, thread_id=None, response_mode=None, history=None,
+                  approval_memo=None):
+    """Run the turn as a stream, yielding its events and finally a result event with the conversation results"""
+    thread, message = _start_turn(agents_client, user_message, config, thread_id)
+    yield {"type": "thread", "thread_id": thread.id, "message_id": message.id}
+
+    _log_message(config, f"Starting run for agent ID: {agent.id} in thread ID: {thread.id}")
+    run, streamed_messages = yield from _stream_events(agents_client, thread, agent, mcp_tools, config, approval_memo)
+
+    results = _finish_turn(agents_client, agent, thread, message, run, user_message, config, thread_id,
+                           response_mode=response_mode, history=history,
+                           run_messages=streamed_messages if run.status == "completed" else None)
+    yield {"type": "result", "result": results}
+
+def _rollover_thread(agents_client, agent, mcp_tools, config, thread_id, conversations, approval_memo=None):
+    """Continue the conversation of the thread in a new thread seeded with a summary or its last turns, returns its ID"""
+    policy = config.conversation
+    summary = None
+    rollover_tokens = 0
+    if policy.rollover == "summary":
+        # Ask the agent for the summary while it still sees the whole thread
+        results = _agent_run(agents_client, agent, mcp_tools, policy.summary_prompt, config, thread_id,
+                             response_mode="delta", approval_memo=approval_memo)
+        summary = _summary_text(results)
+        rollover_tokens = (results["usage"] or {}).get("total_tokens", 0)
+    seed = conversations.seed_messages(thread_id, summary)
+    with _timed(config, "rollover"):
+        thread = agents_client.threads.create(
+            messages=[ThreadMessageOptions(role=role, content=content) for role, content in seed]
+        )
+    conversations.rolled_over(thread_id, thread.id, seed, rollover_tokens)
+    _count("ai_foundry_agent_conversation_rollovers_total", agent=config.agent_name, mode=policy.rollover)
+    _log_message(config, f"Rolled conversation over from thread ID: {thread_id} to thread ID: {thread.id} with {len(seed)} messages")
+    return thread.id
+
+def _seed_cached_thread(agents_client, config, user_message, cached):
+    """Create the thread a cached turn continues in, seeded with the question and the cached answer, returns its ID"""
+    if config.delete_agent_after_run:
+        # No thread is kept after the turn
+        return None
+    with _timed(config, "create"):
+        thread = agents_client.threads.create(
+            messages=[ThreadMessageOptions(role=role, content=content)
+                      for role, content in _seed_messages(user_message, cached)]
+        )
+    _update_log_context(thread_id=thread.id)
+    _log_message(config, f"Created thread seeded with the cached response, ID: {thread.id}")
+    return thread.id
+
+def _forget_agent(config, agent):
+    """Drop a deleted agent from the agent index"""
+    agent_index = _get_index(config.agent_index_path)
+    entry = agent_index.get(config.project_endpoint, config.agent_name)
+    if entry and entry[0] == agent.id:
+        agent_index.invalidate(config.project_endpoint, config.agent_name)
+
+def _thread_delete(agents_client, thread_id, config):
+    """Delete the thread of a turn whose agent is returned to the pool"""
+    try:
+        with _timed(config, "thread_delete", turn=False):
+            agents_client.threads.delete(thread_id=thread_id)
+        _log_message(config, f"Deleted thread ID: {thread_id}")
         return True
     except Exception as e:
-        _log_message(f"Error deleting thread {thread_id} agent {agent.id}: {e}")
+        _log_message(config, f"Error deleting thread {thread_id}: {e}", level=logging.ERROR)
         return False
 
-def _run_agent_with_message(agent_name, user_message, thread_id=None):
+def _agent_delete(agents_client, agent, thread_id, config):
+    """Delete the agent, and its thread if given"""
+    try:
+        with _timed(config, "agent_delete", turn=False):
+            if thread_id:
+                agents_client.threads.delete(thread_id=thread_id) # Delete the thread first
+                _log_message(config, f"Deleted thread ID: {thread_id}")
+            agents_client.delete_agent(agent_id=agent.id)
+        _log_message(config, f"Deleted agent ID: {agent.id}")
+        _forget_agent(config, agent)
+        return True
+    except Exception as e:
+        _log_message(config, f"Error deleting thread {thread_id} agent {agent.id}: {e}", level=logging.ERROR)
+        return False
+
+class AgentSession:
+    """
+    Long-lived session for a single agent configuration.
+
+    The project client (and with it the credential token cache and HTTP connection pool),
+    the MCP tools and the resolved agent are created once and reused across invocations.
+    Sessions are safe to share between threads.
+    """
+
+    def __init__(self, agent_name):
+        self.agent_name = agent_name
+        self.config = _load_config(agent_name)
+        self.agent = None
+        self.history = ThreadHistory()
+        self.approval_memo = ApprovalMemo()
+        self._agent_lock = threading.Lock()
+
+        # Turns in progress, so a session replaced after a config reload is closed once idle
+        self._active_turns = 0
+        self._idle = threading.Condition()
+
+        # Tools exposed per MCP server, when the agent has a Tool_Catalog, after checking Allowed_Tools against it
+        _validate_allowed_tools(self.config)
+        self.tool_selection = _select_tools(self.config)
+
+        # Initialize project and MCP tools
+        self.project_client, self.mcp_tools = _project_init(self.config, self.tool_selection)
+        # Calls to the service are queued and retried by the limiter shared by the sessions of the project
+        self.agents_client = _rate_limited_client(self.project_client.agents, self.config)
+
+        # Results of repeated questions, when the agent has a Response_Cache
+        self.response_cache = _create_response_cache(self.config.response_cache)
+        self._config_hash = _config_hash(self.config, self.mcp_tools) if self.response_cache else None
+
+        # Turns, messages and tokens per thread, when the agent has a Conversation budget
+        self.conversations = ConversationTracker(self.config.conversation) if self.config.conversation else None
+
+        # Deleting threads and agents after a turn happens off the request path
+        self._cleanup_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix=f"agent-cleanup-{agent_name}"
+        )
+
+        # Warm agents leased per turn instead of creating and deleting one per message
+        self.agent_pool = None
+        if self.config.delete_agent_after_run and self.config.agent_pool_size > 0:
+            self.agent_pool = AgentPool(
+                self.config,
+                create_agent=lambda: _agent_create(self.agents_client, self.mcp_tools, self.config),
+                delete_agent=lambda agent: _agent_delete(self.agents_client, agent, None, self.config),
+                submit=self._cleanup,
+            )
+            self.agent_pool.fill()
+
+    def _cleanup(self, function, *args):
+        """Run cleanup work in the background, keeping the log context of the turn"""
+        context = contextvars.copy_context()
+        try:
+            self._cleanup_executor.submit(context.run, function, *args)
+        except RuntimeError:
+            # The session is closing, clean up inline
+            context.run(function, *args)
+
+    def _get_agent(self):
+        """Return the session agent, initializing or getting the existing agent on first use"""
+        with self._agent_lock:
+            if self.agent is not None:
+                return self.agent
+        # Not under the session lock, so concurrent callers share the initialization and its failure
+        agent = _shared_agent_init(self.agents_client, self.mcp_tools, self.config)
+        with self._agent_lock:
+            if self.agent is None:
+                self.agent = agent
+            return self.agent
+
+    def _reset_agent(self, agent):
+        """Forget the session agent so the next turn resolves it again"""
+        with self._agent_lock:
+            if self.agent is agent:
+                self.agent = None
+
+    def _lease_agent(self):
+        """Return the agent for a turn: leased from the pool, private to the turn or shared by the session"""
+        if self.agent_pool:
+            return self.agent_pool.lease()
+        if self.config.delete_agent_after_run:
+            # A fresh agent, as an existing one could still be deleted by the cleanup of an earlier turn
+            with _timed(self.config, "agent_init"):
+                return _agent_create(self.agents_client, self.mcp_tools, self.config)
+        return self._get_agent()
+
+    def _end_turn(self, agent, thread_id=None, failed=False):
+        """Return or delete the agent of a finished turn, deleting its thread in the background if configured"""
+        config = self.config
+        if config.delete_agent_after_run:
+            self.history.discard(thread_id)
+            self.approval_memo.discard(thread_id)
+            if self.conversations:
+                self.conversations.discard(thread_id)
+            if self.agent_pool:
+                self.agent_pool.release(agent, reuse=not failed)
+                if thread_id:
+                    self._cleanup(_thread_delete, self.agents_client, thread_id, config)
+            else:
+                self._cleanup(_agent_delete, self.agents_client, agent, thread_id, config)
+        elif failed:
+            # Resolve the agent again on the next turn in case it no longer exists
+            self._reset_agent(agent)
+
+    def _cached_response(self, user_message, thread_id):
+        """Return the cache key of a turn starting a new thread and the cached results if any, (None, None) otherwise"""
+        if self.response_cache is None or thread_id:
+            return None, None
+        cache_key = _cache_key(self._config_hash, user_message)
+        with _timed(self.config, "cache"):
+            cached = self.response_cache.get(cache_key)
+        _count("ai_foundry_agent_response_cache_total", agent=self.config.agent_name,
+               result="miss" if cached is None else "hit")
+        if cached is not None:
+            _log_message(self.config, "Serving cached response")
+            thread_id = _seed_cached_thread(self.agents_client, self.config, user_message, cached)
+            return cache_key, {**_cached_results(cached, thread_id), "timings": _turn_timing_results()}
+        return cache_key, None
+
+    def _cache_response(self, cache_key, conversation_results):
+        """Cache the results of an answered turn that started a new thread"""
+        if cache_key and _cacheable(conversation_results):
+            self.response_cache.put(cache_key, conversation_results)
+
+    def _conversation_thread(self, agent, thread_id):
+        """Thread the turn continues the conversation in, rolling it over to a new thread when over budget"""
+        if self.conversations is None or not thread_id:
+            return thread_id
+        thread_id = self.conversations.resolve(thread_id)
+        if self.conversations.needs_rollover(thread_id):
+            thread_id = _rollover_thread(self.agents_client, agent, self.mcp_tools, self.config, thread_id,
+                                         self.conversations, self.approval_memo)
+        return thread_id
+
+    def _track_conversation(self, conversation_results):
+        """Count the turn against the budget of its thread and add the conversation stats to its results"""
+        if self.conversations is None or self.config.delete_agent_after_run:
+            return
+        thread_id = conversation_results["thread_id"]
+        saved = self.conversations.record_turn(thread_id, conversation_results)
+        if saved:
+            _count("ai_foundry_agent_conversation_tokens_saved_total", saved, agent=self.config.agent_name)
+        conversation_results["conversation"] = self.conversations.stats(thread_id)
+
+    def _track_tools(self, conversation_results):
+        """Add the tool catalog stats of the turn to its results, narrowing the tools once enough runs were counted"""
+        selection = self.tool_selection
+        if selection is None:
+            return
+        if selection.tokens_saved:
+            _count("ai_foundry_agent_tool_schema_tokens_saved_total", selection.tokens_saved, agent=self.config.agent_name)
+        conversation_results["tool_catalog"] = selection.stats()
+        if _narrowing_due(self.config, selection):
+            self._narrow_tools()
+
+    def _narrow_tools(self):
+        """Expose only the tools the agent called, the next turn updates the agent to the narrowed tools"""
+        tool_selection = _select_tools(self.config)
+        mcp_tools = _mcp_tools_init(self.config, tool_selection)
+        with self._agent_lock:
+            if not _narrowing_due(self.config, self.tool_selection):
+                return
+            self.tool_selection, self.mcp_tools = tool_selection, mcp_tools
+            self.agent = None
+        if self.response_cache:
+            self._config_hash = _config_hash(self.config, mcp_tools)
+
+    def _turn_started(self):
+        """Count a turn in progress"""
+        with self._idle:
+            self._active_turns += 1
+
+    def _turn_finished(self):
+        """Count a finished turn, waking close_when_idle when it was the last"""
+        with self._idle:
+            self._active_turns -= 1
+            self._idle.notify_all()
+
+    def close_when_idle(self, timeout=None):
+        """Close the session once its turns in progress finished, or after the timeout in seconds"""
+        with self._idle:
+            self._idle.wait_for(lambda: self._active_turns == 0, timeout)
+        self.close()
+
+    def invoke(self, user_message, thread_id=None, response_mode=None) -> dict:
+        """Run a single turn against the agent, reusing the session's client and agent"""
+        self._turn_started()
+        try:
+            return self._invoke_turn(user_message, thread_id, response_mode)
+        finally:
+            self._turn_finished()
+
+    def _invoke_turn(self, user_message, thread_id, response_mode):
+        """Turn behind invoke"""
+        # Scope the thread and run IDs attached to log lines, and the timings, to this turn
+        with log_context(), _timed_turn(self.config):
+            # Serve repeated questions from the response cache
+            cache_key, cached = self._cached_response(user_message, thread_id)
+            if cached is not None:
+                return cached
+
+            agent = self._lease_agent()
+            try:
+                thread_id = self._conversation_thread(agent, thread_id)
+
+                # Run the agent with the user message
+                conversation_results = _agent_run(
+                    self.agents_client, agent, self.mcp_tools, user_message, self.config, thread_id,
+                    response_mode=response_mode, history=self.history, approval_memo=self.approval_memo
+                )
+            except Exception:
+                self._end_turn(agent, failed=True)
+                raise
+
+            self._end_turn(agent, conversation_results.get("thread_id"))
+            self._track_conversation(conversation_results)
+            self._track_tools(conversation_results)
+            self._cache_response(cache_key, conversation_results)
+            return conversation_results
+
+    def stream(self, user_message, thread_id=None, response_mode=None):
+        """
+        Run a single turn with run streaming, yielding its events as they happen.
+
+        Events are dicts with a "type": "thread", "run_status", "tool_call", "text" (an
+        assistant text delta), "error" and finally "result", whose "result" is the dict
+        invoke would have returned.
+        """
+        # Counted from the call, as the events are only produced once the caller reads them
+        self._turn_started()
+        return self._stream_events(user_message, thread_id, response_mode)
+
+    def _stream_events(self, user_message, thread_id, response_mode):
+        """Events of the turn behind stream, ending the turn when the caller stops reading"""
+        # Each step runs in the turn's own context, so its log IDs don't leak into the caller's
+        context = contextvars.copy_context()
+        events = self._stream_turn(user_message, thread_id, response_mode)
+        try:
+            while True:
+                try:
+                    event = context.run(next, events)
+                except StopIteration:
+                    return
+                yield event
+        finally:
+            context.run(events.close)
+            self._turn_finished()
+
+    def _stream_turn(self, user_message, thread_id, response_mode):
+        """Generator behind stream, which returns the agent when the turn ends or the caller stops reading"""
+        with log_context(), _timed_turn(self.config):
+            # Serve repeated questions from the response cache, as a single text event per answer
+            cache_key, cached = self._cached_response(user_message, thread_id)
+            if cached is not None:
+                if cached["thread_id"]:
+                    yield {"type": "thread", "thread_id": cached["thread_id"], "message_id": None}
+                for message in cached["response"]:
+                    if message.get("role") == "ASSISTANT":
+                        yield {"type": "text", "delta": message.get("content", "")}
+                yield {"type": "result", "result": cached}
+                return
+
+            agent = self._lease_agent()
+            turn_thread_id = None
+            failed = False
+            try:
+                thread_id = self._conversation_thread(agent, thread_id)
+                for event in _agent_stream(
+                    self.agents_client, agent, self.mcp_tools, user_message, self.config, thread_id,
+                    response_mode=response_mode, history=self.history, approval_memo=self.approval_memo
+                ):
+                    if event["type"] == "thread":
+                        turn_thread_id = event["thread_id"]
+                    elif event["type"] == "result":
+                        self._track_conversation(event["result"])
+                        self._track_tools(event["result"])
+                        self._cache_response(cache_key, event["result"])
+                    yield event
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self._end_turn(agent, turn_thread_id, failed=failed)
+
+    def warm(self):
+        """Resolve the session agent, or start filling the agent pool, so the first turn doesn't pay for it"""
+        if self.agent_pool:
+            self.agent_pool.fill()
+        elif not self.config.delete_agent_after_run:
+            self._get_agent()
+
+    def resolve_thread(self, thread_id):
+        """Return the thread the conversation of the thread ID continues in, after any rollovers"""
+        if self.conversations is None or not thread_id:
+            return thread_id
+        return self.conversations.resolve(thread_id)
+
+    def run_steps(self, thread_id, run_id):
+        """Return a handle on the steps of a run, listed from the service only when iterated"""
+        return RunSteps(self.agents_client, thread_id, run_id)
+
+    def close(self):
+        """Delete the pooled agents, wait for pending cleanup, close the response cache and the underlying project client"""
+        if self.agent_pool:
+            for agent in self.agent_pool.close():
+                self._cleanup(_agent_delete, self.agents_client, agent, None, self.config)
+        self._cleanup_executor.shutdown(wait=True)
+        if self.response_cache:
+            self.response_cache.close()
+        self.project_client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Sessions cached per agent name, used by invoke_agent
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# Concurrent first calls for an agent share one session, sessions of different agents are created in parallel
+_session_flight = SingleFlight("session")
+
+# Longest a session replaced after a config reload waits for its turns before it is closed anyway
+_RETIRE_TIMEOUT = 600.0
+
+def _get_session(agent_name):
+    """Return the cached session for the agent name, creating it on first use or after its configuration changed"""
+    config = _load_config(agent_name)
+    with _sessions_lock:
+        session = _sessions.get(agent_name)
+    if session is None or session.config is not config:
+        session = _session_flight.do(agent_name, _create_session, agent_name, config)
+    return session
+
+def _create_session(agent_name, config):
+    """Create and cache the session for the agent name unless a call that just finished did"""
+    with _sessions_lock:
+        session = _sessions.get(agent_name)
+    if session is not None and session.config is config:
+        return session
+    new_session = AgentSession(agent_name)
+    with _sessions_lock:
+        _sessions[agent_name] = new_session
+    if session is not None:
+        # Rebuilt for the new configuration, the old session finishes its turns in progress
+        _log_message(config, f"Configuration of agent {agent_name} changed, replacing its session")
+        threading.Thread(target=session.close_when_idle, args=(_RETIRE_TIMEOUT,), daemon=True,
+                         name=f"agent-retire-{agent_name}").start()
+    return new_session
+
+def close_sessions():
+    """Close and drop all cached agent sessions"""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+# Pooled agents live on the service until their session is closed, so close the cached sessions on exit
+atexit.register(close_sessions)
+
+def _run_agent_with_message(agent_name, user_message, thread_id=None, response_mode=None):
     """Main function to run the complete agent workflow with a custom message"""
-    # Load configuration
-    _load_config(agent_name)
-    
-    # Initialize project and MCP tool
-    project_client, mcp_tool = _project_init()
-    
-    # Create agent with MCP tool and process agent run
-    with project_client:
-        agents_client = project_client.agents
-        
-        # Initialize or get existing agent
-        agent = _agent_init(agents_client, mcp_tool)
-        
-        # Run the agent with the user message
-        conversation_results = _agent_run(agents_client, agent, mcp_tool, user_message, agent_name, thread_id)
-        
-        # Delete the agent after run if set to True
-        if delete_agent_after_run:
-            _agent_delete(agents_client, agent, conversation_results.get("thread_id"))
-        
-        return conversation_results
+    return _get_session(agent_name).invoke(user_message, thread_id, response_mode=response_mode)
 
-def invoke_agent(agent_name, user_message, thread_id=None) -> dict:
+def invoke_agent(agent_name, user_message, thread_id=None, response_mode=None) -> dict:
     """
     Public method to invoke the agent with the specified agent name and user message.
     
     Args:
         agent_name (str): The name of the agent configuration to use
         user_message (str): The message to send to the agent
+        thread_id (str, optional): Existing thread to continue the conversation in
+        response_mode (str, optional): "full" for the whole thread or "delta" for only this turn,
+            defaults to the agent's Response_Mode
         
     Returns:
         JSON Response
     """
-    results = _run_agent_with_message(agent_name, user_message, thread_id)
+    results = _run_agent_with_message(agent_name, user_message, thread_id, response_mode)
     return results
 
+def stream_agent(agent_name, user_message, thread_id=None, response_mode=None):
+    """
+    Public method to invoke the agent and receive the turn as a stream of events.
+
+    Args:
+        agent_name (str): The name of the agent configuration to use
+        user_message (str): The message to send to the agent
+        thread_id (str, optional): Existing thread to continue the conversation in
+        response_mode (str, optional): "full" or "delta" for the final result, defaults to the agent's Response_Mode
+
+    Yields:
+        Event dicts: "thread", "run_status", "tool_call", "text" with the assistant text
+        "delta", "error", and a final "result" holding the invoke_agent response
+    """
+    return _get_session(agent_name).stream(user_message, thread_id, response_mode=response_mode)
+
+def get_run_steps(agent_name, thread_id, run_id):
+    """
+    Public method to inspect the steps and tool calls of a run returned by invoke_agent.
+
+    Args:
+        agent_name (str): The name of the agent configuration the run was made with
+        thread_id (str): The thread ID of the run
+        run_id (str): The run ID
+
+    Returns:
+        RunSteps, listing the steps from the service when first iterated
+    """
+    return _get_session(agent_name).run_steps(thread_id, run_id)
+
 def _main():
     """Private main function for standalone script execution"""
     # values for standalone execution
@@ -0,0 +1,98 @@
+"""
+Agent name to agent ID index for the AI Foundry Agent package.
+
+Resolving an agent by name otherwise means paging through `list_agents` on every call.
+The index remembers the agent ID and the hash of the configuration the agent was created
+or last updated with, in memory and optionally in a JSON file on local disk, so an
+existing agent can be checked with a single `get_agent` call.
+
+Entries are keyed by project endpoint and agent name.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+class AgentIndex:
+    """Thread-safe name to (agent ID, config hash) index with optional JSON persistence"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if path:
+            self._read()
+
+    @staticmethod
+    def _key(project_endpoint, agent_name):
+        return f"{project_endpoint}|{agent_name}"
+
+    def get(self, project_endpoint, agent_name):
+        """Return (agent_id, config_hash) for the agent, or None if it is not indexed"""
+        with self._lock:
+            entry = self._entries.get(self._key(project_endpoint, agent_name))
+        return (entry["agent_id"], entry["config_hash"]) if entry else None
+
+    def put(self, project_endpoint, agent_name, agent_id, config_hash):
+        """Record the agent ID and the hash of the configuration it was created with"""
+        with self._lock:
+            self._entries[self._key(project_endpoint, agent_name)] = {"agent_id": agent_id, "config_hash": config_hash}
+            self._write()
+
+    def invalidate(self, project_endpoint, agent_name):
+        """Drop the entry for the agent, e.g. after a failed lookup or when it was deleted"""
+        with self._lock:
+            if self._entries.pop(self._key(project_endpoint, agent_name), None) is not None:
+                self._write()
+
+    def _read(self):
+        """Load the entries persisted on disk, ignoring a missing or unreadable file"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as index_file:
+                self._entries = json.load(index_file)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _write(self):
+        """Persist the entries atomically, called with the lock held"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(self._entries, index_file, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+# Indexes shared per persistence path, None for the in-memory only index
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def _get_index(path=None):
+    """Return the shared index for the path, creating it on first use"""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = AgentIndex(path)
+            _indexes[path] = index
+        return index
+
+def _config_hash(config, mcp_tools):
+    """Hash the agent settings that are stored on the service side (model, instructions, tools)"""
+    definitions = [
+        definition.as_dict() if hasattr(definition, "as_dict") else dict(definition)
+        for definition in mcp_tools.definitions
+    ]
+    payload = json.dumps(
+        {
+            "model": config.model_deployment_name,
+            "description": config.agent_description,
+            "instructions": config.agent_instructions,
+            "tools": definitions,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,235 @@
+"""
+Warm agent pool for the AI Foundry Agent package.
+
+With `Delete_Agent_After_Run` every message creates an agent and deletes it again after
+the run. A pool keeps `Agent_Pool_Size` agents of the configuration warm instead: each
+turn leases an idle agent and returns it when the run is done, while the thread of the
+turn is still deleted. Agents are only created on the request path when every pooled
+agent is leased. The pool keeps such surplus agents for later peaks and deletes them in
+the background once they were idle for `Agent_Pool_Idle_Timeout` seconds, like agents
+of failed turns and, when the pool is closed, all idle agents. A timer armed while the
+pool holds surplus agents expires them when no turn returns an agent.
+
+The pool does not talk to the service itself, agents are created and deleted through
+the callables handed in by the session, and background work goes through its `submit`.
+"""
+
+import asyncio
+import collections
+import logging
+import threading
+import time
+
+from .logger import _log_message
+
+class AgentPool:
+    """Thread-safe pool of warm agents for one agent configuration"""
+
+    def __init__(self, config, create_agent, delete_agent, submit):
+        self.config = config
+        self.size = config.agent_pool_size
+        self.idle_timeout = config.agent_pool_idle_timeout
+        self._create_agent = create_agent
+        self._delete_agent = delete_agent
+        self._submit = submit
+        # (agent, time it was returned), most recently returned last
+        self._idle = collections.deque()
+        # Agents owned by the pool: idle, leased or being created
+        self._count = 0
+        self._closed = False
+        # Expires surplus agents while no turn returns an agent, armed while the pool holds any
+        self._sweep_timer = None
+        self._lock = threading.Lock()
+
+    def fill(self):
+        """Create the missing agents up to the pool size in the background"""
+        with self._lock:
+            missing = 0 if self._closed else self.size - self._count
+            self._count += max(missing, 0)
+        for _ in range(missing):
+            self._submit(self._create_idle)
+
+    def lease(self):
+        """Take an idle agent, creating one on the request path only when none is idle"""
+        with self._lock:
+            if self._idle:
+                # Most recently used first, so surplus agents at the other end can expire
+                return self._idle.pop()[0]
+            self._count += 1
+        try:
+            return self._create_agent()
+        except Exception:
+            with self._lock:
+                self._count -= 1
+            raise
+
+    def release(self, agent, reuse=True):
+        """Return the agent for the next turn, or delete it in the background if it is not reusable"""
+        with self._lock:
+            if reuse and not self._closed:
+                self._idle.append((agent, time.monotonic()))
+                expired = self._expired()
+                self._schedule_sweep()
+            else:
+                self._count -= 1
+                expired = [agent]
+        for expired_agent in expired:
+            self._submit(self._delete_agent, expired_agent)
+        if not reuse:
+            # Replace the discarded agent
+            self.fill()
+
+    def _expired(self):
+        """Take the surplus agents that were idle longer than the idle timeout, called with the lock held"""
+        expired = []
+        deadline = time.monotonic() - self.idle_timeout
+        while self._count > self.size and self._idle and self._idle[0][1] < deadline:
+            expired.append(self._idle.popleft()[0])
+            self._count -= 1
+        return expired
+
+    def _schedule_sweep(self):
+        """Arm the timer for when the oldest idle agent times out if the pool holds surplus agents, called with the lock held"""
+        if self._sweep_timer is not None or self._closed or self._count <= self.size or not self._idle:
+            return
+        delay = self._idle[0][1] + self.idle_timeout - time.monotonic()
+        self._sweep_timer = threading.Timer(max(delay, 0), self._sweep)
+        self._sweep_timer.daemon = True
+        self._sweep_timer.start()
+
+    def _sweep(self):
+        """Delete the surplus agents that timed out, run by the timer"""
+        with self._lock:
+            self._sweep_timer = None
+            expired = self._expired()
+            self._schedule_sweep()
+        for expired_agent in expired:
+            self._submit(self._delete_agent, expired_agent)
+
+    def close(self):
+        """Stop refilling the pool and return the idle agents, which the caller deletes"""
+        with self._lock:
+            self._closed = True
+            if self._sweep_timer is not None:
+                self._sweep_timer.cancel()
+                self._sweep_timer = None
+            agents = [agent for agent, _ in self._idle]
+            self._idle.clear()
+            self._count -= len(agents)
+        return agents
+
+    def _create_idle(self):
+        """Create an agent for the pool, called in the background"""
+        try:
+            agent = self._create_agent()
+        except Exception as e:
+            with self._lock:
+                self._count -= 1
+            _log_message(self.config, f"Error creating pooled agent: {e}", level=logging.ERROR)
+            return
+        with self._lock:
+            if not self._closed:
+                self._idle.appendleft((agent, time.monotonic()))
+                return
+            self._count -= 1
+        self._delete_agent(agent)
+
+class AsyncAgentPool:
+    """Pool of warm agents for one agent configuration, for use on a single event loop"""
+
+    def __init__(self, config, create_agent, delete_agent, spawn):
+        self.config = config
+        self.size = config.agent_pool_size
+        self.idle_timeout = config.agent_pool_idle_timeout
+        self._create_agent = create_agent
+        self._delete_agent = delete_agent
+        self._spawn = spawn
+        # (agent, time it was returned), most recently returned last
+        self._idle = collections.deque()
+        # Agents owned by the pool: idle, leased or being created
+        self._count = 0
+        self._closed = False
+        # Expires surplus agents while no turn returns an agent, armed while the pool holds any
+        self._sweep_handle = None
+
+    def fill(self):
+        """Create the missing agents up to the pool size in background tasks"""
+        missing = 0 if self._closed else self.size - self._count
+        self._count += max(missing, 0)
+        for _ in range(missing):
+            self._spawn(self._create_idle())
+
+    async def lease(self):
+        """Take an idle agent, creating one on the request path only when none is idle"""
+        if self._idle:
+            # Most recently used first, so surplus agents at the other end can expire
+            return self._idle.pop()[0]
+        self._count += 1
+        try:
+            return await self._create_agent()
+        except Exception:
+            self._count -= 1
+            raise
+
+    def release(self, agent, reuse=True):
+        """Return the agent for the next turn, or delete it in the background if it is not reusable"""
+        if reuse and not self._closed:
+            self._idle.append((agent, time.monotonic()))
+            expired = self._expired()
+            self._schedule_sweep()
+        else:
+            self._count -= 1
+            expired = [agent]
+        for expired_agent in expired:
+            self._spawn(self._delete_agent(expired_agent))
+        if not reuse:
+            # Replace the discarded agent
+            self.fill()
+
+    def _expired(self):
+        """Take the surplus agents that were idle longer than the idle timeout"""
+        expired = []
+        deadline = time.monotonic() - self.idle_timeout
+        while self._count > self.size and self._idle and self._idle[0][1] < deadline:
+            expired.append(self._idle.popleft()[0])
+            self._count -= 1
+        return expired
+
+    def _schedule_sweep(self):
+        """Arm the timer for when the oldest idle agent times out if the pool holds surplus agents"""
+        if self._sweep_handle is not None or self._closed or self._count <= self.size or not self._idle:
+            return
+        delay = self._idle[0][1] + self.idle_timeout - time.monotonic()
+        self._sweep_handle = asyncio.get_running_loop().call_later(max(delay, 0), self._sweep)
+
+    def _sweep(self):
+        """Delete the surplus agents that timed out, run by the timer"""
+        self._sweep_handle = None
+        for expired_agent in self._expired():
+            self._spawn(self._delete_agent(expired_agent))
+        self._schedule_sweep()
+
+    def close(self):
+        """Stop refilling the pool and return the idle agents, which the caller deletes"""
+        self._closed = True
+        if self._sweep_handle is not None:
+            self._sweep_handle.cancel()
+            self._sweep_handle = None
+        agents = [agent for agent, _ in self._idle]
+        self._idle.clear()
+        self._count -= len(agents)
+        return agents
+
+    async def _create_idle(self):
+        """Create an agent for the pool, run as a background task"""
+        try:
+            agent = await self._create_agent()
+        except Exception as e:
+            self._count -= 1
+            _log_message(self.config, f"Error creating pooled agent: {e}", level=logging.ERROR)
+            return
+        if not self._closed:
+            self._idle.appendleft((agent, time.monotonic()))
+            return
+        self._count -= 1
+        await self._delete_agent(agent)
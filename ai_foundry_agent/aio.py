@@ -0,0 +1,670 @@
+"""
+Asynchronous AI Foundry Agent with MCP Integration.
+
+Mirrors the workflow in agent.py on top of the `.aio` variants of AIProjectClient and
+DefaultAzureCredential, so many concurrent runs can share a single event loop instead
+of blocking one thread each.
+"""
+
+import asyncio
+import logging
+from azure.ai.projects.aio import AIProjectClient
+from azure.identity.aio import DefaultAzureCredential
+from azure.ai.agents.models import AgentStreamEvent, ListSortOrder, SubmitToolApprovalAction, ThreadMessageOptions
+from .agent import (
+    _RETIRE_TIMEOUT,
+    _RUN_EVENTS,
+    _conversation_results,
+    _forget_agent,
+    _log_run_steps,
+    _mcp_tools_init,
+    _merge_results,
+    _previous_results,
+    _remember_results,
+    _run_usage,
+    _tool_approvals,
+)
+from .agent_index import _config_hash, _get_index
+from .agent_pool import AsyncAgentPool
+from .approvals import ApprovalMemo
+from .config import RESPONSE_MODES, _load_config
+from .conversation import ConversationTracker, _summary_text
+from .history import ThreadHistory
+from .logger import _log_message, _update_log_context, log_context
+from .metrics import _count, _timed, _timed_turn, _turn_timing_results
+from .rate_limit import _async_rate_limited_client
+from .response_cache import _cache_key, _cacheable, _cached_results, _create_response_cache, _seed_messages
+from .run_steps import AsyncRunSteps, _should_log_run_steps
+from .tool_catalog import _learning_tools, _narrowing_due, _record_tool_calls, _select_tools, _validate_allowed_tools
+
+def _project_init(config, tool_selection=None):
+    """Initialize async AI Project Client, its credential and the MCP Tools"""
+    with _timed(config, "project_init"):
+        credential = DefaultAzureCredential()
+        project_client = AIProjectClient(
+            endpoint=config.project_endpoint,
+            credential=credential,
+        )
+        mcp_tools = _mcp_tools_init(config, tool_selection)
+    return project_client, credential, mcp_tools
+
+async def _find_existing_agent(agents_client, config, agent_index):
+    """Find the agent by name, checking the agent index before listing all agents"""
+    entry = agent_index.get(config.project_endpoint, config.agent_name)
+    if entry:
+        agent_id, config_hash = entry
+        try:
+            agent = await agents_client.get_agent(agent_id)
+            if agent.name == config.agent_name:
+                return agent, config_hash
+        except Exception as e:
+            _log_message(config, f"Indexed agent ID: {agent_id} not found: {e}", level=logging.WARNING)
+        agent_index.invalidate(config.project_endpoint, config.agent_name)
+
+    try:
+        async for agent_item in agents_client.list_agents():
+            if agent_item.name == config.agent_name: # Check by name and not ID.
+                return agent_item, (agent_item.metadata or {}).get("config_hash")
+    except Exception as e:
+        _log_message(config, f"Error listing agents: {e}", level=logging.ERROR)
+    return None, None
+
+async def _agent_create(agents_client, mcp_tools, config, config_hash=None):
+    """Create a new agent for the configuration"""
+    agent = await agents_client.create_agent(
+        model=config.model_deployment_name,
+        name=config.agent_name,
+        description=config.agent_description,
+        instructions=config.agent_instructions,
+        tools=mcp_tools.definitions,
+        metadata={"config_hash": config_hash or _config_hash(config, mcp_tools)},
+    )
+    _log_message(config, f"Created new agent, Name: {config.agent_name} ID: {agent.id}")
+    return agent
+
+async def _agent_init(agents_client, mcp_tools, config):
+    """Check for existing agent and create agent if needed"""
+    with _timed(config, "agent_init"):
+        config_hash = _config_hash(config, mcp_tools)
+        agent_index = _get_index(config.agent_index_path)
+        existing_agent = None
+        existing_hash = None
+
+        # Only check for existing agents if not ignoring existing agents
+        if not config.ignore_existing_agent:
+            existing_agent, existing_hash = await _find_existing_agent(agents_client, config, agent_index)
+        else:
+            _log_message(config, "Ignoring existing agents - will create new agent")
+
+        # Use existing agent if found and not ignoring existing agents
+        if existing_agent and existing_hash == config_hash:
+            agent = existing_agent
+            _log_message(config, f"Using existing agent, Name: {config.agent_name} ID: {agent.id}")
+        elif existing_agent:
+            # Bring the existing agent in line with the current configuration
+            agent = await agents_client.update_agent(
+                agent_id=existing_agent.id,
+                model=config.model_deployment_name,
+                description=config.agent_description,
+                instructions=config.agent_instructions,
+                tools=mcp_tools.definitions,
+                metadata={"config_hash": config_hash},
+            )
+            _log_message(config, f"Updated existing agent to current configuration, Name: {config.agent_name} ID: {agent.id}")
+        else:
+            agent = await _agent_create(agents_client, mcp_tools, config, config_hash)
+
+        # Remember the agent so the next lookup by name is a single get_agent call
+        if not config.ignore_existing_agent:
+            agent_index.put(config.project_endpoint, config.agent_name, agent.id, config_hash)
+        for server in config.mcp_servers:
+            _log_message(config, f"MCP Server: {server.label} at {server.url}")
+
+        return agent
+
+async def _handle_tool_approvals(agents_client, thread, run, mcp_tools, config, event_handler=None, approval_memo=None):
+    """
+    Decide the pending tool calls of a run and submit the decisions in one batch, returns False if the run was cancelled instead.
+
+    When the run is streamed, the approvals are submitted to the stream's event handler.
+    """
+    tool_calls = run.required_action.submit_tool_approval.tool_calls
+    if not tool_calls:
+        _log_message(config, "No tool calls provided - cancelling run")
+        await agents_client.runs.cancel(thread_id=thread.id, run_id=run.id)
+        return False
+    _log_message(config, f"Run requires action - {len(tool_calls)} tool calls to approve")
+
+    if config.approval_policy.callback is not None:
+        # Callbacks may block, decide in a worker thread instead of on the event loop
+        tool_approvals = await asyncio.to_thread(_tool_approvals, config, mcp_tools, tool_calls, thread.id, approval_memo)
+    else:
+        tool_approvals = _tool_approvals(config, mcp_tools, tool_calls, thread.id, approval_memo)
+    if tool_approvals and event_handler is not None:
+        await agents_client.runs.submit_tool_outputs_stream(
+            thread_id=thread.id,
+            run_id=run.id,
+            tool_approvals=tool_approvals,
+            event_handler=event_handler
+        )
+    elif tool_approvals:
+        await agents_client.runs.submit_tool_outputs(
+            thread_id=thread.id,
+            run_id=run.id,
+            tool_approvals=tool_approvals
+        )
+    return True
+
+async def _poll_run(agents_client, thread, run, mcp_tools, config, approval_memo=None):
+    """Poll for run status with the agent's poll strategy without blocking the event loop"""
+    intervals = config.poll_strategy.intervals()
+    while run.status in ["queued", "in_progress", "requires_action"]:
+        with _timed(config, "poll"):
+            await asyncio.sleep(next(intervals))
+            run = await agents_client.runs.get(thread_id=thread.id, run_id=run.id)
+
+        # Handle Tools Approvals and Terminate if no tool calls
+        if run.status == "requires_action" and isinstance(run.required_action, SubmitToolApprovalAction):
+            with _timed(config, "approvals"):
+                approved = await _handle_tool_approvals(agents_client, thread, run, mcp_tools, config,
+                                                        approval_memo=approval_memo)
+            if not approved:
+                break
+            # The run picks up again right after the approval, so start polling quickly again
+            intervals = config.poll_strategy.intervals()
+
+        _log_message(config, f"Current run status: {run.status}")
+    return run
+
+async def _stream_run(agents_client, thread, agent, mcp_tools, config, approval_memo=None):
+    """Create the run as a stream and follow its events until it ends, handling tool approvals if needed"""
+    run = None
+    with _timed(config, "poll"):
+        async with await agents_client.runs.stream(
+            thread_id=thread.id,
+            agent_id=agent.id,
+            tool_resources=mcp_tools.resources
+        ) as stream:
+            async for event_type, event_data, _ in stream:
+                if event_type in _RUN_EVENTS:
+                    if run is None:
+                        _update_log_context(run_id=event_data.id)
+                        _log_message(config, f"Created run, ID: {event_data.id}")
+                    run = event_data
+                    _log_message(config, f"Current run status: {run.status}")
+
+                    # Handle Tools Approvals and Terminate if no tool calls
+                    if run.status == "requires_action" and isinstance(run.required_action, SubmitToolApprovalAction):
+                        with _timed(config, "approvals"):
+                            approved = await _handle_tool_approvals(agents_client, thread, run, mcp_tools, config,
+                                                                    event_handler=stream, approval_memo=approval_memo)
+                        if not approved:
+                            break
+                elif event_type == AgentStreamEvent.ERROR:
+                    _log_message(config, f"Run stream error: {event_data}", level=logging.ERROR)
+                elif event_type == AgentStreamEvent.DONE:
+                    break
+    if run is None:
+        # Without a run event there is no run ID to poll the run with
+        raise RuntimeError(f"Run stream in thread ID: {thread.id} closed before the run was created")
+    return run
+
+async def _agent_run(agents_client, agent, mcp_tools, user_message, config, thread_id=None, response_mode=None, history=None,
+                     approval_memo=None):
+    """Create threads, pass messages, handle approvals, and return conversation results"""
+
+    with _timed(config, "create"):
+        # Create or get thread for communication
+        if thread_id:
+            thread = await agents_client.threads.get(thread_id=thread_id)
+            _update_log_context(thread_id=thread.id)
+            _log_message(config, f"Using existing thread, ID: {thread.id}. Details: {thread}")
+        else:
+            thread = await agents_client.threads.create()
+            _update_log_context(thread_id=thread.id)
+            _log_message(config, f"Created thread, ID: {thread.id}")
+
+        # Create message to thread
+        message = await agents_client.messages.create(
+            thread_id=thread.id,
+            role="user",
+            content=user_message,
+        )
+        _log_message(config, f"Created message, ID: {message.id}")
+
+    # Create and process agent run in thread with MCP tools
+    _log_message(config, f"Starting run for agent ID: {agent.id} in thread ID: {thread.id}")
+    if config.poll_strategy.streaming:
+        run = await _stream_run(agents_client, thread, agent, mcp_tools, config, approval_memo)
+    else:
+        with _timed(config, "create"):
+            run = await agents_client.runs.create(
+                thread_id=thread.id,
+                agent_id=agent.id,
+                tool_resources=mcp_tools.resources
+            )
+        _update_log_context(run_id=run.id)
+        _log_message(config, f"Created run, ID: {run.id}")
+
+        # Poll for run status and handle tool approvals if needed
+        run = await _poll_run(agents_client, thread, run, mcp_tools, config, approval_memo)
+
+    _log_message(config, f"Run completed with status: {run.status}")
+    if run.status == "failed":
+        _log_message(config, f"Run failed: {run.last_error}", level=logging.ERROR)
+
+    # Log run steps and tool calls for the runs selected by Run_Steps, listing them is an extra request
+    run_steps = None
+    if _should_log_run_steps(config, run):
+        with _timed(config, "steps"):
+            run_steps = [step async for step in AsyncRunSteps(agents_client, thread.id, run.id)]
+            _log_run_steps(config, run_steps)
+    # Count the tool calls of the agent's first runs for the tool catalog to narrow its tools
+    if _learning_tools(config):
+        with _timed(config, "steps"):
+            if run_steps is None:
+                run_steps = [step async for step in AsyncRunSteps(agents_client, thread.id, run.id)]
+            # Persisting the counts writes the catalog file, off the event loop
+            await asyncio.to_thread(_record_tool_calls, config, run_steps)
+    _count("ai_foundry_agent_runs_total", agent=config.agent_name, status=getattr(run.status, "value", run.status))
+
+    # Fetch the messages of the turn, or the whole thread if its history is not known yet
+    response_mode = response_mode or config.response_mode
+    if response_mode not in RESPONSE_MODES:
+        raise ValueError(f"Unknown response mode '{response_mode}', expected one of: {', '.join(RESPONSE_MODES)}")
+    previous_results = _previous_results(history, thread.id, response_mode)
+    with _timed(config, "messages"):
+        if response_mode == "full" and previous_results is None and thread_id:
+            messages = [msg async for msg in agents_client.messages.list(thread_id=thread.id, order=ListSortOrder.ASCENDING)]
+            conversation_results = _conversation_results(config, messages)
+        else:
+            run_messages = [
+                msg async for msg in agents_client.messages.list(thread_id=thread.id, run_id=run.id, order=ListSortOrder.ASCENDING)
+            ]
+            turn_results = [{"role": "USER", "content": user_message}] + _conversation_results(config, run_messages)
+            conversation_results = _merge_results(previous_results, turn_results, response_mode)
+    _remember_results(history, thread.id, conversation_results, response_mode)
+
+    # Return in the specified JSON format with metadata
+    return {
+        "agent_name": config.agent_name,
+        "agent_id": agent.id,
+        "thread_id": thread.id,
+        "message_id": message.id,
+        "run_id": run.id,
+        "response": conversation_results,
+        "usage": _run_usage(run),
+        "cached": False,
+        "timings": _turn_timing_results()
+    }
+
+async def _rollover_thread(agents_client, agent, mcp_tools, config, thread_id, conversations, approval_memo=None):
+    """Continue the conversation of the thread in a new thread seeded with a summary or its last turns, returns its ID"""
+    policy = config.conversation
+    summary = None
+    rollover_tokens = 0
+    if policy.rollover == "summary":
+        # Ask the agent for the summary while it still sees the whole thread
+        results = await _agent_run(agents_client, agent, mcp_tools, policy.summary_prompt, config, thread_id,
+                                   response_mode="delta", approval_memo=approval_memo)
+        summary = _summary_text(results)
+        rollover_tokens = (results["usage"] or {}).get("total_tokens", 0)
+    seed = conversations.seed_messages(thread_id, summary)
+    with _timed(config, "rollover"):
+        thread = await agents_client.threads.create(
+            messages=[ThreadMessageOptions(role=role, content=content) for role, content in seed]
+        )
+    conversations.rolled_over(thread_id, thread.id, seed, rollover_tokens)
+    _count("ai_foundry_agent_conversation_rollovers_total", agent=config.agent_name, mode=policy.rollover)
+    _log_message(config, f"Rolled conversation over from thread ID: {thread_id} to thread ID: {thread.id} with {len(seed)} messages")
+    return thread.id
+
+async def _seed_cached_thread(agents_client, config, user_message, cached):
+    """Create the thread a cached turn continues in, seeded with the question and the cached answer, returns its ID"""
+    if config.delete_agent_after_run:
+        # No thread is kept after the turn
+        return None
+    with _timed(config, "create"):
+        thread = await agents_client.threads.create(
+            messages=[ThreadMessageOptions(role=role, content=content)
+                      for role, content in _seed_messages(user_message, cached)]
+        )
+    _update_log_context(thread_id=thread.id)
+    _log_message(config, f"Created thread seeded with the cached response, ID: {thread.id}")
+    return thread.id
+
+async def _thread_delete(agents_client, thread_id, config):
+    """Delete the thread of a turn whose agent is returned to the pool"""
+    try:
+        with _timed(config, "thread_delete", turn=False):
+            await agents_client.threads.delete(thread_id=thread_id)
+        _log_message(config, f"Deleted thread ID: {thread_id}")
+        return True
+    except Exception as e:
+        _log_message(config, f"Error deleting thread {thread_id}: {e}", level=logging.ERROR)
+        return False
+
+async def _agent_delete(agents_client, agent, thread_id, config):
+    """Delete the agent, and its thread if given"""
+    try:
+        with _timed(config, "agent_delete", turn=False):
+            if thread_id:
+                await agents_client.threads.delete(thread_id=thread_id) # Delete the thread first
+                _log_message(config, f"Deleted thread ID: {thread_id}")
+            await agents_client.delete_agent(agent_id=agent.id)
+        _log_message(config, f"Deleted agent ID: {agent.id}")
+        _forget_agent(config, agent)
+        return True
+    except Exception as e:
+        _log_message(config, f"Error deleting thread {thread_id} agent {agent.id}: {e}", level=logging.ERROR)
+        return False
+
+class AsyncAgentSession:
+    """
+    Long-lived asynchronous session for a single agent configuration.
+
+    The async counterpart of AgentSession. A session is bound to the event loop it is
+    first used on, because the underlying HTTP connection pool is.
+    """
+
+    def __init__(self, agent_name):
+        self.agent_name = agent_name
+        self.config = _load_config(agent_name)
+        self.agent = None
+        self.history = ThreadHistory()
+        self.approval_memo = ApprovalMemo()
+        self._agent_lock = asyncio.Lock()
+
+        # Turns in progress, so a session replaced after a config reload is closed once idle
+        self._active_turns = 0
+
+        # Tools exposed per MCP server, when the agent has a Tool_Catalog, selected on first use off the event loop
+        self.tool_selection = None
+        self._tools_selected = self.config.tool_catalog is None
+        self._tools_lock = asyncio.Lock()
+
+        # Initialize project and MCP tools
+        self.project_client, self.credential, self.mcp_tools = _project_init(self.config)
+        # Calls to the service are queued and retried by the limiter shared by the sessions of the project
+        self.agents_client = _async_rate_limited_client(self.project_client.agents, self.config)
+
+        # Results of repeated questions, when the agent has a Response_Cache
+        self.response_cache = _create_response_cache(self.config.response_cache)
+        self._config_hash = _config_hash(self.config, self.mcp_tools) if self.response_cache else None
+
+        # Turns, messages and tokens per thread, when the agent has a Conversation budget
+        self.conversations = ConversationTracker(self.config.conversation) if self.config.conversation else None
+
+        # Deleting threads and agents after a turn happens in background tasks, off the request path
+        self._cleanup_tasks = set()
+
+        # Warm agents leased per turn instead of creating and deleting one per message
+        self.agent_pool = None
+        if self.config.delete_agent_after_run and self.config.agent_pool_size > 0:
+            self.agent_pool = AsyncAgentPool(
+                self.config,
+                create_agent=lambda: _agent_create(self.agents_client, self.mcp_tools, self.config),
+                delete_agent=lambda agent: _agent_delete(self.agents_client, agent, None, self.config),
+                spawn=self._cleanup,
+            )
+
+    def _cleanup(self, coroutine):
+        """Run cleanup work in a background task, which keeps the log context of the turn"""
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
+
+    async def _get_agent(self):
+        """Return the session agent, initializing or getting the existing agent on first use"""
+        async with self._agent_lock:
+            if self.agent is None:
+                self.agent = await _agent_init(self.agents_client, self.mcp_tools, self.config)
+            return self.agent
+
+    def _reset_agent(self, agent):
+        """Forget the session agent so the next turn resolves it again"""
+        if self.agent is agent:
+            self.agent = None
+
+    async def _lease_agent(self):
+        """Return the agent for a turn: leased from the pool, private to the turn or shared by the session"""
+        if self.agent_pool:
+            # Pre-create the pool agents in background tasks on first use, and top the pool up after failures
+            self.agent_pool.fill()
+            return await self.agent_pool.lease()
+        if self.config.delete_agent_after_run:
+            # A fresh agent, as an existing one could still be deleted by the cleanup of an earlier turn
+            with _timed(self.config, "agent_init"):
+                return await _agent_create(self.agents_client, self.mcp_tools, self.config)
+        return await self._get_agent()
+
+    def _end_turn(self, agent, thread_id=None, failed=False):
+        """Return or delete the agent of a finished turn, deleting its thread in the background if configured"""
+        config = self.config
+        if config.delete_agent_after_run:
+            self.history.discard(thread_id)
+            self.approval_memo.discard(thread_id)
+            if self.conversations:
+                self.conversations.discard(thread_id)
+            if self.agent_pool:
+                self.agent_pool.release(agent, reuse=not failed)
+                if thread_id:
+                    self._cleanup(_thread_delete(self.agents_client, thread_id, config))
+            else:
+                self._cleanup(_agent_delete(self.agents_client, agent, thread_id, config))
+        elif failed:
+            # Resolve the agent again on the next turn in case it no longer exists
+            self._reset_agent(agent)
+
+    async def _cached_response(self, user_message, thread_id):
+        """Return the cache key of a turn starting a new thread and the cached results if any, (None, None) otherwise"""
+        if self.response_cache is None or thread_id:
+            return None, None
+        cache_key = _cache_key(self._config_hash, user_message)
+        with _timed(self.config, "cache"):
+            cached = self.response_cache.get(cache_key)
+        _count("ai_foundry_agent_response_cache_total", agent=self.config.agent_name,
+               result="miss" if cached is None else "hit")
+        if cached is not None:
+            _log_message(self.config, "Serving cached response")
+            thread_id = await _seed_cached_thread(self.agents_client, self.config, user_message, cached)
+            return cache_key, {**_cached_results(cached, thread_id), "timings": _turn_timing_results()}
+        return cache_key, None
+
+    def _cache_response(self, cache_key, conversation_results):
+        """Cache the results of an answered turn that started a new thread"""
+        if cache_key and _cacheable(conversation_results):
+            self.response_cache.put(cache_key, conversation_results)
+
+    async def _conversation_thread(self, agent, thread_id):
+        """Thread the turn continues the conversation in, rolling it over to a new thread when over budget"""
+        if self.conversations is None or not thread_id:
+            return thread_id
+        thread_id = self.conversations.resolve(thread_id)
+        if self.conversations.needs_rollover(thread_id):
+            thread_id = await _rollover_thread(self.agents_client, agent, self.mcp_tools, self.config, thread_id,
+                                               self.conversations, self.approval_memo)
+        return thread_id
+
+    def _track_conversation(self, conversation_results):
+        """Count the turn against the budget of its thread and add the conversation stats to its results"""
+        if self.conversations is None or self.config.delete_agent_after_run:
+            return
+        thread_id = conversation_results["thread_id"]
+        saved = self.conversations.record_turn(thread_id, conversation_results)
+        if saved:
+            _count("ai_foundry_agent_conversation_tokens_saved_total", saved, agent=self.config.agent_name)
+        conversation_results["conversation"] = self.conversations.stats(thread_id)
+
+    async def _prepare_tools(self):
+        """Check Allowed_Tools against the Tool_Catalog and select the exposed tools on first use"""
+        if self._tools_selected:
+            return
+        async with self._tools_lock:
+            if self._tools_selected:
+                return
+            # Listing the tools of the MCP servers blocks, so it runs in a worker thread
+            await asyncio.to_thread(_validate_allowed_tools, self.config)
+            self._use_tools(await asyncio.to_thread(_select_tools, self.config))
+            self._tools_selected = True
+
+    async def _track_tools(self, conversation_results):
+        """Add the tool catalog stats of the turn to its results, narrowing the tools once enough runs were counted"""
+        selection = self.tool_selection
+        if selection is None:
+            return
+        if selection.tokens_saved:
+            _count("ai_foundry_agent_tool_schema_tokens_saved_total", selection.tokens_saved, agent=self.config.agent_name)
+        conversation_results["tool_catalog"] = selection.stats()
+        if _narrowing_due(self.config, selection):
+            await self._narrow_tools()
+
+    async def close_when_idle(self, timeout=None):
+        """Close the session once its turns in progress finished, or after the timeout in seconds"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout is not None else None
+        while self._active_turns and (deadline is None or loop.time() < deadline):
+            await asyncio.sleep(0.1)
+        await self.close()
+
+    async def invoke(self, user_message, thread_id=None, response_mode=None) -> dict:
+        """Run a single turn against the agent, reusing the session's client and agent"""
+        self._active_turns += 1
+        try:
+            return await self._invoke_turn(user_message, thread_id, response_mode)
+        finally:
+            self._active_turns -= 1
+
+    async def _invoke_turn(self, user_message, thread_id, response_mode):
+        """Turn behind invoke"""
+        # Scope the thread and run IDs attached to log lines, and the timings, to this turn
+        with log_context(), _timed_turn(self.config):
+            await self._prepare_tools()
+
+            # Serve repeated questions from the response cache
+            cache_key, cached = await self._cached_response(user_message, thread_id)
+            if cached is not None:
+                return cached
+
+            agent = await self._lease_agent()
+            try:
+                thread_id = await self._conversation_thread(agent, thread_id)
+
+                # Run the agent with the user message
+                conversation_results = await _agent_run(
+                    self.agents_client, agent, self.mcp_tools, user_message, self.config, thread_id,
+                    response_mode=response_mode, history=self.history, approval_memo=self.approval_memo
+                )
+            except Exception:
+                self._end_turn(agent, failed=True)
+                raise
+
+            self._end_turn(agent, conversation_results.get("thread_id"))
+            self._track_conversation(conversation_results)
+            await self._track_tools(conversation_results)
+            self._cache_response(cache_key, conversation_results)
+            return conversation_results
+
+    async def _narrow_tools(self):
+        """Expose only the tools the agent called, the next turn updates the agent to the narrowed tools"""
+        self._use_tools(await asyncio.to_thread(_select_tools, self.config))
+
+    def _use_tools(self, tool_selection):
+        """Expose the selected tools, the next turn resolves the agent with them"""
+        self.tool_selection = tool_selection
+        self.mcp_tools = _mcp_tools_init(self.config, tool_selection)
+        self.agent = None
+        if self.response_cache:
+            self._config_hash = _config_hash(self.config, self.mcp_tools)
+
+    async def warm(self):
+        """Resolve the session agent, or start filling the agent pool, so the first turn doesn't pay for it"""
+        await self._prepare_tools()
+        if self.agent_pool:
+            self.agent_pool.fill()
+        elif not self.config.delete_agent_after_run:
+            await self._get_agent()
+
+    def resolve_thread(self, thread_id):
+        """Return the thread the conversation of the thread ID continues in, after any rollovers"""
+        if self.conversations is None or not thread_id:
+            return thread_id
+        return self.conversations.resolve(thread_id)
+
+    def run_steps(self, thread_id, run_id):
+        """Return a handle on the steps of a run, listed from the service only when iterated with `async for`"""
+        return AsyncRunSteps(self.agents_client, thread_id, run_id)
+
+    async def close(self):
+        """Delete the pooled agents, wait for pending cleanup, close the response cache and the underlying project client and credential"""
+        if self.agent_pool:
+            for agent in self.agent_pool.close():
+                self._cleanup(_agent_delete(self.agents_client, agent, None, self.config))
+        while self._cleanup_tasks:
+            await asyncio.gather(*self._cleanup_tasks, return_exceptions=True)
+        if self.response_cache:
+            self.response_cache.close()
+        await self.project_client.close()
+        await self.credential.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+# Async sessions cached per event loop and agent name, used by invoke_agent_async
+_sessions = {}
+
+# Sessions replaced after a config reload that are waiting for their turns to close
+_retiring = set()
+
+def _get_session(agent_name):
+    """Return the cached async session of the running event loop for the agent name, creating it on first use or after its configuration changed"""
+    loop = asyncio.get_running_loop()
+    config = _load_config(agent_name)
+    session = _sessions.get((loop, agent_name))
+    if session is None or session.config is not config:
+        if session is not None:
+            _log_message(config, f"Configuration of agent {agent_name} changed, replacing its session")
+            _retire_session(session)
+        _drop_closed_loops()
+        session = AsyncAgentSession(agent_name)
+        _sessions[(loop, agent_name)] = session
+    return session
+
+def _drop_closed_loops():
+    """Drop the sessions of event loops that were closed, such as those of earlier asyncio.run calls"""
+    for key in [key for key in _sessions if key[0].is_closed()]:
+        # Its HTTP connections went with the loop, the session can no longer be closed
+        del _sessions[key]
+
+def _retire_session(session):
+    """Close a replaced session once its turns in progress finished, on the running event loop"""
+    task = asyncio.get_running_loop().create_task(session.close_when_idle(_RETIRE_TIMEOUT))
+    _retiring.add(task)
+    task.add_done_callback(_retiring.discard)
+
+async def close_sessions_async():
+    """Close and drop the cached async agent sessions of the running event loop"""
+    loop = asyncio.get_running_loop()
+    _drop_closed_loops()
+    keys = [key for key in _sessions if key[0] is loop]
+    for key in keys:
+        await _sessions.pop(key).close()
+
+async def invoke_agent_async(agent_name, user_message, thread_id=None, response_mode=None) -> dict:
+    """
+    Asynchronous version of invoke_agent.
+
+    Args:
+        agent_name (str): The name of the agent configuration to use
+        user_message (str): The message to send to the agent
+        thread_id (str, optional): Existing thread to continue the conversation in
+        response_mode (str, optional): "full" for the whole thread or "delta" for only this turn,
+            defaults to the agent's Response_Mode
+
+    Returns:
+        JSON Response
+    """
+    return await _get_session(agent_name).invoke(user_message, thread_id, response_mode=response_mode)
@@ -0,0 +1,200 @@
+"""
+Tool approval policies for the AI Foundry Agent package.
+
+When a run stops for MCP tool approvals, each pending tool call is decided by the agent's
+policy from the `Approval_Policy` section of agent_config.yaml:
+
+    Approval_Policy:
+      Allowed_Tools: ["search_*"]                # Tool name patterns to approve, empty approves every tool not denied
+      Denied_Tools: ["delete_*"]                 # Tool name patterns to decline
+      Denied_Arguments: ["(?i)drop\\s+table"]    # Calls whose arguments match one of these regular expressions are declined
+      Callback: "my_package.approvals:approve"   # Optional function deciding the calls the rules approve
+      Max_Workers: 4                             # Callback decisions evaluated concurrently
+
+Without the section every tool call is approved. The callback is called with the tool call
+as a dict (id, name, arguments, server_label) and the agent configuration, and approves
+the call by returning a truthy value. Callbacks for the calls of one approval step run
+concurrently, and all decisions are submitted together.
+
+Decisions are remembered per thread, so an identical tool call (same server, tool and
+arguments) later in the conversation is decided without evaluating the policy again.
+"""
+
+import concurrent.futures
+import fnmatch
+import importlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from .logger import _log_message
+
+class ApprovalPolicy:
+    """Immutable rules, and optionally a callback, deciding which MCP tool calls are approved"""
+
+    __slots__ = ("allowed_tools", "denied_tools", "denied_arguments", "callback", "max_workers")
+
+    def __init__(self, allowed_tools=(), denied_tools=(), denied_arguments=(), callback=None, max_workers=4):
+        if max_workers < 1:
+            raise ValueError("Approval_Policy Max_Workers must be at least 1")
+        try:
+            patterns = tuple(re.compile(pattern) for pattern in denied_arguments)
+        except re.error as e:
+            raise ValueError(f"Invalid Approval_Policy Denied_Arguments pattern: {e}") from e
+        object.__setattr__(self, "allowed_tools", tuple(allowed_tools))
+        object.__setattr__(self, "denied_tools", tuple(denied_tools))
+        object.__setattr__(self, "denied_arguments", patterns)
+        object.__setattr__(self, "callback", _resolve_callback(callback) if isinstance(callback, str) else callback)
+        object.__setattr__(self, "max_workers", max_workers)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ApprovalPolicy is immutable, cannot set '{name}'")
+
+    def __repr__(self):
+        return (f"ApprovalPolicy(allowed_tools={self.allowed_tools}, denied_tools={self.denied_tools}, "
+                f"denied_arguments={tuple(pattern.pattern for pattern in self.denied_arguments)}, "
+                f"callback={getattr(self.callback, '__qualname__', self.callback)})")
+
+    def rule_decision(self, name, arguments):
+        """Decide a tool call by the rules alone, returns (approve, reason)"""
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in self.denied_tools):
+            return False, "tool is denied"
+        if self.allowed_tools and not any(fnmatch.fnmatchcase(name, pattern) for pattern in self.allowed_tools):
+            return False, "tool is not allowed"
+        for pattern in self.denied_arguments:
+            if pattern.search(arguments or ""):
+                return False, f"arguments match {pattern.pattern!r}"
+        return True, "allowed by rules"
+
+def _resolve_callback(path):
+    """Import the "module:function" approval callback"""
+    module_name, _, function_name = path.partition(":")
+    try:
+        callback = getattr(importlib.import_module(module_name), function_name)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise ValueError(f"Cannot load Approval_Policy Callback '{path}': {e}") from e
+    if not callable(callback):
+        raise ValueError(f"Approval_Policy Callback '{path}' is not callable")
+    return callback
+
+def approval_policy_from_config(values):
+    """Build the approval policy from the Approval_Policy section of an agent configuration"""
+    if not values:
+        return ApprovalPolicy()
+    return ApprovalPolicy(
+        allowed_tools=values.get("Allowed_Tools") or (),
+        denied_tools=values.get("Denied_Tools") or (),
+        denied_arguments=values.get("Denied_Arguments") or (),
+        callback=values.get("Callback") or None,
+        max_workers=int(values.get("Max_Workers", 4)),
+    )
+
+class ApprovalMemo:
+    """Bounded, thread-safe LRU cache of tool call decisions by thread ID"""
+
+    def __init__(self, max_threads=1000):
+        self.max_threads = max_threads
+        self._threads = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id, key):
+        """Return the decision made for the tool call in the thread, or None if not decided yet"""
+        with self._lock:
+            decisions = self._threads.get(thread_id)
+            if decisions is None:
+                return None
+            self._threads.move_to_end(thread_id)
+            return decisions.get(key)
+
+    def put(self, thread_id, key, decision):
+        """Remember the decision for the tool call in the thread, evicting the least recently used thread"""
+        with self._lock:
+            self._threads.setdefault(thread_id, {})[key] = decision
+            self._threads.move_to_end(thread_id)
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+
+    def discard(self, thread_id):
+        """Forget the decisions of the thread, e.g. after it was deleted"""
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+# Callback evaluation pools by number of workers, shared by the agents of the process
+_evaluators = {}
+_evaluators_lock = threading.Lock()
+
+def _get_evaluator(max_workers):
+    with _evaluators_lock:
+        evaluator = _evaluators.get(max_workers)
+        if evaluator is None:
+            evaluator = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="agent-approvals"
+            )
+            _evaluators[max_workers] = evaluator
+        return evaluator
+
+def _call_key(call):
+    """Identify identical tool calls: same server, tool and arguments, whatever the key order"""
+    arguments = call.get("arguments") or ""
+    try:
+        arguments = json.dumps(json.loads(arguments), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        pass
+    return (call.get("server_label"), call.get("name"), arguments)
+
+def _callback_decision(config, policy, call):
+    """Ask the callback about a tool call the rules approve, declining it if the callback fails"""
+    arguments = call.get("arguments")
+    try:
+        arguments = json.loads(arguments) if arguments else {}
+    except ValueError:
+        pass
+    tool_call = {"id": call.get("id"), "name": call.get("name"), "arguments": arguments,
+                 "server_label": call.get("server_label")}
+    try:
+        return bool(policy.callback(tool_call, config)), "callback"
+    except Exception as e:
+        _log_message(config, f"Approval callback failed for tool call {call.get('id')}: {e}", level=logging.ERROR)
+        return False, "callback failed"
+
+def _decide_tool_calls(config, tool_calls, thread_id=None, memo=None):
+    """
+    Decide the tool calls of an approval step, returns (call, approve, reason) per call.
+
+    Remembered decisions are reused, the rules are checked inline and the callback, if
+    any, is evaluated concurrently for the calls the rules approve.
+    """
+    policy = config.approval_policy
+    decisions = {}
+    pending = {}
+    for call in tool_calls:
+        key = _call_key(call)
+        if key in decisions or key in pending:
+            continue
+        remembered = memo.get(thread_id, key) if memo is not None and thread_id else None
+        if remembered is not None:
+            decisions[key] = (remembered, "remembered for thread")
+            continue
+        approve, reason = policy.rule_decision(call.get("name") or "", call.get("arguments"))
+        if approve and policy.callback is not None:
+            pending[key] = call
+        else:
+            decisions[key] = (approve, reason)
+
+    if len(pending) == 1:
+        key, call = next(iter(pending.items()))
+        decisions[key] = _callback_decision(config, policy, call)
+    elif pending:
+        evaluator = _get_evaluator(policy.max_workers)
+        futures = {key: evaluator.submit(_callback_decision, config, policy, call) for key, call in pending.items()}
+        for key, future in futures.items():
+            decisions[key] = future.result()
+
+    if memo is not None and thread_id:
+        for key, (approve, reason) in decisions.items():
+            # A failed callback is asked again next time
+            if reason not in ("remembered for thread", "callback failed"):
+                memo.put(thread_id, key, approve)
+    return [(call, *decisions[_call_key(call)]) for call in tool_calls]
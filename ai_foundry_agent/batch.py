@@ -0,0 +1,205 @@
+"""
+Batch invocation for the AI Foundry Agent package.
+
+Runs many prompts through `invoke_agent` concurrently with bounded parallelism, for
+evaluation sets and report jobs. Requests are `{agent_name, message, thread_id?, id?}`
+records, results are yielded in completion order with the time each request took and
+the error it raised, if any. Clients and agents are shared per agent configuration
+through the cached sessions of `invoke_agent`.
+
+With a checkpoint file every result is appended to it as a JSON line as soon as it is
+available, and requests whose ID already has a successful result in the file are
+skipped, so an interrupted batch can be resumed by running it again.
+
+Command line usage:
+    ai-foundry-batch prompts.jsonl --output results.jsonl [--max-concurrency 8] [--resume | --overwrite]
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+
+def _completed_ids(checkpoint_path):
+    """IDs of the requests with a successful result in the checkpoint file"""
+    completed = set()
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return completed
+    with open(checkpoint_path, 'r', encoding='utf-8') as checkpoint_file:
+        for line in checkpoint_file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run
+                continue
+            if not record.get("error"):
+                completed.add(record.get("id"))
+    return completed
+
+class _ThreadLocks:
+    """Locks per thread ID, so turns of the same conversation never run concurrently, dropped once unused"""
+
+    def __init__(self):
+        # Held by the requests of the thread in flight, a lock goes away with the last of them
+        self._locks = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id):
+        with self._lock:
+            lock = self._locks.get(thread_id)
+            if lock is None:
+                lock = self._locks[thread_id] = threading.Lock()
+            return lock
+
+def _invalid_request(request):
+    """Error of a request that can't be run, None for a valid request"""
+    if isinstance(request, ValueError):
+        # A line that is not valid JSON, handed on by _read_requests
+        return f"{type(request).__name__}: {request}"
+    if not isinstance(request, dict):
+        return "ValueError: Batch requests must be JSON objects"
+    if not request.get("agent_name") or not request.get("message"):
+        return "ValueError: Batch requests need an agent_name and a message"
+    return None
+
+def _invoke_request(request_id, request, thread_locks):
+    """Invoke the agent for a single request, capturing the result or the error with its timing"""
+    # Imported on first use, so `ai-foundry-batch --help` and bad arguments don't load the Azure SDK
+    from .agent import invoke_agent
+
+    record = {"id": request_id, "agent_name": request.get("agent_name"), "thread_id": request.get("thread_id")}
+    start = time.perf_counter()
+    try:
+        thread_id = request.get("thread_id")
+        if thread_id:
+            with thread_locks.get(thread_id):
+                result = invoke_agent(request["agent_name"], request["message"], thread_id=thread_id)
+        else:
+            result = invoke_agent(request["agent_name"], request["message"])
+        record.update(
+            thread_id=result.get("thread_id"),
+            run_id=result.get("run_id"),
+            response=result.get("response"),
+            error=None,
+        )
+    except Exception as e:
+        record.update(error=f"{type(e).__name__}: {e}")
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    return record
+
+def invoke_agents_batch(requests, max_concurrency=8, checkpoint_path=None):
+    """
+    Public method to run many requests through invoke_agent concurrently.
+
+    Args:
+        requests (iterable): Dicts with agent_name, message and optionally thread_id and id.
+            Requests without an id are identified by their position, invalid ones only get an error result
+        max_concurrency (int): Maximum number of requests in flight
+        checkpoint_path (str, optional): JSONL file results are appended to, requests with a
+            successful result in it are skipped
+
+    Yields:
+        Result dicts in completion order, with id, agent_name, thread_id, run_id, response,
+        error (None on success) and elapsed (seconds)
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    completed = _completed_ids(checkpoint_path)
+    thread_locks = _ThreadLocks()
+    checkpoint_file = open(checkpoint_path, 'a', encoding='utf-8') if checkpoint_path else None
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="agent-batch")
+    pending = set()
+    try:
+        for position, request in enumerate(requests):
+            request_id = request.get("id", position) if isinstance(request, dict) else position
+            if request_id in completed:
+                continue
+            error = _invalid_request(request)
+            if error:
+                record = {"id": request_id, "error": error, "elapsed": 0.0}
+                if isinstance(request, dict):
+                    record.update(agent_name=request.get("agent_name"), thread_id=request.get("thread_id"))
+                yield _checkpoint(record, checkpoint_file)
+                continue
+            # Only keep max_concurrency requests in flight, so large inputs are read as they are consumed
+            if len(pending) >= max_concurrency:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                yield from _finish(done, checkpoint_file)
+            pending.add(executor.submit(_invoke_request, request_id, request, thread_locks))
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            yield from _finish(done, checkpoint_file)
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+        if checkpoint_file:
+            checkpoint_file.close()
+
+def _finish(done, checkpoint_file):
+    """Checkpoint and yield the results of the finished requests"""
+    for future in done:
+        yield _checkpoint(future.result(), checkpoint_file)
+
+def _checkpoint(record, checkpoint_file):
+    """Append the result to the checkpoint file, if any, and return it"""
+    if checkpoint_file:
+        checkpoint_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        checkpoint_file.flush()
+    return record
+
+def _read_requests(input_file):
+    """Parse the JSONL requests, skipping blank lines and handing on the error of a line that is not JSON"""
+    for line in input_file:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+def main():
+    """Command line entry point, reads requests as JSONL and writes results as JSONL"""
+    parser = argparse.ArgumentParser(
+        description="Run a JSONL file of {agent_name, message, thread_id?} requests through AI Foundry agents"
+    )
+    parser.add_argument("input", help="JSONL file with the requests, - for stdin")
+    parser.add_argument("--output", help="JSONL file for the results, also used as checkpoint (default: stdout)")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="Maximum number of requests in flight")
+    existing = parser.add_mutually_exclusive_group()
+    existing.add_argument("--resume", action="store_true",
+                          help="Keep the results already in --output and skip their requests")
+    existing.add_argument("--overwrite", action="store_true", help="Replace the results already in --output")
+    args = parser.parse_args()
+
+    if (args.resume or args.overwrite) and not args.output:
+        parser.error("--resume and --overwrite require --output")
+    if args.output and not args.resume and os.path.exists(args.output):
+        if not args.overwrite:
+            parser.error(f"{args.output} already exists, pass --resume to continue it or --overwrite to replace it")
+        os.remove(args.output)
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+    succeeded = failed = 0
+    start = time.perf_counter()
+    try:
+        for record in invoke_agents_batch(_read_requests(input_file), args.max_concurrency, args.output):
+            if record["error"]:
+                failed += 1
+            else:
+                succeeded += 1
+            if not args.output:
+                print(json.dumps(record, ensure_ascii=False, default=str), flush=True)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        from .agent import close_sessions
+        close_sessions()
+    print(f"Completed {succeeded} requests, {failed} failed in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
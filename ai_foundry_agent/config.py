@@ -0,0 +1,325 @@
+"""
+Agent configuration for the AI Foundry Agent package.
+
+Each agent defined in agent_config.yaml is parsed once into an immutable AgentConfig
+and cached by agent name, so concurrent invocations for different agents never share
+mutable state.
+
+agent_config.yaml and ai_foundry.env are read once per version, by modification time
+and size. When they change, the configurations of the agents whose section or
+environment changed are swapped for new ones, and the sessions of those agents are
+replaced on their next invocation. If the new files or an agent's new section are
+invalid, the last good configuration is kept. Errors are raised as AgentConfigError.
+"""
+
+import logging
+import os
+import threading
+import time
+import yaml
+from dotenv import dotenv_values
+from .approvals import approval_policy_from_config
+from .conversation import conversation_policy_from_config
+from .logger import _log_message
+from .mcp_servers import mcp_servers_from_config
+from .polling import poll_strategy_from_config
+from .rate_limit import rate_limit_policy_from_config
+from .response_cache import response_cache_from_config
+from .single_flight import SingleFlight
+from .tool_catalog import tool_catalog_policy_from_config
+
+# Directory holding agent_config.yaml and ai_foundry.env
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Response modes: the whole thread or only the messages of the current turn
+RESPONSE_MODES = ("full", "delta")
+
+# Which runs get their steps fetched and logged
+RUN_STEPS_MODES = ("always", "failed", "sample", "never")
+
+class AgentConfig:
+    """Immutable configuration of a single agent from agent_config.yaml"""
+
+    __slots__ = (
+        "agent_name",
+        "agent_description",
+        "agent_instructions",
+        "mcp_servers",
+        "approval_policy",
+        "logging_enabled",
+        "log_path",
+        "log_level",
+        "log_max_bytes",
+        "log_backup_count",
+        "delete_agent_after_run",
+        "agent_pool_size",
+        "agent_pool_idle_timeout",
+        "ignore_existing_agent",
+        "agent_index_path",
+        "poll_strategy",
+        "response_mode",
+        "run_steps",
+        "run_steps_sample_rate",
+        "response_cache",
+        "conversation",
+        "rate_limit",
+        "tool_catalog",
+        "model_deployment_name",
+        "project_endpoint",
+    )
+
+    def __init__(self, agent_name, values, model_deployment_name=None, project_endpoint=None):
+        """Build the configuration from an agent section of agent_config.yaml"""
+        settings = {
+            "agent_name": agent_name,
+            "agent_description": values.get("Agent_Description", ""),
+            "agent_instructions": values.get("Agent_Instruction"),
+            "mcp_servers": mcp_servers_from_config(values),
+            "approval_policy": approval_policy_from_config(values.get("Approval_Policy")),
+            "logging_enabled": values.get("Logging", True),
+            "log_path": values.get("Log_Path", "logs/agent_logs.txt"),
+            "log_level": str(values.get("Log_Level", "INFO")).upper(),
+            "log_max_bytes": int(values.get("Log_Max_Bytes", 10 * 1024 * 1024)),
+            "log_backup_count": int(values.get("Log_Backup_Count", 5)),
+            "delete_agent_after_run": values.get("Delete_Agent_After_Run", False),
+            "agent_pool_size": int(values.get("Agent_Pool_Size", 0)),
+            "agent_pool_idle_timeout": float(values.get("Agent_Pool_Idle_Timeout", 60)),
+            "ignore_existing_agent": values.get("Ignore_Existing_Agent", False),
+            "agent_index_path": values.get("Agent_Index_Path") or None,
+            "poll_strategy": poll_strategy_from_config(values.get("Poll_Strategy")),
+            "response_mode": values.get("Response_Mode", "full"),
+            "run_steps": str(values.get("Run_Steps", "failed")).lower(),
+            "run_steps_sample_rate": float(values.get("Run_Steps_Sample_Rate", 0.01)),
+            "response_cache": response_cache_from_config(values.get("Response_Cache")),
+            "conversation": conversation_policy_from_config(values.get("Conversation")),
+            "rate_limit": rate_limit_policy_from_config(values.get("Rate_Limit")),
+            "tool_catalog": tool_catalog_policy_from_config(values.get("Tool_Catalog")),
+            "model_deployment_name": model_deployment_name,
+            "project_endpoint": project_endpoint,
+        }
+        if not isinstance(logging.getLevelName(settings["log_level"]), int):
+            raise ValueError(f"Unknown Log_Level '{settings['log_level']}'")
+        if settings["response_mode"] not in RESPONSE_MODES:
+            raise ValueError(f"Unknown Response_Mode '{settings['response_mode']}', expected one of: {', '.join(RESPONSE_MODES)}")
+        if settings["agent_pool_size"] < 0:
+            raise ValueError("Agent_Pool_Size must not be negative")
+        if settings["agent_pool_idle_timeout"] < 0:
+            raise ValueError("Agent_Pool_Idle_Timeout must not be negative")
+        if settings["run_steps"] not in RUN_STEPS_MODES:
+            raise ValueError(f"Unknown Run_Steps '{settings['run_steps']}', expected one of: {', '.join(RUN_STEPS_MODES)}")
+        if not 0 <= settings["run_steps_sample_rate"] <= 1:
+            raise ValueError("Run_Steps_Sample_Rate must be between 0 and 1")
+        for name, value in settings.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"AgentConfig is immutable, cannot set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"AgentConfig is immutable, cannot delete '{name}'")
+
+    def __repr__(self):
+        servers = ", ".join(f"{server.label}={server.url}" for server in self.mcp_servers)
+        return f"AgentConfig(agent_name={self.agent_name!r}, mcp_servers=[{servers}])"
+
+class AgentConfigError(ValueError):
+    """Missing or invalid agent_config.yaml, or an unknown or invalid agent configuration"""
+
+class AgentNotFoundError(AgentConfigError):
+    """Agent name without a section in agent_config.yaml"""
+
+# Seconds between checks of agent_config.yaml and ai_foundry.env for changes
+RELOAD_CHECK_INTERVAL = 2.0
+
+# Parsed configurations cached by agent name
+_agent_configs = {}
+_agent_configs_lock = threading.Lock()
+
+# Agent section and environment each configuration parsed from the files was built from
+_agent_config_sources = {}
+
+# Last good parse of the config files: the file versions and the agent sections
+_config_files = None
+
+# File versions that failed to parse, not parsed again until the files change
+_failed_versions = None
+
+# Monotonic time of the next check of the config files for changes
+_next_check = 0.0
+
+# Variables set from ai_foundry.env rather than the environment, updated when the file changes
+_env_file_keys = set()
+
+# Concurrent first loads of an agent share one parse, different agents parse in parallel
+_config_flight = SingleFlight("config_parse")
+
+# Concurrent checks that find the files changed share one reload
+_reload_flight = SingleFlight("config_reload")
+
+def _config_file_paths():
+    return os.path.join(CONFIG_DIR, 'agent_config.yaml'), os.path.join(CONFIG_DIR, 'ai_foundry.env')
+
+def _file_version(path):
+    """Modification time and size of a file, None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _config_versions():
+    """Versions of agent_config.yaml and ai_foundry.env"""
+    return tuple(_file_version(path) for path in _config_file_paths())
+
+def _load_env_file(env_file_path):
+    """Set the variables of ai_foundry.env, without overriding those set in the environment like load_dotenv"""
+    for key, value in dotenv_values(env_file_path).items():
+        if value is not None and (key not in os.environ or key in _env_file_keys):
+            os.environ[key] = value
+            _env_file_keys.add(key)
+
+def _read_config_files():
+    """Parse agent_config.yaml and ai_foundry.env, returns their versions and the agent sections"""
+    config_file_path, env_file_path = _config_file_paths()
+    # Taken before reading, so a change during the read is picked up by the next check
+    versions = _config_versions()
+    _load_env_file(env_file_path)
+    try:
+        with open(config_file_path, 'r') as config_file:
+            agent_sections = yaml.safe_load(config_file)
+    except FileNotFoundError as e:
+        raise AgentConfigError(f"agent_config.yaml file not found at {config_file_path}, "
+                               "please ensure it exists in the same directory as agent.py") from e
+    except yaml.YAMLError as e:
+        raise AgentConfigError(f"Error parsing YAML file: {e}") from e
+    if not isinstance(agent_sections, dict):
+        raise AgentConfigError(f"{config_file_path} must map agent names to their configuration")
+    return versions, agent_sections
+
+def _build_config(input_agent_name, agent_sections):
+    """Build the AgentConfig of an agent from the agent sections and the environment, with its source"""
+    if input_agent_name not in agent_sections:
+        raise AgentNotFoundError(f"Agent '{input_agent_name}' not found in configuration. "
+                               f"Available agents: {list(agent_sections)}")
+
+    # Get AI Foundry Configuration from environment variables
+    source = (agent_sections[input_agent_name] or {}, os.getenv("MODEL_DEPLOYMENT_NAME"), os.getenv("PROJECT_ENDPOINT"))
+    try:
+        agent_config = AgentConfig(input_agent_name, source[0], model_deployment_name=source[1],
+                                   project_endpoint=source[2])
+    except (ValueError, TypeError) as e:
+        raise AgentConfigError(f"Error in configuration of agent '{input_agent_name}': {e}") from e
+    return agent_config, source
+
+def _load_config(input_agent_name):
+    """Load the agent configuration from YAML file and environment variables, parsed once per agent name and file version"""
+    _check_config_files()
+    with _agent_configs_lock:
+        agent_config = _agent_configs.get(input_agent_name)
+    if agent_config is None:
+        agent_config = _config_flight.do(input_agent_name, _parse_and_cache_config, input_agent_name)
+    return agent_config
+
+def _parse_and_cache_config(input_agent_name):
+    """Parse the agent configuration unless a call that just finished cached it"""
+    with _agent_configs_lock:
+        agent_config = _agent_configs.get(input_agent_name)
+    if agent_config is None:
+        agent_config, source = _parse_config(input_agent_name)
+        with _agent_configs_lock:
+            _agent_configs[input_agent_name] = agent_config
+            _agent_config_sources[input_agent_name] = source
+    return agent_config
+
+def _parse_config(input_agent_name):
+    """Build the AgentConfig from the last good parse of the config files, parsing them on first use"""
+    global _config_files
+    config_files = _config_files
+    if config_files is None:
+        config_files = _read_config_files()
+        with _agent_configs_lock:
+            if _config_files is None:
+                _config_files = config_files
+    return _build_config(input_agent_name, config_files[1])
+
+def _check_config_files():
+    """Reload the configurations when the config files changed, checked at most every RELOAD_CHECK_INTERVAL"""
+    global _next_check
+    if _config_files is None:
+        return
+    now = time.monotonic()
+    if now < _next_check:
+        return
+    _next_check = now + RELOAD_CHECK_INTERVAL
+    versions = _config_versions()
+    if versions != _config_files[0] and versions != _failed_versions:
+        _reload_flight.do(versions, _reload_config_files)
+
+def _reload_config_files():
+    """
+    Parse the config files again and swap in the configurations that changed.
+
+    Returns the names of the agents whose configuration changed and the errors. When the
+    files fail to parse, or the new configuration of an agent is invalid, the last good
+    configuration is kept.
+    """
+    global _config_files, _failed_versions
+    with _agent_configs_lock:
+        loaded = {name: (_agent_configs[name], source) for name, source in _agent_config_sources.items()}
+
+    try:
+        config_files = _read_config_files()
+    except AgentConfigError as e:
+        _failed_versions = _config_versions()
+        for agent_config, _ in loaded.values():
+            _log_message(agent_config, f"Keeping the last good configuration, reloading failed: {e}", level=logging.WARNING)
+        return [], [str(e)]
+
+    changed, errors = {}, []
+    for name, (old_config, old_source) in loaded.items():
+        try:
+            agent_config, source = _build_config(name, config_files[1])
+        except AgentConfigError as e:
+            errors.append(str(e))
+            _log_message(old_config, f"Keeping the last good configuration: {e}", level=logging.WARNING)
+            continue
+        if source != old_source:
+            changed[name] = (agent_config, source)
+
+    # Swap in all changed configurations at once
+    with _agent_configs_lock:
+        _config_files = config_files
+        _failed_versions = None
+        for name, (agent_config, source) in changed.items():
+            _agent_configs[name] = agent_config
+            _agent_config_sources[name] = source
+    for agent_config, _ in changed.values():
+        _log_message(agent_config, f"Reloaded configuration of agent {agent_config.agent_name}")
+    return list(changed), errors
+
+def load_agent_config(agent_name):
+    """
+    Public method to load and validate the configuration of an agent.
+
+    Only reads agent_config.yaml and ai_foundry.env without importing the Azure SDK, so
+    clients can check an agent name before their first call. Raises AgentConfigError
+    when the files or the agent's configuration are missing or invalid.
+    """
+    return _load_config(agent_name)
+
+def reload_config():
+    """
+    Public method to reload agent_config.yaml and ai_foundry.env right away.
+
+    Configurations are also reloaded when the files change, checked at most every
+    RELOAD_CHECK_INTERVAL seconds. Agents whose configuration changed get new sessions on
+    their next invocation, the others keep theirs. Returns the names of the changed agents,
+    and raises AgentConfigError after swapping them in if the files or an agent's new
+    configuration are invalid, keeping the last good configuration for those.
+    """
+    if _config_files is None:
+        return []
+    changed, errors = _reload_flight.do(_config_versions(), _reload_config_files)
+    if errors:
+        raise AgentConfigError("; ".join(errors))
+    return changed
@@ -0,0 +1,218 @@
+"""
+Conversation context management for the AI Foundry Agent package.
+
+Every run of a thread sends the whole thread to the model, so long conversations get
+slower and more expensive with each turn. With the `Conversation` section of
+agent_config.yaml, sessions track the turns, messages and prompt tokens of each thread
+and, once a thread is over its budget, continue the conversation in a new thread seeded
+with a summary of the old one or only its last turns:
+
+    Conversation:
+      Enabled: true
+      Max_Prompt_Tokens: 8000   # Roll over once a run of the thread used more prompt tokens
+      Max_Messages: 40          # Roll over once the thread holds more messages, 0 for no limit
+      Rollover: "summary"       # Options: summary, last_turns
+      Keep_Turns: 2             # Most recent turns copied into the new thread
+
+The rollover happens before the turn that would exceed the budget. Its results carry the
+new thread ID, and the old thread ID keeps resolving to the new thread, so callers that
+hold on to either continue the same conversation. Prompt tokens are taken from the usage
+of the runs, estimated from the message lengths when the service reports none.
+"""
+
+import threading
+from collections import OrderedDict, deque
+
+ROLLOVER_MODES = ("summary", "last_turns")
+
+# Asked in the old thread to seed the new one with Rollover "summary"
+SUMMARY_PROMPT = (
+    "Summarize our conversation so far in a few sentences for your own reference, keeping the facts, "
+    "figures and open questions needed to continue it. Do not call any tools."
+)
+
+class ConversationPolicy:
+    """Immutable budget and rollover settings of an agent's conversations"""
+
+    __slots__ = ("max_prompt_tokens", "max_messages", "rollover", "keep_turns", "summary_prompt")
+
+    def __init__(self, max_prompt_tokens=8000, max_messages=0, rollover="summary", keep_turns=2,
+                 summary_prompt=SUMMARY_PROMPT):
+        if max_prompt_tokens < 0 or max_messages < 0:
+            raise ValueError("Conversation Max_Prompt_Tokens and Max_Messages must not be negative")
+        if not max_prompt_tokens and not max_messages:
+            raise ValueError("Conversation requires Max_Prompt_Tokens or Max_Messages")
+        if rollover not in ROLLOVER_MODES:
+            raise ValueError(f"Unknown Conversation Rollover '{rollover}', expected one of: {', '.join(ROLLOVER_MODES)}")
+        if keep_turns < 0:
+            raise ValueError("Conversation Keep_Turns must not be negative")
+        object.__setattr__(self, "max_prompt_tokens", max_prompt_tokens)
+        object.__setattr__(self, "max_messages", max_messages)
+        object.__setattr__(self, "rollover", rollover)
+        object.__setattr__(self, "keep_turns", keep_turns)
+        object.__setattr__(self, "summary_prompt", summary_prompt)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ConversationPolicy is immutable, cannot set '{name}'")
+
+    def __repr__(self):
+        return (f"ConversationPolicy(max_prompt_tokens={self.max_prompt_tokens}, max_messages={self.max_messages}, "
+                f"rollover={self.rollover!r}, keep_turns={self.keep_turns})")
+
+def conversation_policy_from_config(values):
+    """Build the conversation policy from the Conversation section of an agent configuration, None if disabled"""
+    if not values or not values.get("Enabled", False):
+        return None
+    return ConversationPolicy(
+        max_prompt_tokens=int(values.get("Max_Prompt_Tokens", 8000)),
+        max_messages=int(values.get("Max_Messages", 0)),
+        rollover=str(values.get("Rollover", "summary")).lower(),
+        keep_turns=int(values.get("Keep_Turns", 2)),
+        summary_prompt=values.get("Summary_Prompt") or SUMMARY_PROMPT,
+    )
+
+def _estimate_tokens(text):
+    """Rough token count of a text, about four characters per token"""
+    return len(text or "") // 4 + 1
+
+def _turn_messages(results):
+    """Messages of the last turn of conversation results: its user message and the answers after it"""
+    response = results.get("response") or []
+    for index in range(len(response) - 1, -1, -1):
+        if response[index].get("role") == "USER":
+            return response[index:]
+    return response
+
+def _summary_text(results):
+    """Text of the agent's answer to the summary prompt"""
+    return "\n".join(message.get("content", "") for message in _turn_messages(results)
+                     if message.get("role") == "ASSISTANT")
+
+class _ConversationState:
+    """Counters of one conversation in its current thread"""
+
+    def __init__(self, keep_turns, previous=None):
+        self.turns = 0
+        self.messages = 0
+        self.prompt_tokens = 0
+        self.estimated_tokens = 0
+        self.recent_turns = deque(maxlen=keep_turns)
+        self.last_answer_tokens = 0
+        # Carried over from the threads the conversation rolled over from
+        self.rollovers = previous.rollovers + 1 if previous else 0
+        self.rolled_over_from = None
+        self.tokens_saved = previous.tokens_saved if previous else 0
+        self.saved_per_turn = previous.saved_per_turn if previous else 0
+        self.rollover_tokens = previous.rollover_tokens if previous else 0
+        # Prompt tokens the old thread would have needed before the next user message, until measured
+        self.baseline = previous.prompt_tokens + previous.last_answer_tokens if previous else None
+
+class ConversationTracker:
+    """Thread-safe, bounded tracker of the conversations of a session by thread ID"""
+
+    def __init__(self, policy, max_threads=1000):
+        self.policy = policy
+        self.max_threads = max_threads
+        self._states = OrderedDict()
+        self._aliases = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, thread_id):
+        """Return the thread the conversation of the thread ID continues in"""
+        with self._lock:
+            while thread_id in self._aliases:
+                thread_id = self._aliases[thread_id]
+            return thread_id
+
+    def needs_rollover(self, thread_id):
+        """True when the thread is over the budget and the next turn should start a new thread"""
+        with self._lock:
+            state = self._states.get(thread_id)
+            if state is None or not state.turns:
+                return False
+            policy = self.policy
+            return bool((policy.max_prompt_tokens and state.prompt_tokens > policy.max_prompt_tokens)
+                        or (policy.max_messages and state.messages > policy.max_messages))
+
+    def seed_messages(self, thread_id, summary=None):
+        """(role, content) pairs starting the new thread: the summary, then the most recent turns"""
+        with self._lock:
+            state = self._states.get(thread_id)
+            recent_turns = list(state.recent_turns) if state else []
+        seed = []
+        if summary:
+            seed.append(("user", f"Summary of our conversation so far:\n{summary}"))
+            seed.append(("assistant", "Understood, I will continue from this summary."))
+        for turn in recent_turns:
+            for message in turn:
+                role = message.get("role")
+                if role in ("USER", "ASSISTANT"):
+                    seed.append(("user" if role == "USER" else "assistant", message.get("content", "")))
+        return seed
+
+    def rolled_over(self, thread_id, new_thread_id, seed, rollover_tokens=0):
+        """Continue the conversation of the thread in the new thread seeded with the seed messages"""
+        with self._lock:
+            previous = self._states.get(thread_id)
+            state = _ConversationState(self.policy.keep_turns, previous)
+            state.rolled_over_from = thread_id
+            state.rollover_tokens += rollover_tokens
+            state.messages = len(seed)
+            state.estimated_tokens = sum(_estimate_tokens(content) for _, content in seed)
+            self._states[new_thread_id] = state
+            self._states.pop(thread_id, None)
+            self._aliases[thread_id] = new_thread_id
+            self._evict()
+
+    def record_turn(self, thread_id, results):
+        """Count the messages and tokens of a finished turn, returns the tokens it saved by earlier rollovers"""
+        turn = _turn_messages(results)
+        turn_tokens = sum(_estimate_tokens(message.get("content")) for message in turn)
+        usage = results.get("usage") or {}
+        with self._lock:
+            state = self._states.get(thread_id)
+            if state is None:
+                state = self._states[thread_id] = _ConversationState(self.policy.keep_turns)
+            self._states.move_to_end(thread_id)
+            state.turns += 1
+            state.messages += len(turn)
+            state.estimated_tokens += turn_tokens
+            state.prompt_tokens = usage.get("prompt_tokens") or state.estimated_tokens
+            state.last_answer_tokens = sum(_estimate_tokens(message.get("content")) for message in turn
+                                           if message.get("role") != "USER")
+            if state.baseline is not None:
+                # The old thread would have sent its history plus this user message
+                user_tokens = turn_tokens - state.last_answer_tokens
+                state.saved_per_turn += max(0, state.baseline + user_tokens - state.prompt_tokens)
+                state.baseline = None
+            state.recent_turns.append(tuple(turn))
+            state.tokens_saved += state.saved_per_turn
+            self._evict()
+            return state.saved_per_turn
+
+    def stats(self, thread_id):
+        """Turns, messages and tokens of the conversation continuing in the thread, None if not tracked"""
+        with self._lock:
+            state = self._states.get(thread_id)
+            if state is None:
+                return None
+            return {
+                "turns": state.turns,
+                "messages": state.messages,
+                "prompt_tokens": state.prompt_tokens,
+                "rollovers": state.rollovers,
+                "rolled_over_from": state.rolled_over_from,
+                "tokens_saved": state.tokens_saved,
+                "rollover_tokens": state.rollover_tokens,
+            }
+
+    def discard(self, thread_id):
+        """Forget the conversation of the thread, e.g. after it was deleted"""
+        with self._lock:
+            self._states.pop(thread_id, None)
+
+    def _evict(self):
+        while len(self._states) > self.max_threads:
+            self._states.popitem(last=False)
+        while len(self._aliases) > self.max_threads:
+            self._aliases.popitem(last=False)
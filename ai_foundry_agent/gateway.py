@@ -0,0 +1,696 @@
+"""
+HTTP gateway for the AI Foundry Agent package.
+
+Serves the agents of agent_config.yaml over HTTP as an ASGI application, so consumers
+share the warm sessions, agents and connection pools of the gateway instead of building
+their own clients in every process:
+
+    POST /agents/{name}/invoke   {"message": ..., "thread_id"?: ..., "response_mode"?: ...}
+                                 answers with the invoke_agent results as JSON
+    POST /agents/{name}/stream   same request, answers with the stream_agent events as
+                                 server-sent events: "event: <type>" and "data: <json>"
+    GET  /healthz                status of the worker, or of all workers behind the router
+    GET  /metrics                counters, gauges and histograms in the Prometheus text format
+
+Turns run on the cached agent sessions of the process, on a thread pool bounded by
+--max-concurrency, and turns on the same thread_id run one after the other. Responses
+carry the worker that served them in X-Gateway-Worker and the thread in X-Thread-Id.
+
+With --workers above 1, each worker is a uvicorn process on a loopback port and the
+public port is served by a router that sends the turns of a conversation to the worker
+that started it, so its thread history, conversation budget and remembered approvals stay
+in one process. New conversations go to the worker with the fewest requests in flight.
+Workers that crash are restarted. Each worker writes the agent logs to files of its own,
+agent_logs.worker-1.txt for worker 1 with the default Log_Path.
+
+Command line usage (needs the `gateway` extra, which installs uvicorn):
+    ai-foundry-gateway [--host 127.0.0.1] [--port 8080] [--workers 4] [--agents snowflake-cortex-mcp]
+"""
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import functools
+import importlib
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+import weakref
+import zlib
+
+from .config import RESPONSE_MODES, AgentConfigError, AgentNotFoundError
+from .metrics import _count, _observe, _set_gauge, render_metrics
+
+# Agent endpoints, the agent name and the action
+_AGENT_ROUTE = re.compile(r"^/agents/([^/]+)/(invoke|stream)$")
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 1024 * 1024
+
+# Seconds between comments sent on an idle event stream, so proxies keep the connection open
+SSE_KEEPALIVE = 15.0
+
+# Threads whose worker the router remembers, least recently used ones are forgotten first
+MAX_AFFINITY_THREADS = 100000
+
+# Response headers the router passes on from the workers
+_FORWARDED_HEADERS = {"content-type", "cache-control", "x-gateway-worker", "x-thread-id"}
+
+class _HTTPError(Exception):
+    """Request answered with an error status and message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _header_list(headers):
+    return [(name.lower().encode("latin-1"), str(value).encode("latin-1")) for name, value in headers.items()]
+
+async def _send_response(send, status, body, content_type="application/json", headers=None):
+    """Send a complete response, body is JSON encoded unless it is already bytes"""
+    if not isinstance(body, bytes):
+        body = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": _header_list({"Content-Type": content_type, "Content-Length": len(body), **(headers or {})}),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+async def _read_body(receive):
+    """Read the request body, refusing bodies over MAX_BODY_BYTES"""
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise _HTTPError(400, "Client disconnected before sending the request")
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise _HTTPError(413, f"Request body over {MAX_BODY_BYTES} bytes")
+        if not message.get("more_body"):
+            return bytes(body)
+
+def _parse_request(body):
+    """Message, thread ID and response mode of an agent request"""
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        raise _HTTPError(400, "Request body must be JSON") from None
+    if not isinstance(request, dict) or not isinstance(request.get("message"), str) or not request["message"]:
+        raise _HTTPError(400, "Requests need a message")
+    thread_id = request.get("thread_id")
+    if thread_id is not None and not isinstance(thread_id, str):
+        raise _HTTPError(400, "thread_id must be a string")
+    response_mode = request.get("response_mode")
+    if response_mode is not None and response_mode not in RESPONSE_MODES:
+        raise _HTTPError(400, f"Unknown response_mode '{response_mode}', expected one of: {', '.join(RESPONSE_MODES)}")
+    return request["message"], thread_id or None, response_mode
+
+def _error_status(error):
+    """HTTP status of an error raised by a turn"""
+    if isinstance(error, _HTTPError):
+        return error.status
+    if isinstance(error, AgentNotFoundError):
+        return 404
+    if isinstance(error, AgentConfigError):
+        return 500
+    # The agents service or an MCP server failed the turn
+    return 502
+
+def _sse(event_type, data):
+    """Server-sent event frame"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event_type}\ndata: {payload}\n\n".encode("utf-8")
+
+class _ThreadLocks:
+    """Locks per thread ID, so turns of the same conversation never run concurrently, dropped once unused"""
+
+    def __init__(self):
+        self._locks = weakref.WeakValueDictionary()
+
+    def get(self, thread_id):
+        lock = self._locks.get(thread_id)
+        if lock is None:
+            lock = self._locks[thread_id] = asyncio.Lock()
+        return lock
+
+# Returned by _EventPump.next when no event came within the keepalive interval
+_KEEPALIVE = object()
+
+class _EventPump:
+    """Pulls the events of a stream_agent generator on the executor, one at a time"""
+
+    def __init__(self, events, executor):
+        self._events = events
+        self._executor = executor
+        self._pending = None
+
+    async def next(self, timeout):
+        """Next event, None when the turn ended, or _KEEPALIVE when none came within the timeout"""
+        if self._pending is None:
+            self._pending = asyncio.get_running_loop().run_in_executor(self._executor, next, self._events, None)
+        done, _ = await asyncio.wait({self._pending}, timeout=timeout)
+        if not done:
+            return _KEEPALIVE
+        future, self._pending = self._pending, None
+        return future.result()
+
+    def close(self):
+        """End the turn, once the event being pulled, if any, arrived"""
+        def close_events(_=None):
+            try:
+                self._executor.submit(self._events.close)
+            except RuntimeError:
+                # The executor shut down, close inline
+                self._events.close()
+
+        if self._pending is None:
+            close_events()
+        else:
+            self._pending.add_done_callback(close_events)
+
+def _warm_agent(agent_name):
+    """Create the session of the agent and resolve its agent, so the first request doesn't pay for it"""
+    from .agent import _get_session
+
+    _get_session(agent_name).warm()
+
+class GatewayApp:
+    """ASGI application serving the agents of this process over HTTP"""
+
+    def __init__(self, worker_id=0, max_concurrency=32, warm_agents=()):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.worker_id = worker_id
+        self.max_concurrency = max_concurrency
+        self.warm_agents = tuple(warm_agents)
+        self.started = time.time()
+        self._executor = None
+        self._thread_locks = _ThreadLocks()
+        self._agents = set()
+        self._in_flight = 0
+
+    @property
+    def executor(self):
+        """Thread pool the turns run on, created on first use when the server skips the lifespan events"""
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix=f"gateway-{self.worker_id}"
+            )
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": f"{type(e).__name__}: {e}"})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def startup(self):
+        """Warm the sessions and agents of warm_agents, failing the startup on an unknown or broken agent"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_agent, name) for name in self.warm_agents))
+        self._agents.update(self.warm_agents)
+
+    async def shutdown(self):
+        """Close the cached sessions, deleting pooled agents and waiting for pending cleanup"""
+        if self._executor is None:
+            return
+        from .agent import close_sessions
+
+        await asyncio.get_running_loop().run_in_executor(self._executor, close_sessions)
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _headers(self, thread_id=None):
+        headers = {"X-Gateway-Worker": self.worker_id}
+        if thread_id:
+            headers["X-Thread-Id"] = thread_id
+        return headers
+
+    async def _http(self, scope, receive, send):
+        method, path = scope["method"], scope["path"]
+        if path == "/healthz":
+            await _send_response(send, 200, {
+                "status": "ok",
+                "worker": self.worker_id,
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 1),
+                "in_flight": self._in_flight,
+                "agents": sorted(self._agents),
+            }, headers=self._headers())
+            return
+        if path == "/metrics":
+            await _send_response(send, 200, render_metrics().encode("utf-8"),
+                                 content_type="text/plain; version=0.0.4; charset=utf-8", headers=self._headers())
+            return
+        match = _AGENT_ROUTE.match(path)
+        if not match:
+            await _send_response(send, 404, {"error": f"No route for {path}"}, headers=self._headers())
+            return
+        if method != "POST":
+            await _send_response(send, 405, {"error": "Use POST"}, headers={**self._headers(), "Allow": "POST"})
+            return
+
+        agent_name, action = match.groups()
+        start = time.perf_counter()
+        self._in_flight += 1
+        _set_gauge("ai_foundry_agent_gateway_in_flight", self._in_flight)
+        status = 500
+        try:
+            if action == "invoke":
+                status = await self._invoke(receive, send, agent_name)
+            else:
+                status = await self._stream(receive, send, agent_name)
+        finally:
+            self._in_flight -= 1
+            _set_gauge("ai_foundry_agent_gateway_in_flight", self._in_flight)
+            _count("ai_foundry_agent_gateway_requests_total", route=action, status=str(status))
+            _observe("ai_foundry_agent_gateway_request_seconds", time.perf_counter() - start, route=action)
+
+    async def _session(self, agent_name):
+        """Session of the agent, created on the executor when it is not cached yet"""
+        from .agent import _get_session
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, _get_session, agent_name)
+
+    @contextlib.asynccontextmanager
+    async def _conversation_lock(self, session, thread_id):
+        """Hold the lock of the thread the conversation continues in, so its turns never run concurrently"""
+        if not thread_id:
+            yield
+            return
+        while True:
+            # Keyed by the thread after rollovers, which callers holding the old or the new ID both end up in
+            resolved = session.resolve_thread(thread_id)
+            async with self._thread_locks.get(resolved):
+                # The turn that held the lock may have rolled the conversation over to a new thread
+                if session.resolve_thread(thread_id) == resolved:
+                    yield
+                    return
+
+    async def _invoke(self, receive, send, agent_name):
+        """Answer with the results of the turn, returns the status sent"""
+        from .agent import invoke_agent
+
+        try:
+            message, thread_id, response_mode = _parse_request(await _read_body(receive))
+            turn = functools.partial(invoke_agent, agent_name, message, thread_id, response_mode)
+            loop = asyncio.get_running_loop()
+            session = await self._session(agent_name) if thread_id else None
+            async with self._conversation_lock(session, thread_id):
+                results = await loop.run_in_executor(self.executor, turn)
+        except Exception as e:
+            status = _error_status(e)
+            await _send_response(send, status, {"error": f"{type(e).__name__}: {e}"}, headers=self._headers())
+            return status
+        self._agents.add(agent_name)
+        await _send_response(send, 200, results, headers=self._headers(results.get("thread_id")))
+        return 200
+
+    async def _stream(self, receive, send, agent_name):
+        """Send the events of the turn as server-sent events, returns the status sent"""
+        try:
+            message, thread_id, response_mode = _parse_request(await _read_body(receive))
+        except _HTTPError as e:
+            await _send_response(send, e.status, {"error": str(e)}, headers=self._headers())
+            return e.status
+        try:
+            session = await self._session(agent_name) if thread_id else None
+        except Exception as e:
+            status = _error_status(e)
+            await _send_response(send, status, {"error": f"{type(e).__name__}: {e}"}, headers=self._headers())
+            return status
+        async with self._conversation_lock(session, thread_id):
+            return await self._stream_turn(receive, send, agent_name, message, thread_id, response_mode)
+
+    async def _stream_turn(self, receive, send, agent_name, message, thread_id, response_mode):
+        from .agent import stream_agent
+
+        loop = asyncio.get_running_loop()
+        pump = None
+        started = False
+        disconnected = asyncio.Event()
+        watcher = loop.create_task(self._watch_disconnect(receive, disconnected))
+        try:
+            events = await loop.run_in_executor(self.executor, functools.partial(
+                stream_agent, agent_name, message, thread_id, response_mode
+            ))
+            pump = _EventPump(events, self.executor)
+            # Wait for the first event, so errors before the turn started get their status and
+            # the thread created for the turn can be sent in X-Thread-Id for the router's affinity
+            event = await pump.next(None)
+            first_thread = event["thread_id"] if event and event["type"] == "thread" else thread_id
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": _header_list({"Content-Type": "text/event-stream", "Cache-Control": "no-cache",
+                                         **self._headers(first_thread)}),
+            })
+            started = True
+            self._agents.add(agent_name)
+            while event is not None and not disconnected.is_set():
+                if event is _KEEPALIVE:
+                    await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+                else:
+                    await send({"type": "http.response.body", "body": _sse(event["type"], event), "more_body": True})
+                event = await pump.next(SSE_KEEPALIVE)
+            return 200
+        except Exception as e:
+            if not started:
+                status = _error_status(e)
+                await _send_response(send, status, {"error": f"{type(e).__name__}: {e}"}, headers=self._headers())
+                return status
+            if not disconnected.is_set():
+                await send({"type": "http.response.body", "more_body": True,
+                            "body": _sse("error", {"type": "error", "error": f"{type(e).__name__}: {e}"})})
+            return 200
+        finally:
+            watcher.cancel()
+            if pump:
+                pump.close()
+            if started and not disconnected.is_set():
+                await send({"type": "http.response.body", "body": b""})
+
+    @staticmethod
+    async def _watch_disconnect(receive, disconnected):
+        """Set the event once the client went away, ending the stream"""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+                return
+
+def _merge_metrics(sources):
+    """Merge Prometheus text outputs by (worker label, text), keeping the samples of a metric together"""
+    families = collections.OrderedDict()
+    for worker, text in sources:
+        family = None
+        for line in text.splitlines():
+            if line.startswith("# TYPE "):
+                family = line.split()[2]
+                families.setdefault(family, [line])
+            elif line and not line.startswith("#") and family:
+                name, brace, rest = line.partition("{")
+                if brace:
+                    families[family].append(f'{name}{{worker="{worker}",{rest}')
+                else:
+                    name, _, value = line.partition(" ")
+                    families[family].append(f'{name}{{worker="{worker}"}} {value}')
+    return "\n".join(line for lines in families.values() for line in lines) + "\n"
+
+class GatewayRouter:
+    """ASGI application forwarding agent requests to the worker processes, keeping conversations on one worker"""
+
+    def __init__(self, worker_urls, max_threads=MAX_AFFINITY_THREADS):
+        if not worker_urls:
+            raise ValueError("The router needs at least one worker")
+        self.worker_urls = [url.rstrip("/") for url in worker_urls]
+        self.max_threads = max_threads
+        self._threads = collections.OrderedDict()
+        self._in_flight = [0] * len(self.worker_urls)
+        self._next_worker = 0
+        self._client = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    if self._client:
+                        await self._client.close()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    @property
+    def client(self):
+        """HTTP client to the workers, created on first use on the server's event loop"""
+        if self._client is None:
+            # Imported on first use, the worker processes don't need it
+            import aiohttp
+
+            self._client = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=5),
+                connector=aiohttp.TCPConnector(limit=0),
+            )
+        return self._client
+
+    def _remember(self, thread_id, worker):
+        self._threads[thread_id] = worker
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > self.max_threads:
+            self._threads.popitem(last=False)
+
+    def _pick_worker(self, thread_id):
+        """Worker of the conversation, or the least busy worker for a new one"""
+        if thread_id:
+            worker = self._threads.get(thread_id)
+            if worker is not None:
+                self._threads.move_to_end(thread_id)
+                _count("ai_foundry_agent_gateway_affinity_total", result="hit")
+                return worker
+            # A thread the router has not seen, e.g. after a restart, is spread by its hash and then kept there
+            worker = zlib.crc32(thread_id.encode("utf-8")) % len(self.worker_urls)
+            self._remember(thread_id, worker)
+            _count("ai_foundry_agent_gateway_affinity_total", result="hash")
+            return worker
+        _count("ai_foundry_agent_gateway_affinity_total", result="new")
+        # Start at the next worker in turn, so ties don't all go to the first worker
+        workers = len(self.worker_urls)
+        order = [(self._next_worker + offset) % workers for offset in range(workers)]
+        self._next_worker = (self._next_worker + 1) % workers
+        return min(order, key=self._in_flight.__getitem__)
+
+    async def _http(self, scope, receive, send):
+        path = scope["path"]
+        if path == "/healthz":
+            await self._health(send)
+            return
+        if path == "/metrics":
+            await self._metrics(send)
+            return
+        try:
+            body = await _read_body(receive)
+        except _HTTPError as e:
+            await _send_response(send, e.status, {"error": str(e)})
+            return
+        thread_id = None
+        if _AGENT_ROUTE.match(path):
+            try:
+                request = json.loads(body or b"{}")
+                thread_id = request.get("thread_id") if isinstance(request, dict) else None
+            except ValueError:
+                pass  # The worker answers invalid requests
+        worker = self._pick_worker(thread_id if isinstance(thread_id, str) else None)
+        await self._forward(scope, receive, send, worker, body)
+
+    async def _forward(self, scope, receive, send, worker, body):
+        """Pass the request to the worker and its response back as it arrives"""
+        url = self.worker_urls[worker] + scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        loop = asyncio.get_running_loop()
+        disconnected = asyncio.Event()
+        watcher = loop.create_task(GatewayApp._watch_disconnect(receive, disconnected))
+        self._in_flight[worker] += 1
+        started = False
+        try:
+            async with self.client.request(scope["method"], url, data=body,
+                                           headers={"Content-Type": "application/json"}) as response:
+                thread_id = response.headers.get("X-Thread-Id")
+                if thread_id:
+                    self._remember(thread_id, worker)
+                headers = {name: value for name, value in response.headers.items()
+                           if name.lower() in _FORWARDED_HEADERS}
+                await send({"type": "http.response.start", "status": response.status, "headers": _header_list(headers)})
+                started = True
+                async for chunk in response.content.iter_any():
+                    if disconnected.is_set():
+                        # Closing the connection to the worker ends the turn's stream there
+                        return
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                await send({"type": "http.response.body", "body": b""})
+        except Exception as e:
+            if not started:
+                await _send_response(send, 502, {"error": f"Gateway worker {worker} failed: {type(e).__name__}: {e}"})
+            elif not disconnected.is_set():
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+            self._in_flight[worker] -= 1
+
+    async def _fetch_workers(self, path):
+        """(worker, response text or the exception) of a GET on every worker"""
+        import aiohttp
+
+        async def fetch(worker, url):
+            try:
+                async with self.client.get(url + path, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    return worker, await response.text()
+            except Exception as e:
+                return worker, e
+
+        return await asyncio.gather(*(fetch(worker, url) for worker, url in enumerate(self.worker_urls)))
+
+    async def _health(self, send):
+        workers = []
+        for worker, result in await self._fetch_workers("/healthz"):
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                workers.append({**json.loads(result), "in_flight": self._in_flight[worker]})
+            except Exception as e:
+                workers.append({"worker": worker, "status": "down", "error": f"{type(e).__name__}: {e}"})
+        healthy = sum(worker["status"] == "ok" for worker in workers)
+        status = "ok" if healthy == len(workers) else "degraded" if healthy else "down"
+        await _send_response(send, 200 if healthy else 503, {
+            "status": status,
+            "workers": workers,
+            "threads": len(self._threads),
+        })
+
+    async def _metrics(self, send):
+        sources = [("router", render_metrics())]
+        sources += [(worker, text) for worker, text in await self._fetch_workers("/metrics")
+                    if not isinstance(text, Exception)]
+        await _send_response(send, 200, _merge_metrics(sources).encode("utf-8"),
+                             content_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _resolve_hook(path):
+    """Import the "module:function" worker initialization hook"""
+    module_name, _, function_name = path.partition(":")
+    try:
+        hook = getattr(importlib.import_module(module_name), function_name)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise ValueError(f"Cannot load worker init hook '{path}': {e}") from e
+    if not callable(hook):
+        raise ValueError(f"Worker init hook '{path}' is not callable")
+    return hook
+
+def _run_worker(worker_id, host, port, options):
+    """Serve GatewayApp on the port until the process is told to stop"""
+    import uvicorn
+
+    if options.get("log_per_worker"):
+        # Workers rotate their log files independently, so each writes files of its own
+        from .logger import _set_log_file_suffix
+        _set_log_file_suffix(f"worker-{worker_id}")
+    if options.get("worker_init"):
+        _resolve_hook(options["worker_init"])()
+    app = GatewayApp(worker_id, options["max_concurrency"], options["agents"])
+    uvicorn.run(app, host=host, port=port, log_level=options["log_level"], lifespan="on")
+
+class _WorkerSupervisor:
+    """Starts a worker process per port and restarts the workers that crash"""
+
+    def __init__(self, ports, options, check_interval=1.0):
+        import multiprocessing
+
+        self.ports = ports
+        self.options = options
+        self.check_interval = check_interval
+        self.processes = [None] * len(ports)
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="gateway-supervisor", daemon=True)
+
+    def _start(self, worker_id):
+        process = self._context.Process(
+            target=_run_worker, args=(worker_id, "127.0.0.1", self.ports[worker_id], self.options),
+            name=f"gateway-worker-{worker_id}", daemon=True,
+        )
+        process.start()
+        self.processes[worker_id] = process
+
+    def start(self):
+        for worker_id in range(len(self.ports)):
+            self._start(worker_id)
+        self._thread.start()
+
+    def _watch(self):
+        while not self._stopping.wait(self.check_interval):
+            for worker_id, process in enumerate(self.processes):
+                # Workers exit with 0 when they were told to stop, e.g. Ctrl+C reaching the process group
+                if not process.is_alive() and process.exitcode != 0 and not self._stopping.is_set():
+                    print(f"Gateway worker {worker_id} exited with code {process.exitcode}, restarting", file=sys.stderr)
+                    self._start(worker_id)
+
+    def stop(self, timeout=30.0):
+        """Stop the workers, which close their sessions, and kill those still running after the timeout"""
+        self._stopping.set()
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+def main():
+    """Command line entry point, serves the gateway until interrupted"""
+    parser = argparse.ArgumentParser(description="HTTP gateway serving AI Foundry agents with server-sent events streaming")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, behind a router with conversation affinity above 1")
+    parser.add_argument("--worker-port", type=int, help="Loopback port of the first worker (default: --port + 1)")
+    parser.add_argument("--max-concurrency", type=int, default=32, help="Turns in flight per worker")
+    parser.add_argument("--agents", nargs="*", default=(), help="Agents whose sessions and agents are warmed at startup")
+    parser.add_argument("--worker-init", help="\"module:function\" called in each worker before it serves")
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("the gateway needs uvicorn, install the gateway extra: pip install 'ai-foundry-isv-mcp-agent[gateway]'")
+
+    options = {"max_concurrency": args.max_concurrency, "agents": tuple(args.agents),
+               "worker_init": args.worker_init, "log_level": args.log_level, "log_per_worker": args.workers > 1}
+    if args.workers == 1:
+        _run_worker(0, args.host, args.port, options)
+        return
+
+    first_port = args.worker_port or args.port + 1
+    ports = [first_port + worker_id for worker_id in range(args.workers)]
+    supervisor = _WorkerSupervisor(ports, options)
+    supervisor.start()
+    # uvicorn raises the SIGTERM it handled again once it shut down, exit through the finally below instead of dying
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        router = GatewayRouter([f"http://127.0.0.1:{port}" for port in ports])
+        uvicorn.run(router, host=args.host, port=args.port, log_level=args.log_level, lifespan="on")
+    finally:
+        supervisor.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Conversation history cache for the AI Foundry Agent package.
+
+Sessions keep the conversation results they already returned per thread, so the next
+turn only has to fetch the messages created by its own run instead of listing the
+whole thread again.
+"""
+
+import threading
+from collections import OrderedDict
+
+class ThreadHistory:
+    """Bounded, thread-safe LRU cache of conversation results by thread ID"""
+
+    def __init__(self, max_threads=1000):
+        self.max_threads = max_threads
+        self._threads = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id):
+        """Return the cached conversation results of the thread, or None if unknown"""
+        with self._lock:
+            results = self._threads.get(thread_id)
+            if results is not None:
+                self._threads.move_to_end(thread_id)
+            return results
+
+    def put(self, thread_id, results):
+        """Store the conversation results of the thread, evicting the least recently used thread"""
+        with self._lock:
+            self._threads[thread_id] = results
+            self._threads.move_to_end(thread_id)
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+
+    def discard(self, thread_id):
+        """Forget the thread, e.g. after it was deleted"""
+        with self._lock:
+            self._threads.pop(thread_id, None)
@@ -0,0 +1,212 @@
+"""
+Logging for the AI Foundry Agent package.
+
+Log lines are handed to the stdlib `logging` module through a QueueHandler, so the
+request path only enqueues records. A background QueueListener per log file writes them
+as JSON lines with the agent name, thread ID and run ID, rotating the file by size.
+Processes sharing a Log_Path, such as the workers of the gateway, each write and rotate
+a file of their own, named with the suffix set by `_set_log_file_suffix`.
+
+The thread and run of the current turn are tracked in a context variable, so they are
+attached to every line without being passed to each logging call, for threads and
+asyncio tasks alike.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+# Thread and run IDs of the turn being processed in the current thread or task
+_log_context = contextvars.ContextVar("ai_foundry_agent_log_context", default={})
+
+# Background writers per log file path, and loggers per (agent name, log path)
+_listeners = {}
+_loggers = {}
+_lock = threading.Lock()
+
+# Added to the names of the log files of this process, so it does not rotate the files of others
+_file_suffix = ""
+
+class JsonLineFormatter(logging.Formatter):
+    """Format records as single JSON lines"""
+
+    def format(self, record):
+        entry = {
+            "time": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "agent_name": getattr(record, "agent_name", None),
+            "thread_id": getattr(record, "thread_id", None),
+            "run_id": getattr(record, "run_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _JsonLineFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotating file handler that leaves flushing to the writer and tracks the file size itself"""
+
+    def __init__(self, filename, maxBytes=0, backupCount=0):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding='utf-8')
+        self._size = os.path.getsize(filename) if os.path.exists(filename) else 0
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + self.terminator
+            size = len(line.encode('utf-8'))
+            if self.maxBytes and self._size and self._size + size > self.maxBytes:
+                self.doRollover()
+                self._size = 0
+            if self.stream is None:
+                self.stream = self._open()
+            # Buffered, written out when the writer's queue runs empty
+            self.stream.write(line)
+            self._size += size
+        except Exception:
+            self.handleError(record)
+
+class _BufferedQueueListener(logging.handlers.QueueListener):
+    """Queue listener that flushes its handlers only once the queue has been drained"""
+
+    def dequeue(self, block):
+        if block:
+            try:
+                return self.queue.get_nowait()
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+        return self.queue.get(block)
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that enqueues records as they are, formatting happens on the writer thread"""
+
+    def prepare(self, record):
+        return record
+
+class _AgentLogger(logging.Logger):
+    """Logger that skips the caller lookup, source locations are not part of the log lines"""
+
+    # Configuration whose Log_Level and rotation settings were last applied
+    config = None
+
+    def findCaller(self, stack_info=False, stacklevel=1):
+        return "(unknown file)", 0, "(unknown function)", None
+
+class _AgentContextFilter(logging.Filter):
+    """Attach the agent name and the current thread and run IDs to each record"""
+
+    def __init__(self, agent_name):
+        super().__init__()
+        self.agent_name = agent_name
+
+    def filter(self, record):
+        context = _log_context.get()
+        record.agent_name = self.agent_name
+        record.thread_id = context.get("thread_id")
+        record.run_id = context.get("run_id")
+        return True
+
+def _set_log_file_suffix(suffix):
+    """Write the logs of this process to files of its own, e.g. agent_logs.worker-1.txt for the suffix worker-1"""
+    global _file_suffix
+    _file_suffix = suffix
+
+def _log_file(config):
+    """Absolute path of the agent's log file for this process"""
+    log_path = os.path.abspath(config.log_path)
+    if not _file_suffix:
+        return log_path
+    root, extension = os.path.splitext(log_path)
+    return f"{root}.{_file_suffix}{extension}"
+
+def _get_queue(config):
+    """Return the queue of the background writer for the agent's log file, starting it on first use"""
+    log_path = _log_file(config)
+    listener = _listeners.get(log_path)
+    if listener is None:
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        file_handler = _JsonLineFileHandler(
+            log_path,
+            maxBytes=config.log_max_bytes,
+            backupCount=config.log_backup_count,
+        )
+        file_handler.setFormatter(JsonLineFormatter())
+        listener = _BufferedQueueListener(queue.SimpleQueue(), file_handler)
+        listener.start()
+        _listeners[log_path] = listener
+    return listener.queue
+
+def _apply_settings(logger, config):
+    """Apply the Log_Level and rotation settings of the configuration, called with the lock held"""
+    logger.setLevel(config.log_level)
+    # The file and its writer are shared by the agents logging to it, the last configuration applied wins
+    for handler in _listeners[_log_file(config)].handlers:
+        handler.maxBytes = config.log_max_bytes
+        handler.backupCount = config.log_backup_count
+    logger.config = config
+
+def _get_logger(config):
+    """Return the logger of the agent, creating it and its background writer on first use"""
+    key = (config.agent_name, config.log_path)
+    logger = _loggers.get(key)
+    if logger is not None and logger.config is config:
+        return logger
+
+    with _lock:
+        logger = _loggers.get(key)
+        if logger is None:
+            # Not registered with the logging manager, so each (agent, log file) pair gets its own logger
+            logger = _AgentLogger(f"ai_foundry_agent.{config.agent_name}")
+            logger.propagate = False
+            logger.addFilter(_AgentContextFilter(config.agent_name))
+            logger.addHandler(_RecordQueueHandler(_get_queue(config)))
+            _apply_settings(logger, config)
+            logger.info(f"Starting Logging for Agent {config.agent_name}")
+            _loggers[key] = logger
+        elif logger.config is not config:
+            # The configuration was reloaded
+            _apply_settings(logger, config)
+    return logger
+
+def _log_message(config, message, level=logging.INFO):
+    """Log a message for the agent, or print it when logging is disabled"""
+    if config.logging_enabled:
+        _get_logger(config).log(level, message)
+    else:
+        print(message)
+
+@contextlib.contextmanager
+def log_context():
+    """Scope thread and run IDs set with _update_log_context to the enclosed turn"""
+    token = _log_context.set({})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+def _update_log_context(**values):
+    """Attach IDs such as thread_id or run_id to the following log lines of the current turn"""
+    _log_context.set({**_log_context.get(), **values})
+
+def flush_logs():
+    """Stop the background writers after they have written all queued records"""
+    with _lock:
+        listeners = list(_listeners.values())
+        _listeners.clear()
+        for logger in _loggers.values():
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+        _loggers.clear()
+    for listener in listeners:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+atexit.register(flush_logs)
@@ -0,0 +1,73 @@
+"""
+MCP server settings for the AI Foundry Agent package.
+
+An agent uses one MCP server with the `MCP_Server_Label`, `MCP_Server_URL`,
+`Allowed_Tools`, `Approval_Mode` and `Auth_Token` keys of agent_config.yaml, or several
+with the `MCP_Servers` list, each entry with its own settings:
+
+    MCP_Servers:
+      - Label: "snowflake_cortex_mcp"     # Label to identify the MCP Server
+        URL: "<SNOWFLAKE_MCP_SERVER_URL>" # URL of the MCP Server
+        Auth_Token: "<SNOWFLAKE_PAT>"     # Bearer token for the MCP Server, leave empty if not required
+        Allowed_Tools: []                 # Empty means all tools are allowed
+        Approval_Mode: "never"            # Options: always, never. Defaults to the agent's Approval_Mode
+      - Label: "mongodb_atlas_mcp"
+        URL: "<MONGODB_MCP_SERVER_URL>"
+
+The model can then call the tools of all servers in a single run. Tool calls carry the
+label of their server, which selects the headers sent with their approval.
+"""
+
+class MCPServerConfig:
+    """Immutable settings of one MCP server of an agent"""
+
+    __slots__ = ("label", "url", "allowed_tools", "approval_mode", "auth_token")
+
+    def __init__(self, label, url, allowed_tools=(), approval_mode="never", auth_token=""):
+        if not label:
+            raise ValueError("MCP server Label is required")
+        if not url:
+            raise ValueError(f"MCP server '{label}' requires a URL")
+        object.__setattr__(self, "label", label)
+        object.__setattr__(self, "url", url)
+        object.__setattr__(self, "allowed_tools", tuple(allowed_tools))
+        object.__setattr__(self, "approval_mode", approval_mode)
+        object.__setattr__(self, "auth_token", auth_token or "")
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"MCPServerConfig is immutable, cannot set '{name}'")
+
+    def __repr__(self):
+        return (f"MCPServerConfig(label={self.label!r}, url={self.url!r}, allowed_tools={self.allowed_tools}, "
+                f"approval_mode={self.approval_mode!r})")
+
+def mcp_servers_from_config(values):
+    """Build the MCP servers of an agent configuration, from MCP_Servers or the single server keys"""
+    default_approval_mode = values.get("Approval_Mode", "never")
+    entries = values.get("MCP_Servers")
+    if not entries:
+        if not values.get("MCP_Server_Label") and not values.get("MCP_Server_URL"):
+            return ()
+        return (MCPServerConfig(
+            label=values.get("MCP_Server_Label"),
+            url=values.get("MCP_Server_URL"),
+            allowed_tools=values.get("Allowed_Tools") or (),
+            approval_mode=default_approval_mode,
+            auth_token=values.get("Auth_Token", ""),
+        ),)
+
+    servers = tuple(
+        MCPServerConfig(
+            label=entry.get("Label"),
+            url=entry.get("URL"),
+            allowed_tools=entry.get("Allowed_Tools") or (),
+            approval_mode=entry.get("Approval_Mode", default_approval_mode),
+            auth_token=entry.get("Auth_Token", ""),
+        )
+        for entry in entries
+    )
+    labels = [server.label for server in servers]
+    duplicates = sorted({label for label in labels if labels.count(label) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate MCP server Label: {', '.join(duplicates)}")
+    return servers
@@ -0,0 +1,237 @@
+"""
+Timings and metrics for the AI Foundry Agent package.
+
+Each phase of a turn is timed: agent_init, create (thread, message and run creation),
+poll (waiting for the run), approvals, steps (run step listing) and messages (message
+retrieval), as well as project_init and agent_delete outside of turns. A phase
+- opens an OpenTelemetry span named `ai_foundry_agent.<phase>` when the
+  `opentelemetry-api` package is installed, exported by whatever tracer provider the
+  application configured,
+- is observed in the `ai_foundry_agent_phase_seconds` histogram, labelled with the agent
+  name and phase,
+- and is added to the `timings` dict of the turn's results, in seconds.
+
+Phase durations exclude the phases nested in them, so approvals during polling are not
+counted twice and the phases of a turn add up to at most its `total`.
+
+The histograms, counters and gauges are kept in memory and can be read without a
+collector: `render_metrics()` returns them in the Prometheus text exposition format and
+`metrics_snapshot()` as a dict.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+try:
+    from opentelemetry import trace as _otel_trace
+except ImportError:  # OpenTelemetry is optional, timings and histograms work without it
+    _otel_trace = None
+
+from .logger import _log_context
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Phase durations of the turn processed in the current thread or task
+_turn_timings = contextvars.ContextVar("ai_foundry_agent_turn_timings", default=None)
+
+# Time spent in the phases nested in the open phase of the current thread or task
+_nested_time = contextvars.ContextVar("ai_foundry_agent_nested_time", default=None)
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(upper bound, observations at or below it) pairs, ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+class MetricsRegistry:
+    """Thread-safe in-memory store of labelled counters, gauges and histograms"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def snapshot(self):
+        """Counters, gauges and histograms as a dict of metric name to a list of labelled values"""
+        snapshot = {"counters": {}, "gauges": {}, "histograms": {}}
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                snapshot["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+            for (name, labels), value in sorted(self._gauges.items()):
+                snapshot["gauges"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                snapshot["histograms"].setdefault(name, []).append({
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "buckets": {_format_bound(bound): count for bound, count in histogram.cumulative()},
+                })
+        return snapshot
+
+    def render(self):
+        """Counters, gauges and histograms in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((key, histogram.cumulative(), histogram.sum, histogram.count)
+                                for key, histogram in self._histograms.items())
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            if name not in declared:
+                lines.append(f"# TYPE {name} gauge")
+                declared.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), cumulative, total, count in histograms:
+            if name not in declared:
+                lines.append(f"# TYPE {name} histogram")
+                declared.add(name)
+            for bound, bucket_count in cumulative:
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', _format_bound(bound)),))} {bucket_count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + "}"
+
+# Metrics of all agents of the process
+_registry = MetricsRegistry()
+
+def _span(config, name):
+    """OpenTelemetry span for the phase when OpenTelemetry is installed, a no-op otherwise"""
+    if _otel_trace is None:
+        return contextlib.nullcontext()
+    attributes = {"ai_foundry_agent.agent_name": config.agent_name}
+    for key, value in _log_context.get().items():
+        if value:
+            attributes[f"ai_foundry_agent.{key}"] = value
+    return _otel_trace.get_tracer(__name__).start_as_current_span(f"ai_foundry_agent.{name}", attributes=attributes)
+
+@contextlib.contextmanager
+def _timed(config, phase, turn=True):
+    """
+    Time a phase of the agent workflow, adding it to the timings of the current turn.
+
+    Background work such as cleanup passes turn=False, its phases are only observed in
+    the histograms and spans, as the turn it was copied from has already returned.
+    """
+    parent = _nested_time.get() if turn else None
+    nested = [0.0]
+    token = _nested_time.set(nested)
+    start = time.perf_counter()
+    try:
+        with _span(config, phase):
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _nested_time.reset(token)
+        if parent is not None:
+            parent[0] += elapsed
+        duration = elapsed - nested[0]
+        _registry.observe("ai_foundry_agent_phase_seconds", duration, agent=config.agent_name, phase=phase)
+        timings = _turn_timings.get() if turn else None
+        if timings is not None:
+            timings[phase] = round(timings.get(phase, 0.0) + duration, 6)
+
+@contextlib.contextmanager
+def _timed_turn(config):
+    """Collect the phase timings of a turn, yielding the dict they are added to along with the total"""
+    timings = {}
+    token = _turn_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        with _span(config, "turn"):
+            yield timings
+    finally:
+        elapsed = time.perf_counter() - start
+        _turn_timings.reset(token)
+        timings["total"] = round(elapsed, 6)
+        _registry.observe("ai_foundry_agent_turn_seconds", elapsed, agent=config.agent_name)
+
+def _turn_timing_results():
+    """Timings dict of the current turn for its results, filled until the turn ends"""
+    timings = _turn_timings.get()
+    return timings if timings is not None else {}
+
+def _count(name, amount=1, **labels):
+    """Increment a counter of the registry"""
+    _registry.increment(name, amount, **labels)
+
+def _set_gauge(name, value, **labels):
+    """Set a gauge of the registry"""
+    _registry.set_gauge(name, value, **labels)
+
+def _observe(name, value, **labels):
+    """Observe a value in a histogram of the registry"""
+    _registry.observe(name, value, **labels)
+
+def render_metrics():
+    """Return the counters, gauges and histograms of all agents in the Prometheus text exposition format"""
+    return _registry.render()
+
+def metrics_snapshot():
+    """Return the counters, gauges and histograms of all agents as a dict"""
+    return _registry.snapshot()
+
+def reset_metrics():
+    """Drop all counters, gauges and histograms"""
+    _registry.reset()
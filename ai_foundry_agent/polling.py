@@ -0,0 +1,105 @@
+"""
+Run status polling strategies for the AI Foundry Agent package.
+
+A strategy decides how long to wait between `runs.get` calls while a run is in progress,
+or whether to use the SDK's run streaming so no polling is needed at all. Strategies are
+immutable and shared by all runs of an agent, each run iterates its own `intervals()`.
+
+Strategies are selected per agent with the `Poll_Strategy` section of agent_config.yaml:
+
+    Poll_Strategy:
+      Mode: "fixed"           # Options: fixed, backoff, stream
+      Interval: 1             # Seconds between status checks (fixed)
+      Initial_Interval: 0.25  # Seconds before the first status check (backoff)
+      Max_Interval: 1         # Cap for the interval between status checks (backoff)
+      Multiplier: 1.5         # Interval growth factor per status check (backoff)
+      Jitter: 0.1             # Random +/- fraction applied to each interval (backoff)
+
+The default is the fixed 1 second interval. Backoff answers runs shorter than a second
+sooner, at the cost of more status checks for longer runs, so it is opt-in.
+"""
+
+import itertools
+import random
+
+class PollStrategy:
+    """Base class for run status polling strategies"""
+
+    # True when runs should be streamed instead of polled
+    streaming = False
+
+    def intervals(self):
+        """Yield the seconds to wait before each status check of a single run"""
+        raise NotImplementedError
+
+class FixedPollStrategy(PollStrategy):
+    """Check the run status at a fixed interval"""
+
+    def __init__(self, interval=1.0):
+        if interval <= 0:
+            raise ValueError("Poll_Strategy Interval must be greater than 0")
+        self.interval = interval
+
+    def intervals(self):
+        return itertools.repeat(self.interval)
+
+    def __repr__(self):
+        return f"FixedPollStrategy(interval={self.interval})"
+
+class BackoffPollStrategy(PollStrategy):
+    """Start with a short interval and back off exponentially with jitter up to a cap"""
+
+    def __init__(self, initial_interval=0.25, max_interval=1.0, multiplier=1.5, jitter=0.1):
+        if initial_interval <= 0 or max_interval < initial_interval:
+            raise ValueError("Poll_Strategy requires 0 < Initial_Interval <= Max_Interval")
+        if multiplier < 1:
+            raise ValueError("Poll_Strategy Multiplier must be at least 1")
+        if not 0 <= jitter < 1:
+            raise ValueError("Poll_Strategy Jitter must be between 0 and 1")
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def intervals(self):
+        interval = self.initial_interval
+        while True:
+            # Spread status checks of concurrent runs so they don't hit the service in lockstep
+            yield interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            interval = min(interval * self.multiplier, self.max_interval)
+
+    def __repr__(self):
+        return (f"BackoffPollStrategy(initial_interval={self.initial_interval}, max_interval={self.max_interval}, "
+                f"multiplier={self.multiplier}, jitter={self.jitter})")
+
+class StreamPollStrategy(PollStrategy):
+    """Use the SDK's run streaming so status changes are pushed instead of polled"""
+
+    streaming = True
+
+    def intervals(self):
+        return iter(())
+
+    def __repr__(self):
+        return "StreamPollStrategy()"
+
+DEFAULT_POLL_STRATEGY = FixedPollStrategy()
+
+def poll_strategy_from_config(values):
+    """Build the poll strategy from the Poll_Strategy section of an agent configuration"""
+    if not values:
+        return DEFAULT_POLL_STRATEGY
+
+    mode = str(values.get("Mode", "fixed")).lower()
+    if mode == "fixed":
+        return FixedPollStrategy(interval=float(values.get("Interval", 1.0)))
+    if mode == "backoff":
+        return BackoffPollStrategy(
+            initial_interval=float(values.get("Initial_Interval", 0.25)),
+            max_interval=float(values.get("Max_Interval", 1.0)),
+            multiplier=float(values.get("Multiplier", 1.5)),
+            jitter=float(values.get("Jitter", 0.1)),
+        )
+    if mode == "stream":
+        return StreamPollStrategy()
+    raise ValueError(f"Unknown Poll_Strategy Mode '{mode}', expected one of: fixed, backoff, stream")
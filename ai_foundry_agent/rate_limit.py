@@ -0,0 +1,480 @@
+"""
+Client-side rate limiting for the AI Foundry Agent package.
+
+Under load the agents service throttles a project with 429 responses. Instead of sending
+every request as soon as a turn needs it, all agents client calls of the sessions of a
+project go through a shared `RateLimiter` with a token bucket per operation class:
+
+- poll: the `runs.get` status checks while a run is in progress,
+- control: every other call, creating threads, messages and runs, approvals, listings
+  and deletions.
+
+Requests beyond the rate of a bucket are queued in arrival order instead of being sent
+or failed. A throttled request (429 or 503) pauses its bucket for the time the service
+asked for in its `Retry-After` header, or an exponential backoff without one, so the
+other queued requests hold off too, and is then queued again. Other transient failures
+(408, 500, 502, 504 and connection errors) of reads and deletions are retried after a
+jittered backoff within a retry budget, so retries add at most a fraction of the
+requests when the service is failing. Those retries come on top of the retries of the
+SDK's own pipeline. Requests that create or change something, such as messages, runs
+and agents, could be processed twice, so they are only retried when they were never
+sent or were throttled with a `Retry-After` header. Listings
+are fetched page by page as they are iterated, each page request is admitted and
+retried like any other call.
+
+Limits are set per agent with the `Rate_Limit` section of agent_config.yaml:
+
+    Rate_Limit:
+      Enabled: true
+      Control_Rate: 50      # Control requests per second to the project
+      Control_Burst: 100    # Control requests sent at once before queueing
+      Poll_Rate: 100        # Run status checks per second to the project
+      Poll_Burst: 200       # Run status checks sent at once before queueing
+      Max_Retries: 6        # Retries of a request, throttled or failed
+      Retry_Budget: 0.2     # Retries of failed requests allowed per request
+      Retry_Reserve: 10     # Retries allowed before the budget builds up
+      Backoff_Initial: 0.5  # Seconds before the first retry without Retry-After
+      Backoff_Max: 30       # Cap in seconds for the wait before a retry
+
+The sessions of all agents of a project with the same limits share one limiter. The
+queue depth is exposed in the `ai_foundry_agent_rate_limit_queue_depth` gauge and the
+time spent queued in the `ai_foundry_agent_rate_limit_wait_seconds` histogram, by
+project and operation class, along with the `ai_foundry_agent_throttled_total`,
+`ai_foundry_agent_retries_total` and `ai_foundry_agent_retry_budget_exhausted_total`
+counters.
+"""
+
+import logging
+import random
+import threading
+import time
+
+from .logger import _log_message
+from .metrics import _count, _observe, _set_gauge
+
+OPERATION_CLASSES = ("control", "poll")
+
+# Agents client operations that go through the limiter, by operation group
+RATE_LIMITED_OPERATIONS = {
+    None: ("list_agents", "get_agent", "create_agent", "update_agent", "delete_agent"),
+    "threads": ("create", "get", "delete"),
+    "messages": ("create", "list"),
+    "runs": ("create", "get", "cancel", "submit_tool_outputs", "submit_tool_outputs_stream", "stream"),
+    "run_steps": ("list",),
+}
+
+# Operations returning a pageable result, whose pages are fetched as they are iterated
+_LIST_OPERATIONS = {"list_agents", "messages.list", "run_steps.list"}
+
+# Operations that are safe to repeat when a request was sent but failed or no response came back
+_IDEMPOTENT_OPERATIONS = {"list_agents", "get_agent", "delete_agent", "threads.get", "threads.delete",
+                          "messages.list", "runs.get", "run_steps.list"}
+
+# Responses to retry, those that signal an overloaded service also pause the bucket
+_THROTTLE_STATUS_CODES = {429, 503}
+_TRANSIENT_STATUS_CODES = {408, 500, 502, 504}
+
+class RateLimitPolicy:
+    """Immutable request rates and retry settings for the agents client calls of a project"""
+
+    __slots__ = ("control_rate", "control_burst", "poll_rate", "poll_burst", "max_retries", "retry_budget",
+                 "retry_reserve", "backoff_initial", "backoff_max")
+
+    def __init__(self, control_rate=50.0, control_burst=100, poll_rate=100.0, poll_burst=200, max_retries=6,
+                 retry_budget=0.2, retry_reserve=10, backoff_initial=0.5, backoff_max=30.0):
+        if control_rate <= 0 or poll_rate <= 0:
+            raise ValueError("Rate_Limit Control_Rate and Poll_Rate must be greater than 0")
+        if control_burst < 1 or poll_burst < 1:
+            raise ValueError("Rate_Limit Control_Burst and Poll_Burst must be at least 1")
+        if max_retries < 0 or retry_reserve < 0:
+            raise ValueError("Rate_Limit Max_Retries and Retry_Reserve must not be negative")
+        if not 0 <= retry_budget <= 1:
+            raise ValueError("Rate_Limit Retry_Budget must be between 0 and 1")
+        if backoff_initial <= 0 or backoff_max < backoff_initial:
+            raise ValueError("Rate_Limit requires 0 < Backoff_Initial <= Backoff_Max")
+        object.__setattr__(self, "control_rate", control_rate)
+        object.__setattr__(self, "control_burst", control_burst)
+        object.__setattr__(self, "poll_rate", poll_rate)
+        object.__setattr__(self, "poll_burst", poll_burst)
+        object.__setattr__(self, "max_retries", max_retries)
+        object.__setattr__(self, "retry_budget", retry_budget)
+        object.__setattr__(self, "retry_reserve", retry_reserve)
+        object.__setattr__(self, "backoff_initial", backoff_initial)
+        object.__setattr__(self, "backoff_max", backoff_max)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"RateLimitPolicy is immutable, cannot set '{name}'")
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return isinstance(other, RateLimitPolicy) and self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return (f"RateLimitPolicy(control_rate={self.control_rate}, control_burst={self.control_burst}, "
+                f"poll_rate={self.poll_rate}, poll_burst={self.poll_burst}, max_retries={self.max_retries}, "
+                f"retry_budget={self.retry_budget}, retry_reserve={self.retry_reserve}, "
+                f"backoff_initial={self.backoff_initial}, backoff_max={self.backoff_max})")
+
+DEFAULT_RATE_LIMIT_POLICY = RateLimitPolicy()
+
+def rate_limit_policy_from_config(values):
+    """Build the rate limit policy from the Rate_Limit section of an agent configuration, None if disabled"""
+    if not values:
+        return DEFAULT_RATE_LIMIT_POLICY
+    if not values.get("Enabled", True):
+        return None
+    return RateLimitPolicy(
+        control_rate=float(values.get("Control_Rate", 50)),
+        control_burst=int(values.get("Control_Burst", 100)),
+        poll_rate=float(values.get("Poll_Rate", 100)),
+        poll_burst=int(values.get("Poll_Burst", 200)),
+        max_retries=int(values.get("Max_Retries", 6)),
+        retry_budget=float(values.get("Retry_Budget", 0.2)),
+        retry_reserve=int(values.get("Retry_Reserve", 10)),
+        backoff_initial=float(values.get("Backoff_Initial", 0.5)),
+        backoff_max=float(values.get("Backoff_Max", 30)),
+    )
+
+def _operation_class(operation):
+    """Bucket of an operation: poll for run status checks, control for everything else"""
+    return "poll" if operation == "runs.get" else "control"
+
+def _retry_after(error):
+    """Seconds the service asked to wait in the headers of the error's response, None without"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header in ("retry-after-ms", "x-ms-retry-after-ms"):
+        value = headers.get(header)
+        if value:
+            try:
+                return max(0.0, float(value) / 1000)
+            except ValueError:
+                pass
+    value = headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        # The header can also hold an HTTP date
+        import email.utils
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _failure_kind(operation, error):
+    """'throttled' or 'transient' for errors worth a retry, None for the others"""
+    idempotent = operation in _IDEMPOTENT_OPERATIONS
+    status_code = getattr(error, "status_code", None)
+    if status_code in _THROTTLE_STATUS_CODES:
+        # A write is only repeated when the service said when to, as it then did not process it
+        if idempotent or _retry_after(error) is not None:
+            return "throttled"
+        return None
+    if status_code in _TRANSIENT_STATUS_CODES:
+        # A failed write may still have created its message, run or agent
+        return "transient" if idempotent else None
+    # Imported here so that the configuration can be loaded without the Azure SDK
+    from azure.core.exceptions import ServiceRequestError, ServiceResponseError
+    if isinstance(error, ServiceRequestError):
+        return "transient"
+    if isinstance(error, ServiceResponseError) and idempotent:
+        return "transient"
+    return None
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out send times in arrival order"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.paused_until = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, returns the monotonic time from which the request may be sent"""
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            # Tokens owed by the requests queued ahead are refilled first
+            return self._updated + max(0.0, -self._tokens) / self.rate
+
+    def pause(self, seconds):
+        """Send no requests for the seconds the service asked for, refilling only afterwards"""
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            # Requests held back by the pause are spread out at the rate afterwards, not sent at once
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + seconds)
+            self.paused_until = max(self.paused_until, now + seconds)
+
+class RateLimiter:
+    """Token buckets by operation class and the retry budget for the agents client calls of a project"""
+
+    def __init__(self, project, policy):
+        self.project = project
+        self.policy = policy
+        self.buckets = {
+            "control": TokenBucket(policy.control_rate, policy.control_burst),
+            "poll": TokenBucket(policy.poll_rate, policy.poll_burst),
+        }
+        self._queued = dict.fromkeys(OPERATION_CLASSES, 0)
+        self._retry_tokens = float(policy.retry_reserve)
+        self._lock = threading.Lock()
+
+    def _queue(self, operation_class, delta):
+        """Track the requests waiting in the bucket of the operation class"""
+        with self._lock:
+            self._queued[operation_class] += delta
+            depth = self._queued[operation_class]
+        _set_gauge("ai_foundry_agent_rate_limit_queue_depth", depth, project=self.project,
+                   operation_class=operation_class)
+
+    def _waited(self, operation_class, seconds):
+        _observe("ai_foundry_agent_rate_limit_wait_seconds", seconds, project=self.project,
+                 operation_class=operation_class)
+
+    def _deposit(self):
+        """Add the retries a request earns to the budget, up to the reserve"""
+        with self._lock:
+            self._retry_tokens = min(self._retry_tokens + self.policy.retry_budget,
+                                     max(float(self.policy.retry_reserve), 1.0))
+
+    def _withdraw(self):
+        """Take a retry from the budget, False when it is exhausted"""
+        with self._lock:
+            if self._retry_tokens < 1:
+                return False
+            self._retry_tokens -= 1
+            return True
+
+    def _backoff(self, attempt):
+        """Full jitter exponential backoff before the retry of the attempt"""
+        return random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_initial * 2 ** attempt))
+
+    def _retry_delay(self, config, operation, error, attempt):
+        """Seconds to wait before retrying the failed attempt, None when the error is raised instead"""
+        kind = _failure_kind(operation, error)
+        if kind is None:
+            return None
+        operation_class = _operation_class(operation)
+        if kind == "throttled":
+            _count("ai_foundry_agent_throttled_total", project=self.project, operation_class=operation_class,
+                   operation=operation)
+        if attempt >= self.policy.max_retries:
+            _log_message(config, f"Giving up on {operation} after {attempt + 1} attempts: {error}", level=logging.ERROR)
+            return None
+        # Throttled requests were not processed and only wait, failed requests spend the retry budget
+        if kind == "transient" and not self._withdraw():
+            _count("ai_foundry_agent_retry_budget_exhausted_total", project=self.project,
+                   operation_class=operation_class)
+            _log_message(config, f"Retry budget exhausted, not retrying {operation}: {error}", level=logging.ERROR)
+            return None
+        retry_after = _retry_after(error)
+        delay = retry_after if retry_after is not None else self._backoff(attempt)
+        delay = min(delay, self.policy.backoff_max)
+        if kind == "throttled":
+            self.buckets[operation_class].pause(delay)
+        _count("ai_foundry_agent_retries_total", project=self.project, operation_class=operation_class, reason=kind)
+        _log_message(config, f"Retrying {operation} in {delay:.2f}s after attempt {attempt + 1} failed: {error}",
+                     level=logging.WARNING)
+        return delay
+
+    def _admit(self, operation_class):
+        """Wait for the turn of the request in the bucket of the operation class"""
+        bucket = self.buckets[operation_class]
+        start = time.monotonic()
+        send_at = bucket.reserve()
+        if send_at > start:
+            self._queue(operation_class, 1)
+            try:
+                while send_at > time.monotonic():
+                    time.sleep(send_at - time.monotonic())
+                    # Paused while waiting, queue again behind the pause
+                    if bucket.paused_until > time.monotonic():
+                        send_at = bucket.reserve()
+            finally:
+                self._queue(operation_class, -1)
+        self._waited(operation_class, time.monotonic() - start)
+
+    async def _admit_async(self, operation_class):
+        """Wait for the turn of the request in the bucket of the operation class without blocking the loop"""
+        # Imported here so that loading the configuration does not load asyncio
+        import asyncio
+        bucket = self.buckets[operation_class]
+        start = time.monotonic()
+        send_at = bucket.reserve()
+        if send_at > start:
+            self._queue(operation_class, 1)
+            try:
+                while send_at > time.monotonic():
+                    await asyncio.sleep(send_at - time.monotonic())
+                    if bucket.paused_until > time.monotonic():
+                        send_at = bucket.reserve()
+            finally:
+                self._queue(operation_class, -1)
+        self._waited(operation_class, time.monotonic() - start)
+
+    def call(self, config, operation, function, *args, **kwargs):
+        """Send the request once admitted, retrying throttled and transient failures"""
+        operation_class = _operation_class(operation)
+        self._deposit()
+        attempt = 0
+        while True:
+            self._admit(operation_class)
+            try:
+                return function(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(config, operation, e, attempt)
+                if delay is None:
+                    raise
+            attempt += 1
+            # Throttled requests wait out the pause in the bucket, with the requests queued behind them
+            if self.buckets[operation_class].paused_until <= time.monotonic():
+                time.sleep(delay)
+
+    async def call_async(self, config, operation, function, *args, **kwargs):
+        """Send the request once admitted without blocking the loop, retrying throttled and transient failures"""
+        import asyncio
+        operation_class = _operation_class(operation)
+        self._deposit()
+        attempt = 0
+        while True:
+            await self._admit_async(operation_class)
+            try:
+                return await function(*args, **kwargs)
+            except Exception as e:
+                delay = self._retry_delay(config, operation, e, attempt)
+                if delay is None:
+                    raise
+            attempt += 1
+            # Throttled requests wait out the pause in the bucket, with the requests queued behind them
+            if self.buckets[operation_class].paused_until <= time.monotonic():
+                await asyncio.sleep(delay)
+
+# Limiters shared by the sessions of a project, by project endpoint and policy
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def _get_rate_limiter(project, policy):
+    """Return the limiter of the project for the policy, created on first use"""
+    key = (project, policy)
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = _rate_limiters[key] = RateLimiter(project, policy)
+        return limiter
+
+class RateLimitedAgentsClient:
+    """Agents client whose service calls go through the rate limiter of the project"""
+
+    def __init__(self, client, limiter, config, group=None):
+        self._client = client
+        self._limiter = limiter
+        self._config = config
+        self._group = group
+        self._operations = RATE_LIMITED_OPERATIONS.get(group, ())
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if self._group is None and name in RATE_LIMITED_OPERATIONS:
+            wrapped = type(self)(attribute, self._limiter, self._config, name)
+        elif name in self._operations:
+            wrapped = self._limited(f"{self._group}.{name}" if self._group else name, attribute)
+        else:
+            return attribute
+        # Looked up once, later accesses find the wrapper on the instance
+        setattr(self, name, wrapped)
+        return wrapped
+
+    def _limited(self, operation, function):
+        if operation in _LIST_OPERATIONS:
+            # The pageable result sends no request until it is iterated
+            return lambda *args, **kwargs: _LimitedPaged(self._limiter, self._config, operation,
+                                                         function(*args, **kwargs))
+
+        def call(*args, **kwargs):
+            return self._limiter.call(self._config, operation, function, *args, **kwargs)
+        return call
+
+class _LimitedPaged:
+    """Pageable result whose page requests are each admitted by the limiter and retried"""
+
+    def __init__(self, limiter, config, operation, paged):
+        self._limiter = limiter
+        self._config = config
+        self._operation = operation
+        self._paged = paged
+
+    def __iter__(self):
+        pages = self._paged.by_page()
+        while True:
+            # A failed page request leaves the page iterator where it was, so the retry asks for the same page
+            page = self._limiter.call(self._config, self._operation, next, pages, None)
+            if page is None:
+                return
+            yield from page
+            if pages.continuation_token is None:
+                return
+
+class _AsyncLimitedPaged:
+    """Async pageable result whose page requests are each admitted by the limiter and retried"""
+
+    def __init__(self, limiter, config, operation, paged):
+        self._limiter = limiter
+        self._config = config
+        self._operation = operation
+        self._paged = paged
+
+    async def __aiter__(self):
+        pages = self._paged.by_page()
+        while True:
+            page = await self._limiter.call_async(self._config, self._operation, anext, pages, None)
+            if page is None:
+                return
+            async for item in page:
+                yield item
+            if pages.continuation_token is None:
+                return
+
+class AsyncRateLimitedAgentsClient(RateLimitedAgentsClient):
+    """Async agents client whose service calls go through the rate limiter of the project"""
+
+    def _limited(self, operation, function):
+        if operation in _LIST_OPERATIONS:
+            return lambda *args, **kwargs: _AsyncLimitedPaged(self._limiter, self._config, operation,
+                                                              function(*args, **kwargs))
+
+        def call(*args, **kwargs):
+            return self._limiter.call_async(self._config, operation, function, *args, **kwargs)
+        return call
+
+def _rate_limited_client(agents_client, config):
+    """Route the calls of the agents client through the project's limiter, unless the agent has none"""
+    if config.rate_limit is None:
+        return agents_client
+    limiter = _get_rate_limiter(config.project_endpoint, config.rate_limit)
+    return RateLimitedAgentsClient(agents_client, limiter, config)
+
+def _async_rate_limited_client(agents_client, config):
+    """Route the calls of the async agents client through the project's limiter, unless the agent has none"""
+    if config.rate_limit is None:
+        return agents_client
+    limiter = _get_rate_limiter(config.project_endpoint, config.rate_limit)
+    return AsyncRateLimitedAgentsClient(agents_client, limiter, config)
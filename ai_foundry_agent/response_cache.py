@@ -0,0 +1,207 @@
+"""
+Response cache for the AI Foundry Agent package.
+
+Repeated questions otherwise trigger a full model run plus the MCP tool calls behind it.
+With the `Response_Cache` section of agent_config.yaml, the results of turns that start
+a new thread are cached, keyed on the hash of the agent configuration and the normalized
+user message. Turns continuing a thread are never cached, their answer depends on the
+conversation so far.
+
+    Response_Cache:
+      Enabled: true
+      TTL: 300            # Seconds a cached response is served
+      Max_Entries: 1000   # Least recently used responses are evicted beyond this
+      Backend: "memory"   # Options: memory, sqlite
+      Path: "./cache/responses.sqlite"  # Database file of the sqlite backend
+
+Cached results are returned with "cached": True and without message or run IDs or token
+usage, as no run answered them. Their thread_id is a new thread seeded with the question
+and the cached answer, so the conversation can be continued like any other; with
+Delete_Agent_After_Run no thread is kept and it is None. Hits and misses are counted in
+the ai_foundry_agent_response_cache_total counter.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+RESPONSE_CACHE_BACKENDS = ("memory", "sqlite")
+
+class ResponseCachePolicy:
+    """Immutable settings of an agent's response cache"""
+
+    __slots__ = ("ttl", "max_entries", "backend", "path")
+
+    def __init__(self, ttl=300.0, max_entries=1000, backend="memory", path="./cache/responses.sqlite"):
+        if ttl <= 0:
+            raise ValueError("Response_Cache TTL must be greater than 0")
+        if max_entries < 1:
+            raise ValueError("Response_Cache Max_Entries must be at least 1")
+        if backend not in RESPONSE_CACHE_BACKENDS:
+            raise ValueError(f"Unknown Response_Cache Backend '{backend}', expected one of: {', '.join(RESPONSE_CACHE_BACKENDS)}")
+        object.__setattr__(self, "ttl", ttl)
+        object.__setattr__(self, "max_entries", max_entries)
+        object.__setattr__(self, "backend", backend)
+        object.__setattr__(self, "path", path)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ResponseCachePolicy is immutable, cannot set '{name}'")
+
+    def __repr__(self):
+        return (f"ResponseCachePolicy(ttl={self.ttl}, max_entries={self.max_entries}, "
+                f"backend={self.backend!r}, path={self.path!r})")
+
+def response_cache_from_config(values):
+    """Build the cache policy from the Response_Cache section of an agent configuration, None if disabled"""
+    if not values or not values.get("Enabled", False):
+        return None
+    return ResponseCachePolicy(
+        ttl=float(values.get("TTL", 300)),
+        max_entries=int(values.get("Max_Entries", 1000)),
+        backend=str(values.get("Backend", "memory")).lower(),
+        path=values.get("Path", "./cache/responses.sqlite"),
+    )
+
+def _normalize_message(user_message):
+    """Ignore case and whitespace differences between otherwise identical questions"""
+    return " ".join(user_message.split()).casefold()
+
+def _cache_key(config_hash, user_message):
+    """Key of a response: agent configuration and normalized message"""
+    payload = f"{config_hash}|{_normalize_message(user_message)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _cacheable(results):
+    """Only cache turns the agent answered"""
+    return any(message.get("role") == "ASSISTANT" for message in results.get("response", ()))
+
+def _seed_messages(user_message, results):
+    """Roles and contents of the question and the cached answer, to seed the thread a cached turn continues in"""
+    return [("user", user_message)] + [("assistant", message.get("content", "")) for message in results["response"]
+                                       if message.get("role") == "ASSISTANT"]
+
+def _cached_results(results, thread_id=None):
+    """The cached results as returned to callers, flagged and in the thread seeded with the cached exchange"""
+    return {**results, "thread_id": thread_id, "message_id": None, "run_id": None, "usage": None, "cached": True}
+
+class MemoryResponseCache:
+    """Thread-safe in-memory LRU response cache with expiry"""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached results for the key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, results):
+        """Cache the results, evicting the least recently used entries beyond Max_Entries"""
+        with self._lock:
+            self._entries[key] = (time.time() + self.policy.ttl, copy.deepcopy(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.policy.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit and miss counters and the number of cached responses"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def close(self):
+        pass
+
+class SQLiteResponseCache:
+    """Response cache in a local SQLite database, kept across restarts and shared between processes"""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(policy.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(policy.path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, results TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def get(self, key):
+        """Return the cached results for the key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT results FROM responses WHERE key = ? AND expires_at >= ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, results):
+        """Cache the results, evicting expired and least recently used entries beyond Max_Entries"""
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, results, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(results, default=str), now + self.policy.ttl, now),
+            )
+            self._connection.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.policy.max_entries,),
+            )
+
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Hit and miss counters and the number of cached responses"""
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+def _create_response_cache(policy):
+    """Create the cache backend for the policy, None when the agent has no response cache"""
+    if policy is None:
+        return None
+    if policy.backend == "sqlite":
+        return SQLiteResponseCache(policy)
+    return MemoryResponseCache(policy)
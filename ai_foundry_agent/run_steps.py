@@ -0,0 +1,66 @@
+"""
+Run step introspection for the AI Foundry Agent package.
+
+Listing the steps of a run is an extra paginated request per turn, so steps are only
+fetched when asked for. `RunSteps` is a handle on the steps of one run that lists them
+on first iteration, and the `Run_Steps` setting of agent_config.yaml decides for which
+runs the steps are fetched and logged after the run:
+
+    Run_Steps: "failed"          # Options: always, failed, sample, never
+    Run_Steps_Sample_Rate: 0.01  # Fraction of successful runs logged with "sample"
+"""
+
+import random
+
+# Run statuses for which "failed" and "sample" always log the run steps
+_UNSUCCESSFUL_STATUSES = {"failed", "cancelled", "expired", "incomplete"}
+
+class RunSteps:
+    """Steps of a run, listed from the service on first iteration and cached afterwards"""
+
+    def __init__(self, agents_client, thread_id, run_id):
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self._agents_client = agents_client
+        self._steps = None
+
+    def __iter__(self):
+        if self._steps is None:
+            self._steps = list(self._agents_client.run_steps.list(thread_id=self.thread_id, run_id=self.run_id))
+        return iter(self._steps)
+
+    def __repr__(self):
+        return f"RunSteps(thread_id={self.thread_id!r}, run_id={self.run_id!r})"
+
+class AsyncRunSteps:
+    """Async counterpart of RunSteps, iterated with `async for`"""
+
+    def __init__(self, agents_client, thread_id, run_id):
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self._agents_client = agents_client
+        self._steps = None
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        if self._steps is None:
+            self._steps = [
+                step async for step in self._agents_client.run_steps.list(thread_id=self.thread_id, run_id=self.run_id)
+            ]
+        for step in self._steps:
+            yield step
+
+    def __repr__(self):
+        return f"AsyncRunSteps(thread_id={self.thread_id!r}, run_id={self.run_id!r})"
+
+def _should_log_run_steps(config, run):
+    """Decide from the agent's Run_Steps setting whether the steps of the finished run are fetched and logged"""
+    if config.run_steps == "always":
+        return True
+    if config.run_steps == "never":
+        return False
+    if run.status in _UNSUCCESSFUL_STATUSES:
+        return True
+    return config.run_steps == "sample" and random.random() < config.run_steps_sample_rate
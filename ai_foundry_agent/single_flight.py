@@ -0,0 +1,89 @@
+"""
+Single-flight coalescing for the AI Foundry Agent package.
+
+When many requests reach a fresh process at once, they all need the same setup: the
+parsed agent configuration, the session, the agent and a token from the credential.
+A `SingleFlight` runs such a call once per key among the callers that arrive while it
+is in flight; they wait for it and share its result, or its exception. Nothing is
+cached once the call returned, callers keep the result where they already did.
+
+Callers that joined a call in flight are counted in the
+`ai_foundry_agent_single_flight_shared_total` counter by operation.
+"""
+
+import threading
+
+from .metrics import _count
+
+class _Call:
+    """A call in flight and its outcome"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Thread-safe coalescing of concurrent calls with the same key"""
+
+    def __init__(self, operation):
+        self.operation = operation
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, *args, **kwargs):
+        """Call the function, or wait for the call with the same key in flight and return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            _count("ai_foundry_agent_single_flight_shared_total", operation=self.operation)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class SingleFlightCredential:
+    """
+    Token credential that shares concurrent token requests for the same scopes.
+
+    The bearer token policy of a client requests a token on every request until it has
+    one, so a burst of first requests would otherwise fetch as many tokens.
+    """
+
+    def __init__(self, credential):
+        self.credential = credential
+        self._flight = SingleFlight("get_token")
+
+    def get_token(self, *scopes, **kwargs):
+        key = ("get_token", scopes, tuple(sorted(kwargs.items())))
+        return self._flight.do(key, self.credential.get_token, *scopes, **kwargs)
+
+    def get_token_info(self, *scopes, options=None):
+        key = ("get_token_info", scopes, tuple(sorted((options or {}).items())))
+        return self._flight.do(key, self.credential.get_token_info, *scopes, options=options)
+
+    def close(self):
+        self.credential.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
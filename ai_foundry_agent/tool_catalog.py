@@ -0,0 +1,364 @@
+"""
+MCP tool catalog for the AI Foundry Agent package.
+
+With `Allowed_Tools: []` every tool an MCP server advertises is exposed to the model,
+and the schemas of all of them are part of the prompt of every run. With the
+`Tool_Catalog` section of agent_config.yaml, the `tools/list` of each MCP server of the
+agent is fetched once and cached for a TTL, and
+
+- `Allowed_Tools` is checked against it when a session of the agent is created, so a
+  tool name the server does not advertise fails the session instead of the model's
+  tool call. Loading the configuration stays free of network calls,
+- with `Auto_Narrow`, the steps of the agent's first `Min_Runs` runs are listed to count
+  the tools it calls. The sessions of the agent then expose only those tools, and those
+  matching `Keep_Tools`, on the servers whose `Allowed_Tools` is empty.
+
+    Tool_Catalog:
+      Enabled: true
+      TTL: 3600            # Seconds a fetched tools/list is used before it is fetched again
+      Path: "./cache/tool_catalog.json"  # Catalogs and tool usage kept across restarts, in memory only when empty
+      Validate: true       # Check Allowed_Tools against the catalog when a session is created
+      Auto_Narrow: false   # Expose only the tools the agent calls on servers with empty Allowed_Tools
+      Min_Runs: 50         # Runs whose tool calls are counted before narrowing
+      Keep_Tools: []       # Tool name patterns exposed even when the agent did not call them
+
+Results of agents with a catalog carry a `tool_catalog` dict with the number of tools
+advertised and exposed, the estimated prompt tokens of the exposed tool schemas and those
+saved per run by not exposing the others, at about four characters per token.
+"""
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from .conversation import _estimate_tokens
+from .logger import _log_message
+from .single_flight import SingleFlight
+
+# MCP protocol version sent when initializing the session that lists the tools
+PROTOCOL_VERSION = "2025-03-26"
+
+class ToolCatalogPolicy:
+    """Immutable tool catalog settings of an agent"""
+
+    __slots__ = ("ttl", "path", "validate", "auto_narrow", "min_runs", "keep_tools")
+
+    def __init__(self, ttl=3600.0, path=None, validate=True, auto_narrow=False, min_runs=50, keep_tools=()):
+        if ttl <= 0:
+            raise ValueError("Tool_Catalog TTL must be greater than 0")
+        if min_runs < 1:
+            raise ValueError("Tool_Catalog Min_Runs must be at least 1")
+        object.__setattr__(self, "ttl", ttl)
+        object.__setattr__(self, "path", path)
+        object.__setattr__(self, "validate", validate)
+        object.__setattr__(self, "auto_narrow", auto_narrow)
+        object.__setattr__(self, "min_runs", min_runs)
+        object.__setattr__(self, "keep_tools", tuple(keep_tools))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ToolCatalogPolicy is immutable, cannot set '{name}'")
+
+    def __repr__(self):
+        return (f"ToolCatalogPolicy(ttl={self.ttl}, path={self.path!r}, validate={self.validate}, "
+                f"auto_narrow={self.auto_narrow}, min_runs={self.min_runs}, keep_tools={self.keep_tools})")
+
+def tool_catalog_policy_from_config(values):
+    """Build the tool catalog policy from the Tool_Catalog section of an agent configuration, None if disabled"""
+    if not values or not values.get("Enabled", False):
+        return None
+    return ToolCatalogPolicy(
+        ttl=float(values.get("TTL", 3600)),
+        path=values.get("Path") or None,
+        validate=bool(values.get("Validate", True)),
+        auto_narrow=bool(values.get("Auto_Narrow", False)),
+        min_runs=int(values.get("Min_Runs", 50)),
+        keep_tools=values.get("Keep_Tools") or (),
+    )
+
+def _read_message(response):
+    """JSON-RPC message of an MCP response, sent as JSON or as a server-sent events stream"""
+    body = response.read().decode("utf-8")
+    if "text/event-stream" not in (response.headers.get("Content-Type") or ""):
+        return json.loads(body)
+    for line in body.splitlines():
+        if line.startswith("data:"):
+            message = json.loads(line[5:])
+            if "id" in message:
+                return message
+    raise ValueError("MCP server closed the event stream without a response")
+
+def _rpc(url, method, params, headers, timeout, request_id=None):
+    """Send a JSON-RPC request, or a notification without request_id, returns the result and the response headers"""
+    from urllib import request as urllib_request
+
+    message = {"jsonrpc": "2.0", "method": method, "params": params}
+    if request_id is not None:
+        message["id"] = request_id
+    http_request = urllib_request.Request(url, data=json.dumps(message).encode("utf-8"), method="POST",
+                                          headers=headers)
+    with urllib_request.urlopen(http_request, timeout=timeout) as response:
+        if request_id is None:
+            return None, response.headers
+        reply = _read_message(response)
+        if "error" in reply:
+            raise ValueError(f"MCP server answered {method} with an error: {reply['error']}")
+        return reply.get("result") or {}, response.headers
+
+def fetch_tools(url, auth_token="", timeout=10.0):
+    """List the tools of an MCP server over the streamable HTTP transport"""
+    from urllib import request as urllib_request
+
+    headers = {"Content-Type": "application/json", "Accept": "application/json, text/event-stream"}
+    if auth_token:
+        headers["Authorization"] = f"Bearer {auth_token}"
+    result, response_headers = _rpc(url, "initialize", {
+        "protocolVersion": PROTOCOL_VERSION,
+        "capabilities": {},
+        "clientInfo": {"name": "ai-foundry-agent", "version": "1.0.0"},
+    }, headers, timeout, request_id=1)
+    if response_headers.get("Mcp-Session-Id"):
+        headers["Mcp-Session-Id"] = response_headers["Mcp-Session-Id"]
+    headers["MCP-Protocol-Version"] = result.get("protocolVersion", PROTOCOL_VERSION)
+    _rpc(url, "notifications/initialized", {}, headers, timeout)
+
+    tools = []
+    cursor = None
+    for request_id in range(2, 1000):
+        result, _ = _rpc(url, "tools/list", {"cursor": cursor} if cursor else {}, headers, timeout, request_id)
+        tools.extend(result.get("tools") or ())
+        cursor = result.get("nextCursor")
+        if not cursor:
+            break
+
+    if "Mcp-Session-Id" in headers:
+        # End the session, servers that don't support it answer 405
+        try:
+            urllib_request.urlopen(urllib_request.Request(url, method="DELETE", headers=headers), timeout=timeout).close()
+        except OSError:
+            pass
+    return [
+        {"name": tool["name"], "description": tool.get("description", ""), "inputSchema": tool.get("inputSchema", {})}
+        for tool in tools
+    ]
+
+def _schema_tokens(tool):
+    """Estimated prompt tokens of a tool's name, description and input schema"""
+    return _estimate_tokens(json.dumps(tool, sort_keys=True))
+
+class ToolCatalog:
+    """Thread-safe cache of the tool lists of MCP servers and the tool usage of agents, with optional JSON persistence"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._servers = {}
+        self._usage = {}
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("tools_list")
+        if path:
+            self._read()
+
+    @staticmethod
+    def _server_key(server):
+        """Servers are keyed by URL and token, as tokens can see different tools, without persisting the token"""
+        token_hash = hashlib.sha256(server.auth_token.encode("utf-8")).hexdigest()[:16]
+        return f"{server.url}|{token_hash}"
+
+    def tools(self, server, ttl):
+        """Return the tools the server advertises, fetched at most once per TTL or the last list if fetching fails"""
+        key = self._server_key(server)
+        with self._lock:
+            entry = self._servers.get(key)
+        if entry and time.time() - entry["fetched_at"] < ttl:
+            return entry["tools"]
+        try:
+            return self._flight.do(key, self._fetch, key, server)
+        except (OSError, ValueError, KeyError):
+            if entry:
+                return entry["tools"]
+            raise
+
+    def _fetch(self, key, server):
+        tools = fetch_tools(server.url, server.auth_token)
+        with self._lock:
+            self._servers[key] = {"fetched_at": time.time(), "tools": tools}
+            self._write()
+        return tools
+
+    def runs(self, agent_name):
+        """Number of runs of the agent whose tool calls were counted"""
+        with self._lock:
+            return self._usage.get(agent_name, {}).get("runs", 0)
+
+    def usage(self, agent_name):
+        """Calls per tool name by server label counted for the agent"""
+        with self._lock:
+            tools = self._usage.get(agent_name, {}).get("tools", {})
+            return {label: dict(counts) for label, counts in tools.items()}
+
+    def record_run(self, agent_name, tool_calls):
+        """Count a run of the agent and the (server label, tool name) of the tool calls it made"""
+        with self._lock:
+            usage = self._usage.setdefault(agent_name, {"runs": 0, "tools": {}})
+            usage["runs"] += 1
+            for label, name in tool_calls:
+                counts = usage["tools"].setdefault(label, {})
+                counts[name] = counts.get(name, 0) + 1
+            self._write()
+
+    def _read(self):
+        """Load the catalogs and usage persisted on disk, ignoring a missing or unreadable file"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as catalog_file:
+                data = json.load(catalog_file)
+            self._servers = data.get("servers", {})
+            self._usage = data.get("usage", {})
+        except (OSError, ValueError, AttributeError):
+            self._servers, self._usage = {}, {}
+
+    def _write(self):
+        """Persist the catalogs and usage atomically, called with the lock held"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as catalog_file:
+            json.dump({"servers": self._servers, "usage": self._usage}, catalog_file, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+# Catalogs shared per persistence path, None for the in-memory only catalog
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+def _get_catalog(path=None):
+    """Return the shared catalog for the path, creating it on first use"""
+    with _catalogs_lock:
+        catalog = _catalogs.get(path)
+        if catalog is None:
+            catalog = _catalogs[path] = ToolCatalog(path)
+        return catalog
+
+def _validate_allowed_tools(config):
+    """Raise AgentConfigError when Allowed_Tools names a tool its MCP server does not advertise"""
+    from .config import AgentConfigError
+
+    policy = config.tool_catalog
+    if policy is None or not policy.validate:
+        return
+    catalog = _get_catalog(policy.path)
+    for server in config.mcp_servers:
+        if not server.allowed_tools:
+            continue
+        try:
+            names = {tool["name"] for tool in catalog.tools(server, policy.ttl)}
+        except (OSError, ValueError, KeyError) as e:
+            # An unreachable server does not fail the session, its tool calls will fail instead
+            _log_message(config, f"Could not list the tools of MCP server '{server.label}' to validate Allowed_Tools: {e}",
+                         level=logging.WARNING)
+            continue
+        unknown = [name for name in server.allowed_tools if name not in names]
+        if unknown:
+            raise AgentConfigError(f"Error in configuration of agent '{config.agent_name}': Allowed_Tools of MCP "
+                                   f"server '{server.label}' names tools it does not advertise: "
+                                   f"{', '.join(unknown)}. Available tools: {', '.join(sorted(names))}")
+
+class ToolSelection:
+    """Immutable tools exposed per MCP server of an agent, and the estimated prompt tokens of their schemas"""
+
+    __slots__ = ("allowed_tools", "advertised", "exposed", "schema_tokens", "tokens_saved", "narrowed", "learning")
+
+    def __init__(self, allowed_tools, advertised=0, exposed=0, schema_tokens=0, tokens_saved=0, narrowed=False,
+                 learning=False):
+        object.__setattr__(self, "allowed_tools", allowed_tools)
+        object.__setattr__(self, "advertised", advertised)
+        object.__setattr__(self, "exposed", exposed)
+        object.__setattr__(self, "schema_tokens", schema_tokens)
+        object.__setattr__(self, "tokens_saved", tokens_saved)
+        object.__setattr__(self, "narrowed", narrowed)
+        object.__setattr__(self, "learning", learning)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ToolSelection is immutable, cannot set '{name}'")
+
+    def stats(self):
+        """Tool counts and schema tokens for the results of a run"""
+        return {
+            "advertised": self.advertised,
+            "exposed": self.exposed,
+            "schema_tokens": self.schema_tokens,
+            "tokens_saved": self.tokens_saved,
+            "narrowed": self.narrowed,
+        }
+
+    def __repr__(self):
+        return (f"ToolSelection(advertised={self.advertised}, exposed={self.exposed}, "
+                f"tokens_saved={self.tokens_saved}, narrowed={self.narrowed})")
+
+def _select_tools(config):
+    """Decide the tools exposed on each MCP server of the agent from the catalog, None without a Tool_Catalog"""
+    policy = config.tool_catalog
+    if policy is None:
+        return None
+    catalog = _get_catalog(policy.path)
+    learning = policy.auto_narrow and catalog.runs(config.agent_name) < policy.min_runs
+    usage = catalog.usage(config.agent_name) if policy.auto_narrow and not learning else {}
+
+    allowed_tools = {}
+    advertised = exposed = schema_tokens = all_tokens = 0
+    narrowed = False
+    for server in config.mcp_servers:
+        allowed_tools[server.label] = server.allowed_tools
+        try:
+            tools = catalog.tools(server, policy.ttl)
+        except (OSError, ValueError, KeyError) as e:
+            _log_message(config, f"Could not list the tools of MCP server '{server.label}': {e}", level=logging.WARNING)
+            continue
+        selected = set(server.allowed_tools)
+        used = usage.get(server.label)
+        if not selected and used:
+            # Narrow to the tools the agent called, a server none were called on keeps all its tools
+            selected = {tool["name"] for tool in tools
+                        if tool["name"] in used or any(fnmatch.fnmatchcase(tool["name"], pattern)
+                                                       for pattern in policy.keep_tools)}
+            allowed_tools[server.label] = tuple(sorted(selected))
+            narrowed = True
+        for tool in tools:
+            tokens = _schema_tokens(tool)
+            all_tokens += tokens
+            if not selected or tool["name"] in selected:
+                exposed += 1
+                schema_tokens += tokens
+        advertised += len(tools)
+
+    selection = ToolSelection(allowed_tools, advertised, exposed, schema_tokens, all_tokens - schema_tokens,
+                              narrowed, learning)
+    _log_message(config, f"Tool catalog: exposing {exposed} of {advertised} tools, "
+                         f"about {schema_tokens} schema tokens per run, {selection.tokens_saved} saved")
+    return selection
+
+def _learning_tools(config):
+    """True while the tool calls of the agent's runs are counted before narrowing"""
+    policy = config.tool_catalog
+    return bool(policy and policy.auto_narrow and _get_catalog(policy.path).runs(config.agent_name) < policy.min_runs)
+
+def _narrowing_due(config, selection):
+    """True once the agent's sessions can narrow the tools selected while its tool calls were still counted"""
+    return bool(selection and selection.learning and not _learning_tools(config))
+
+def _step_tool_calls(steps):
+    """(server label, tool name) of the MCP tool calls of the run steps"""
+    calls = []
+    for step in steps:
+        for call in (step.get("step_details") or {}).get("tool_calls") or ():
+            if call.get("server_label") and call.get("name"):
+                calls.append((call["server_label"], call["name"]))
+    return calls
+
+def _record_tool_calls(config, steps):
+    """Count the tool calls of the run steps of a finished run for the agent's narrowing"""
+    _get_catalog(config.tool_catalog.path).record_run(config.agent_name, _step_tool_calls(steps))
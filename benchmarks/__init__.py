@@ -0,0 +1,6 @@
+"""
+Offline benchmarks for the AI Foundry Agent package.
+
+The benchmarks run against local stand-ins for the Azure AI Foundry agents service,
+so they need neither network access nor Azure credentials.
+"""
@@ -0,0 +1,61 @@
+"""
+Benchmark: control-plane calls per 1000 messages with Delete_Agent_After_Run, with and without the agent pool.
+
+Without a pool every message creates an agent and a thread and deletes both after the
+run. With Agent_Pool_Size the agents are created once and leased per message, only the
+thread of each message is created and deleted. Cleanup runs in the background, so the
+time per message only includes the calls made on the request path.
+
+Usage:
+    python -m benchmarks.bench_agent_pool [--messages 1000] [--pool-size 4] [--workers 4] [--call-latency 0.005]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+# Calls that manage agents and threads rather than run the conversation
+CONTROL_PLANE_CALLS = ("list_agents", "get_agent", "create_agent", "update_agent", "delete_agent",
+                       "threads.create", "threads.delete")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent pool benchmark")
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent conversations")
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    print(f"{'pool size':>9} {'messages':>8} {'agents':>7} {'threads':>8} {'ctl calls':>9} {'per 1000':>8} "
+          f"{'ms/msg':>7} {'agents left':>11}")
+    for pool_size in (0, args.pool_size):
+        configs = {AGENT_NAME: benchmark_config(AGENT_NAME, Delete_Agent_After_Run=True, Ignore_Existing_Agent=True,
+                                                Agent_Pool_Size=pool_size)}
+        restore = install_fake_backend(configs, call_latency=args.call_latency)
+        try:
+            session = agent._get_session(AGENT_NAME)
+            calls = session.agents_client.calls
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(lambda turn: session.invoke(f"question {turn}"), range(args.messages)))
+            elapsed = time.perf_counter() - start
+            # Closing the session waits for the background cleanup and deletes the pooled agents
+            agent.close_sessions()
+            control_plane = sum(calls[name] for name in CONTROL_PLANE_CALLS)
+            agents_left = len(session.agents_client._agents)
+        finally:
+            restore()
+        print(f"{pool_size:>9} {args.messages:>8} {calls['create_agent'] + calls['delete_agent']:>7} "
+              f"{calls['threads.create'] + calls['threads.delete']:>8} {control_plane:>9} "
+              f"{control_plane * 1000 / args.messages:>8.0f} {elapsed / args.messages * 1000 * args.workers:>7.2f} "
+              f"{agents_left:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: time spent deciding tool approvals with an approval callback.
+
+Runs wait for approvals of several MCP tool calls per step. A callback that takes
+--decision-latency seconds decides them, evaluated one at a time (Max_Workers 1) or
+concurrently. Turns that continue a conversation reuse the decisions remembered for
+their thread instead of asking the callback again.
+
+Usage:
+    python -m benchmarks.bench_approvals [--turns 20] [--tool-calls 4] [--decision-latency 0.05]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+_callback_calls = 0
+_callback_lock = threading.Lock()
+
+
+def _approval_callback(latency):
+    """Callback approving every tool call after a delay, like a policy service round trip"""
+    def approve(tool_call, config):
+        global _callback_calls
+        with _callback_lock:
+            _callback_calls += 1
+        time.sleep(latency)
+        return True
+    return approve
+
+
+def main():
+    global _callback_calls
+    parser = argparse.ArgumentParser(description="Tool approval benchmark")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--tool-calls", type=int, default=4, help="Tool calls to approve per approval step")
+    parser.add_argument("--approval-steps", type=int, default=2)
+    parser.add_argument("--decision-latency", type=float, default=0.05, help="Seconds the callback takes per call")
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'conversation':<12} {'callbacks':>9} {'policy ms/turn':>14} {'turn ms p50':>11}")
+    for workers in (1, args.tool_calls):
+        for conversation in (False, True):
+            _callback_calls = 0
+            configs = {AGENT_NAME: benchmark_config(
+                AGENT_NAME,
+                Approval_Mode="always",
+                Approval_Policy={"Callback": _approval_callback(args.decision_latency), "Max_Workers": workers},
+                Poll_Strategy={"Mode": "fixed", "Interval": 0.01},
+            )}
+            restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=0.03,
+                                           approval_steps=args.approval_steps, tool_calls_per_approval=args.tool_calls)
+            try:
+                session = agent._get_session(AGENT_NAME)
+                thread_id = None
+                policy_times, turn_times = [], []
+                for turn in range(args.turns):
+                    result = session.invoke(f"question {turn}", thread_id=thread_id if conversation else None)
+                    thread_id = result["thread_id"]
+                    policy_times.append(result["timings"].get("approval_policy", 0.0))
+                    turn_times.append(result["timings"]["total"])
+            finally:
+                restore()
+            print(f"{workers:>7} {'yes' if conversation else 'no':<12} {_callback_calls:>9} "
+                  f"{statistics.fmean(policy_times) * 1000:>14.1f} {statistics.median(turn_times) * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: concurrency scaling of invoke_agent_async versus invoke_agent on a thread pool.
+
+Runs N conversations at once against a fake service whose runs stay in progress for a
+fixed duration. The async path multiplexes all runs on one event loop, while the
+synchronous path is bounded by the number of worker threads.
+
+Usage:
+    python -m benchmarks.bench_async [--concurrency 1 10 100 1000] [--workers 32] [--run-duration 0.5]
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_foundry_agent import agent, aio
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+
+async def _run_async(count):
+    try:
+        await asyncio.gather(*(aio.invoke_agent_async(AGENT_NAME, f"question {i}") for i in range(count)))
+    finally:
+        await aio.close_sessions_async()
+
+
+def _run_threads(count, workers):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda i: agent.invoke_agent(AGENT_NAME, f"question {i}"), range(count)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="invoke_agent_async concurrency scaling benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--workers", type=int, default=32, help="Thread pool size for the synchronous path")
+    parser.add_argument("--run-duration", type=float, default=0.5, help="Simulated model run time (s)")
+    parser.add_argument("--call-latency", type=float, default=0.01, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    configs = {AGENT_NAME: benchmark_config(AGENT_NAME)}
+    print(f"{'concurrency':>11} {'async':>9} {'threads':>9}")
+    for count in args.concurrency:
+        timings = []
+        for scenario in (lambda: asyncio.run(_run_async(count)), lambda: _run_threads(count, args.workers)):
+            restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration)
+            try:
+                start = time.perf_counter()
+                scenario()
+                timings.append(time.perf_counter() - start)
+            finally:
+                restore()
+        print(f"{count:>11} {timings[0]:>8.2f}s {timings[1]:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: wall time of a prompt set run one at a time versus with invoke_agents_batch.
+
+The prompts are spread across several agents, each starting its own thread. The batch is
+also interrupted halfway and resumed from its checkpoint, which must only run the
+remaining prompts.
+
+Usage:
+    python -m benchmarks.bench_batch [--prompts 200] [--agents 4] [--max-concurrency 16] [--run-duration 0.05]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ai_foundry_agent import agent, invoke_agents_batch
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+
+def _requests(prompts, agents):
+    """Prompts round-robin across the agents"""
+    return [
+        {"id": f"prompt-{index}", "agent_name": f"batch-agent-{index % agents}", "message": f"question {index}"}
+        for index in range(prompts)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch invocation benchmark")
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--agents", type=int, default=4)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    parser.add_argument("--run-duration", type=float, default=0.05, help="Simulated run time (s)")
+    args = parser.parse_args()
+
+    # Poll often, so the measured time is dominated by the simulated runs
+    poll_strategy = {"Mode": "fixed", "Interval": 0.01}
+    configs = {
+        f"batch-agent-{index}": benchmark_config(f"batch-agent-{index}", Poll_Strategy=poll_strategy)
+        for index in range(args.agents)
+    }
+    requests = _requests(args.prompts, args.agents)
+    restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration)
+    try:
+        start = time.perf_counter()
+        for request in requests:
+            agent.invoke_agent(request["agent_name"], request["message"])
+        sequential = time.perf_counter() - start
+        print(f"{'one at a time':<16} prompts={args.prompts} total={sequential:.2f}s")
+
+        start = time.perf_counter()
+        results = list(invoke_agents_batch(requests, max_concurrency=args.max_concurrency))
+        batch = time.perf_counter() - start
+        errors = sum(1 for result in results if result["error"])
+        print(f"{'batch':<16} prompts={len(results)} total={batch:.2f}s errors={errors} speedup={sequential / batch:.1f}x")
+
+        checkpoint_path = os.path.join(tempfile.mkdtemp(prefix="ai_foundry_bench_batch_"), "results.jsonl")
+        interrupted = invoke_agents_batch(requests, max_concurrency=args.max_concurrency, checkpoint_path=checkpoint_path)
+        first = sum(1 for _, _ in zip(range(args.prompts // 2), interrupted))
+        interrupted.close()
+        resumed = sum(1 for _ in invoke_agents_batch(requests, args.max_concurrency, checkpoint_path))
+        with open(checkpoint_path, 'r', encoding='utf-8') as checkpoint_file:
+            checkpointed = {line for line in checkpoint_file}
+        print(f"{'resumed batch':<16} first_run={first} resumed_run={resumed} checkpointed={len(checkpointed)}")
+    finally:
+        restore()
+
+
+if __name__ == "__main__":
+    main()
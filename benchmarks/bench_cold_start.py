@@ -0,0 +1,71 @@
+"""
+Benchmark: cold start time of the Snowflake MCP server container.
+
+Starts a container from each image given with --image, and measures the time from
+`docker run` to the first 200 response of its health endpoint, then removes it. Compare
+an image built from the current Dockerfile with one that resolves the server with uvx at
+start, for example one built from the Dockerfile of an earlier commit:
+
+    git show <commit>:mcp_server/snowflake/Dockerfile > /tmp/Dockerfile.uvx
+    docker build -f /tmp/Dockerfile.uvx -t mcp-server-snowflake:uvx .
+    docker build -f mcp_server/snowflake/Dockerfile -t mcp-server-snowflake:prebuilt .
+
+Needs Docker and the Snowflake connection variables of deploy_mcp_aci.yaml in an
+--env-file, as the server connects to Snowflake when it starts.
+
+Usage:
+    python -m benchmarks.bench_cold_start --image mcp-server-snowflake:uvx --image mcp-server-snowflake:prebuilt \
+        --env-file snowflake.env [--runs 5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+
+
+def _healthy(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def cold_start(image, port, env_file=None, endpoint="/snowflake-mcp", timeout=300.0):
+    """Seconds from docker run until the health endpoint of the container answers with 200"""
+    command = ["docker", "run", "--detach", "--rm", "--publish", f"{port}:9000"]
+    if env_file:
+        command += ["--env-file", env_file]
+    start = time.perf_counter()
+    container = subprocess.run(command + [image], check=True, capture_output=True, text=True).stdout.strip()
+    try:
+        url = f"http://127.0.0.1:{port}{endpoint}/health"
+        while time.perf_counter() - start < timeout:
+            if _healthy(url):
+                return time.perf_counter() - start
+            time.sleep(0.1)
+        raise TimeoutError(f"{image} did not become healthy within {timeout:.0f}s")
+    finally:
+        subprocess.run(["docker", "rm", "--force", container], capture_output=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP server container cold start benchmark")
+    parser.add_argument("--image", action="append", required=True, help="Image to measure, can be repeated")
+    parser.add_argument("--env-file", help="Docker env file with the Snowflake connection variables")
+    parser.add_argument("--runs", type=int, default=5, help="Container starts per image")
+    parser.add_argument("--port", type=int, default=19000, help="Host port the container is published on")
+    parser.add_argument("--endpoint", default="/snowflake-mcp")
+    args = parser.parse_args()
+
+    print(f"{'image':<40} {'runs':>4} {'p50 s':>7} {'min s':>7} {'max s':>7}")
+    for image in args.image:
+        times = [cold_start(image, args.port, args.env_file, args.endpoint) for _ in range(args.runs)]
+        print(f"{image:<40} {len(times):>4} {statistics.median(times):>7.2f} {min(times):>7.2f} {max(times):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: agent configuration loading and hot reload.
+
+Writes agent_config.yaml and ai_foundry.env for two agents to a temporary directory and
+measures the time per configuration lookup, served from the registry, against parsing
+the files for every lookup. It then edits the files while both agents are in use and
+checks that
+- only the agent whose section changed gets a new configuration and session,
+- a file that fails to parse keeps the last good configurations and raises AgentConfigError,
+- an unknown agent name raises AgentConfigError instead of exiting the process.
+
+Exits with status 1 when a check fails.
+
+Usage:
+    python -m benchmarks.bench_config_reload [--lookups 10000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+from ai_foundry_agent import agent
+from ai_foundry_agent import config as config_module
+from benchmarks.fake_agents import FakeProjectClient, benchmark_config, install_fake_backend
+
+AGENT_NAMES = ("bench-reload-a", "bench-reload-b")
+
+# Registry state replaced for the temporary config files and restored afterwards
+_REGISTRY_STATE = ("CONFIG_DIR", "RELOAD_CHECK_INTERVAL", "_config_files", "_failed_versions", "_next_check")
+
+
+def _write_files(config_dir, sections, raw=None):
+    """Write agent_config.yaml, bumping its modification time so every write is a new version"""
+    path = os.path.join(config_dir, "agent_config.yaml")
+    with open(path, "w", encoding="utf-8") as config_file:
+        config_file.write(raw if raw is not None else yaml.safe_dump(sections))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _check(checks, name, passed):
+    checks.append((name, passed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent configuration loading and hot reload benchmark")
+    parser.add_argument("--lookups", type=int, default=10000, help="Configuration lookups to time")
+    args = parser.parse_args()
+
+    saved = {name: getattr(config_module, name) for name in _REGISTRY_STATE}
+    restore = install_fake_backend({})
+    checks = []
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            sections = {name: benchmark_config(name) for name in AGENT_NAMES}
+            _write_files(config_dir, sections)
+            with open(os.path.join(config_dir, "ai_foundry.env"), "w", encoding="utf-8") as env_file:
+                env_file.write("MODEL_DEPLOYMENT_NAME=gpt-4.1-mini\n"
+                               "PROJECT_ENDPOINT=https://localhost/api/projects/benchmark\n")
+            config_module.CONFIG_DIR = config_dir
+            config_module.RELOAD_CHECK_INTERVAL = 0.0
+            config_module._config_files = None
+            config_module._failed_versions = None
+            config_module._agent_config_sources.clear()
+
+            # Lookups served from the registry versus parsing the files every time
+            start = time.perf_counter()
+            for _ in range(args.lookups):
+                config_module._load_config(AGENT_NAMES[0])
+            cached = (time.perf_counter() - start) / args.lookups
+            parses = max(1, args.lookups // 100)
+            start = time.perf_counter()
+            for _ in range(parses):
+                config_module._build_config(AGENT_NAMES[0], config_module._read_config_files()[1])
+            parsed = (time.perf_counter() - start) / parses
+            print(f"{'lookup':<22} {'us/lookup':>10}")
+            print(f"{'registry':<22} {cached * 1e6:>10.1f}")
+            print(f"{'parse every lookup':<22} {parsed * 1e6:>10.1f}")
+
+            sessions = {name: agent._get_session(name) for name in AGENT_NAMES}
+            for name in AGENT_NAMES:
+                agent.invoke_agent(name, "question")
+            clients = FakeProjectClient.instances
+
+            # Change one agent's section, the other agent keeps its configuration and session
+            sections[AGENT_NAMES[1]]["Agent_Instruction"] = "Updated instructions"
+            _write_files(config_dir, sections)
+            for name in AGENT_NAMES:
+                agent.invoke_agent(name, "question")
+            _check(checks, "unchanged agent keeps its session", agent._get_session(AGENT_NAMES[0]) is sessions[AGENT_NAMES[0]])
+            _check(checks, "changed agent gets a new session", agent._get_session(AGENT_NAMES[1]) is not sessions[AGENT_NAMES[1]])
+            _check(checks, "changed agent uses the new section",
+                   agent._get_session(AGENT_NAMES[1]).config.agent_instructions == "Updated instructions")
+            _check(checks, "one project client rebuilt", FakeProjectClient.instances == clients + 1)
+
+            # A file that fails to parse keeps the last good configurations
+            current = {name: agent._get_session(name) for name in AGENT_NAMES}
+            _write_files(config_dir, sections, raw="bench-reload-a: [unclosed\n")
+            try:
+                config_module.reload_config()
+                _check(checks, "invalid file raises AgentConfigError", False)
+            except config_module.AgentConfigError:
+                _check(checks, "invalid file raises AgentConfigError", True)
+            results = [agent.invoke_agent(name, "question") for name in AGENT_NAMES]
+            _check(checks, "invalid file keeps the last good configurations",
+                   all(agent._get_session(name) is current[name] for name in AGENT_NAMES) and all(results))
+
+            try:
+                config_module._load_config("bench-reload-unknown")
+                _check(checks, "unknown agent raises AgentConfigError", False)
+            except config_module.AgentConfigError:
+                _check(checks, "unknown agent raises AgentConfigError", True)
+    finally:
+        restore()
+        for name, value in saved.items():
+            setattr(config_module, name, value)
+        config_module._agent_config_sources.clear()
+
+    print()
+    for name, passed in checks:
+        print(f"{'ok' if passed else 'FAILED':<7} {name}")
+    sys.exit(0 if all(passed for _, passed in checks) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: prompt tokens and latency per turn of a long conversation.
+
+Every run sends the whole thread to the model, so without a `Conversation` budget the
+prompt, and with it the run time, grows with each turn. With a budget, the session rolls
+the conversation over to a new thread seeded with its last turns or a summary once a run
+used more than --max-prompt-tokens. The fake service counts the thread's characters as
+prompt tokens and adds --token-latency seconds per prompt token to each run.
+
+Usage:
+    python -m benchmarks.bench_conversation [--turns 40] [--message-chars 800] [--max-prompt-tokens 2000]
+"""
+
+import argparse
+import statistics
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation context management benchmark")
+    parser.add_argument("--turns", type=int, default=40, help="Turns of the conversation")
+    parser.add_argument("--message-chars", type=int, default=800, help="Length of each user message")
+    parser.add_argument("--max-prompt-tokens", type=int, default=2000)
+    parser.add_argument("--keep-turns", type=int, default=2)
+    parser.add_argument("--token-latency", type=float, default=0.0002, help="Seconds a run takes per prompt token")
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    modes = {
+        "unbounded": None,
+        "last_turns": "last_turns",
+        "summary": "summary",
+    }
+    print(f"{'mode':<11} {'prompt tokens':>13} {'last 10 avg':>11} {'rollovers':>9} {'saved':>8} "
+          f"{'turn ms avg':>11} {'last 10 ms':>10}")
+    for mode, rollover in modes.items():
+        overrides = {"Poll_Strategy": {"Mode": "fixed", "Interval": 0.01}, "Response_Mode": "delta"}
+        if rollover:
+            overrides["Conversation"] = {"Enabled": True, "Max_Prompt_Tokens": args.max_prompt_tokens,
+                                         "Rollover": rollover, "Keep_Turns": args.keep_turns}
+        restore = install_fake_backend({AGENT_NAME: benchmark_config(AGENT_NAME, **overrides)},
+                                       call_latency=args.call_latency, run_duration=0.02,
+                                       token_latency=args.token_latency)
+        try:
+            session = agent._get_session(AGENT_NAME)
+            thread_id = None
+            prompt_tokens, turn_times = [], []
+            conversation = {}
+            for turn in range(args.turns):
+                message = f"turn {turn} " + "x" * args.message_chars
+                result = session.invoke(message, thread_id=thread_id)
+                thread_id = result["thread_id"]
+                prompt_tokens.append(result["usage"]["prompt_tokens"])
+                turn_times.append(result["timings"]["total"])
+                conversation = result.get("conversation") or {}
+        finally:
+            restore()
+        spent = sum(prompt_tokens) + conversation.get("rollover_tokens", 0)
+        print(f"{mode:<11} {spent:>13} {statistics.fmean(prompt_tokens[-10:]):>11.0f} "
+              f"{conversation.get('rollovers', 0):>9} {conversation.get('tokens_saved', 0):>8} "
+              f"{statistics.fmean(turn_times) * 1000:>11.1f} {statistics.fmean(turn_times[-10:]) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: per-turn cost of long conversations with full re-listing, incremental history and delta responses.
+
+A single thread is driven through many turns. For each response mode the number of
+messages fetched from the service and the time per turn are reported at several points
+of the conversation. Re-listing the whole thread grows linearly with the conversation,
+the incremental modes stay constant in transfer.
+
+Usage:
+    python -m benchmarks.bench_history [--turns 300] [--checkpoints 10 100 300]
+"""
+
+import argparse
+import time
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+
+def _conversation(session, turns, checkpoints, mode):
+    """Run the conversation and collect (turn, messages fetched, ms) at the checkpoints"""
+    samples = []
+    thread_id = None
+    calls = session.agents_client.calls
+    for turn in range(1, turns + 1):
+        if mode == "relist" and thread_id:
+            # Forget the cached history so the whole thread is listed, as before
+            session.history.discard(thread_id)
+        fetched = calls["messages.list.items"]
+        start = time.perf_counter()
+        result = session.invoke(f"question {turn}", thread_id=thread_id,
+                                response_mode="delta" if mode == "delta" else "full")
+        elapsed = time.perf_counter() - start
+        thread_id = result["thread_id"]
+        if turn in checkpoints:
+            samples.append((turn, calls["messages.list.items"] - fetched, elapsed * 1000))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation history fetching benchmark")
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[10, 100, 300])
+    args = parser.parse_args()
+
+    configs = {AGENT_NAME: benchmark_config(AGENT_NAME)}
+    print(f"{'mode':<12} {'turn':>5} {'fetched':>8} {'ms/turn':>8}")
+    for mode in ("relist", "incremental", "delta"):
+        restore = install_fake_backend(configs)
+        try:
+            samples = _conversation(agent._get_session(AGENT_NAME), args.turns, set(args.checkpoints), mode)
+        finally:
+            restore()
+        for turn, fetched, ms in samples:
+            print(f"{mode:<12} {turn:>5} {fetched:>8} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
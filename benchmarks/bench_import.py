@@ -0,0 +1,83 @@
+"""
+Benchmark: import time of the package, its configuration and the chat clients.
+
+Imports each module in a fresh interpreter with `python -X importtime` and takes the
+cumulative import time of the module from its report, the median of --runs runs. Importing
+the package, its configuration or the chat client must not load the Azure SDK, so these
+have a budget in milliseconds, while the agent module, which imports the SDK, is reported
+for comparison. Exits with status 1 when a module is over its budget; the suite runs the
+same check.
+
+Usage:
+    python -m benchmarks.bench_import [--runs 5] [--budget-scale 1.0]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules measured with their import budget in milliseconds, None for no budget
+IMPORT_BUDGETS = {
+    "ai_foundry_agent": 20,
+    "ai_foundry_agent.config": 150,
+    "ai_foundry_agent.batch": 50,
+    "mcp_client.client": 50,
+    "ai_foundry_agent.agent": None,
+}
+
+
+def import_time(module, runs=5):
+    """Median cumulative import time of the module in a fresh interpreter, in milliseconds"""
+    times = []
+    for _ in range(runs):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                   cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        for line in completed.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package, nested imports are indented
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module and not fields[2][1:].startswith(" "):
+                times.append(int(fields[1]) / 1000)
+                break
+        else:
+            raise RuntimeError(f"No import time reported for {module}")
+    return statistics.median(times)
+
+
+def check_import_budgets(runs=5, budget_scale=1.0):
+    """Import time and budget of each module, and the modules over their budget"""
+    results, over_budget = [], []
+    for module, budget in IMPORT_BUDGETS.items():
+        milliseconds = import_time(module, runs)
+        budget = budget * budget_scale if budget is not None else None
+        results.append({"module": module, "import_ms": milliseconds, "budget_ms": budget})
+        if budget is not None and milliseconds > budget:
+            over_budget.append(f"{module}: import {milliseconds:.1f} ms > budget {budget:.1f} ms")
+    return results, over_budget
+
+
+def print_import_times(results):
+    print(f"{'module':<26} {'import ms':>9} {'budget ms':>9}")
+    for result in results:
+        budget = f"{result['budget_ms']:.0f}" if result["budget_ms"] is not None else "-"
+        print(f"{result['module']:<26} {result['import_ms']:>9.1f} {budget:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiplier for the budgets, for slow machines")
+    args = parser.parse_args()
+
+    results, over_budget = check_import_budgets(args.runs, args.budget_scale)
+    print_import_times(results)
+    for message in over_budget:
+        print(f"OVER BUDGET {message}", file=sys.stderr)
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
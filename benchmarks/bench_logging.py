@@ -0,0 +1,92 @@
+"""
+Benchmark: cost of log lines on the request path, open-append-close per line versus the queued logger.
+
+The legacy writer opened the log file, appended one line and closed it again for every
+message, on the calling thread. The queued logger only enqueues a record on the calling
+thread and leaves formatting and file I/O to a background writer. For each writer the
+time spent by the callers and the total time until every line is on disk are reported,
+for a single caller and for several concurrent callers.
+
+Usage:
+    python -m benchmarks.bench_logging [--lines 100000] [--threads 1 8]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from ai_foundry_agent.config import AgentConfig
+from ai_foundry_agent.logger import _log_message, flush_logs
+from benchmarks.fake_agents import benchmark_config
+
+AGENT_NAME = "bench-agent"
+
+
+def _legacy_log_message(config, message):
+    """Open-append-close per line, as _log_message did before the queued logger"""
+    os.makedirs(os.path.dirname(config.log_path), exist_ok=True)
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    with open(config.log_path, 'a', encoding='utf-8') as log_file:
+        log_file.write(f"[{timestamp}] {message}\n")
+
+
+def _run(writer, config, lines, threads):
+    """Write the lines split across the threads, return (caller seconds, total seconds)"""
+    per_thread = lines // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def _caller(index):
+        barrier.wait()
+        for line in range(per_thread):
+            writer(config, f"Caller {index} wrote line {line} of the benchmark conversation")
+
+    workers = [threading.Thread(target=_caller, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    caller_time = time.perf_counter() - start
+    # Include the time for the background writer to drain its queue
+    flush_logs()
+    return caller_time, time.perf_counter() - start
+
+
+def _count_lines(log_dir):
+    count = 0
+    for file_name in os.listdir(log_dir):
+        with open(os.path.join(log_dir, file_name), 'r', encoding='utf-8') as log_file:
+            count += sum(1 for _ in log_file)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    print(f"{'writer':<8} {'threads':>7} {'lines':>8} {'caller s':>9} {'total s':>8} {'us/line':>8} {'written':>8}")
+    for threads in args.threads:
+        for name, writer in (("legacy", _legacy_log_message), ("queued", _log_message)):
+            log_dir = tempfile.mkdtemp(prefix="ai_foundry_bench_logging_")
+            # Large enough that the file is not rotated during the run
+            values = benchmark_config(AGENT_NAME, Log_Path=os.path.join(log_dir, "agent_logs.txt"),
+                                      Log_Max_Bytes=1024 ** 3)
+            config = AgentConfig(AGENT_NAME, values)
+            try:
+                caller_time, total_time = _run(writer, config, args.lines, threads)
+                written = _count_lines(log_dir)
+            finally:
+                shutil.rmtree(log_dir, ignore_errors=True)
+            lines = args.lines // threads * threads
+            print(f"{name:<8} {threads:>7} {lines:>8} {caller_time:>9.3f} {total_time:>8.3f} "
+                  f"{caller_time / lines * 1e6:>8.2f} {written:>8}")
+
+
+if __name__ == "__main__":
+    main()
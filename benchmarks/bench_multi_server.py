@@ -0,0 +1,80 @@
+"""
+Benchmark: one agent with several MCP servers versus one agent per server.
+
+A question needs data from both a Snowflake and a MongoDB MCP server, each a local MCP
+server stub with --tool-latency seconds per tool call. It is answered either by asking a
+Snowflake agent and a MongoDB agent one after the other, or by a single agent configured
+with both servers in `MCP_Servers`, whose run calls the tools of both servers in the
+same approval step, approved together and executed concurrently.
+
+Usage:
+    python -m benchmarks.bench_multi_server [--questions 20] [--tool-latency 0.1] [--run-duration 0.2]
+"""
+
+import argparse
+import statistics
+import time
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+from benchmarks.mcp_stub import MCPStubServer
+
+SNOWFLAKE_AGENT = "bench-snowflake"
+MONGODB_AGENT = "bench-mongodb"
+COMBINED_AGENT = "bench-snowflake-mongodb"
+
+
+def _server(label, url, token):
+    return {"Label": label, "URL": url, "Auth_Token": token, "Approval_Mode": "always"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi MCP server benchmark")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--tool-latency", type=float, default=0.1, help="Seconds an MCP tool call takes")
+    parser.add_argument("--run-duration", type=float, default=0.2, help="Simulated time a run takes (s)")
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    with MCPStubServer(tool_latency=args.tool_latency) as snowflake, \
+            MCPStubServer(tool_latency=args.tool_latency) as mongodb:
+        snowflake_server = _server("snowflake_cortex_mcp", snowflake.url, "snowflake-pat")
+        mongodb_server = _server("mongodb_atlas_mcp", mongodb.url, "mongodb-token")
+        poll_strategy = {"Mode": "fixed", "Interval": 0.01}
+        configs = {
+            SNOWFLAKE_AGENT: benchmark_config(SNOWFLAKE_AGENT, MCP_Servers=[snowflake_server], Poll_Strategy=poll_strategy),
+            MONGODB_AGENT: benchmark_config(MONGODB_AGENT, MCP_Servers=[mongodb_server], Poll_Strategy=poll_strategy),
+            COMBINED_AGENT: benchmark_config(COMBINED_AGENT, MCP_Servers=[snowflake_server, mongodb_server],
+                                             Poll_Strategy=poll_strategy),
+        }
+        urls = {"snowflake_cortex_mcp": snowflake.url, "mongodb_atlas_mcp": mongodb.url}
+        restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration,
+                                       approval_steps=1, mcp_url=urls)
+        try:
+            sessions = {name: agent._get_session(name) for name in configs}
+            results = {}
+            for mode, agent_names in (("sequential agents", (SNOWFLAKE_AGENT, MONGODB_AGENT)),
+                                      ("multi-server agent", (COMBINED_AGENT,))):
+                snowflake.calls.clear()
+                mongodb.calls.clear()
+                latencies = []
+                for question in range(args.questions):
+                    start = time.perf_counter()
+                    for agent_name in agent_names:
+                        sessions[agent_name].invoke(f"question {question}")
+                    latencies.append(time.perf_counter() - start)
+                results[mode] = (latencies, snowflake.calls["tools/call"], mongodb.calls["tools/call"])
+        finally:
+            restore()
+
+    print(f"{'mode':<20} {'p50 ms':>8} {'mean ms':>8} {'snowflake calls':>15} {'mongodb calls':>13}")
+    for mode, (latencies, snowflake_calls, mongodb_calls) in results.items():
+        print(f"{mode:<20} {statistics.median(latencies) * 1000:>8.1f} {statistics.fmean(latencies) * 1000:>8.1f} "
+              f"{snowflake_calls:>15} {mongodb_calls:>13}")
+    sequential = statistics.fmean(results["sequential agents"][0])
+    combined = statistics.fmean(results["multi-server agent"][0])
+    print(f"End-to-end time of the multi-server agent: {combined / sequential:.0%} of sequential agents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: run status polling strategies against a simulated run-state machine.
+
+For every run duration and poll strategy, a batch of runs is executed concurrently
+and the time-to-completion overhead (time past the simulated run duration) and the
+number of `runs.get` requests per run are reported.
+
+Usage:
+    python -m benchmarks.bench_polling [--durations 0.2 1 4] [--runs 20]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+STRATEGIES = {
+    # Agents without a Poll_Strategy section
+    "default": {},
+    "fixed-1s": {"Mode": "fixed", "Interval": 1.0},
+    "backoff": {"Mode": "backoff"},
+    "stream": {"Mode": "stream"},
+}
+
+
+def _timed_invoke(agent_name):
+    start = time.perf_counter()
+    agent.invoke_agent(agent_name, "Summarize last quarter's revenue")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run status polling strategy benchmark")
+    parser.add_argument("--durations", type=float, nargs="+", default=[0.2, 1.0, 4.0], help="Simulated run durations (s)")
+    parser.add_argument("--runs", type=int, default=20, help="Concurrent runs per duration and strategy")
+    parser.add_argument("--call-latency", type=float, default=0.02, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    print(f"{'strategy':<10} {'duration':>8} {'mean ttc':>9} {'overhead':>9} {'runs.get/run':>13}")
+    for duration in args.durations:
+        for strategy, settings in STRATEGIES.items():
+            configs = {strategy: benchmark_config(strategy, Poll_Strategy=settings)}
+            restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=duration)
+            try:
+                # Create the session and agent up front so only the run itself is timed
+                session = agent._get_session(strategy)
+                session._get_agent()
+                with ThreadPoolExecutor(max_workers=args.runs) as executor:
+                    timings = list(executor.map(_timed_invoke, [strategy] * args.runs))
+                polls = session.agents_client.calls["runs.get"] / args.runs
+            finally:
+                restore()
+            mean = statistics.mean(timings)
+            print(f"{strategy:<10} {duration:>7.1f}s {mean:>8.2f}s {mean - duration:>8.2f}s {polls:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: latency of repeated questions with and without the response cache.
+
+A prompt set where a few questions are asked many times, phrased with different case
+and whitespace, is run through a session without a cache, with the memory backend and
+with the sqlite backend. Hits skip the agent run and its tool calls, only creating the
+thread seeded with the cached answer. A follow-up question on the thread of a hit checks
+the conversation continues, and the hits and misses exported as metrics are checked
+against the results.
+
+Usage:
+    python -m benchmarks.bench_response_cache [--prompts 500] [--distinct 20] [--run-duration 0.05] [--call-latency 0.005]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from ai_foundry_agent import agent, metrics
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+
+def _prompts(count, distinct, seed=7):
+    """Repeated questions with case and whitespace variations"""
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(count):
+        question = f"What is the status of account {rng.randrange(distinct)}?"
+        if rng.random() < 0.5:
+            question = "  " + question.upper()
+        prompts.append(question)
+    return prompts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response cache benchmark")
+    parser.add_argument("--prompts", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=20, help="Number of distinct questions in the prompt set")
+    parser.add_argument("--run-duration", type=float, default=0.05, help="Simulated time a run takes (s)")
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    prompts = _prompts(args.prompts, args.distinct)
+    cache_dir = tempfile.mkdtemp(prefix="bench-response-cache-")
+    failures = []
+    print(f"{'cache':<7} {'prompts':>7} {'hits':>5} {'misses':>6} {'runs':>5} {'hit ms':>7} {'miss ms':>8} {'total s':>8}")
+    for backend in (None, "memory", "sqlite"):
+        overrides = {"Poll_Strategy": {"Mode": "fixed", "Interval": 0.01}}
+        if backend:
+            overrides["Response_Cache"] = {"Enabled": True, "TTL": 600, "Backend": backend,
+                                           "Path": os.path.join(cache_dir, "responses.sqlite")}
+        configs = {AGENT_NAME: benchmark_config(AGENT_NAME, **overrides)}
+        restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration)
+        metrics.reset_metrics()
+        try:
+            session = agent._get_session(AGENT_NAME)
+            hit_times, miss_times = [], []
+            hit = None
+            start = time.perf_counter()
+            for prompt in prompts:
+                turn_start = time.perf_counter()
+                result = session.invoke(prompt)
+                (hit_times if result["cached"] else miss_times).append(time.perf_counter() - turn_start)
+                if result["cached"]:
+                    hit = result
+            elapsed = time.perf_counter() - start
+            runs = session.agents_client.calls["runs.create"]
+            if hit is not None:
+                follow_up = session.invoke("And the one before?", thread_id=hit["thread_id"], response_mode="full")
+                if len(follow_up["response"]) < 4 or follow_up["thread_id"] != hit["thread_id"]:
+                    failures.append(f"{backend}: follow-up on a cached response did not continue its thread")
+            counted = {counter["labels"]["result"]: counter["value"] for counter in
+                       metrics.metrics_snapshot()["counters"].get("ai_foundry_agent_response_cache_total", ())}
+            if backend and counted != {"hit": len(hit_times), "miss": len(miss_times)}:
+                failures.append(f"{backend}: response cache metrics {counted} do not match the results")
+            agent.close_sessions()
+        finally:
+            restore()
+        hit_ms = statistics.median(hit_times) * 1000 if hit_times else 0.0
+        miss_ms = statistics.median(miss_times) * 1000 if miss_times else 0.0
+        print(f"{backend or 'none':<7} {len(prompts):>7} {len(hit_times):>5} {len(miss_times):>6} {runs:>5} "
+              f"{hit_ms:>7.3f} {miss_ms:>8.2f} {elapsed:>8.2f}")
+
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
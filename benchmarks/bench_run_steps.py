@@ -0,0 +1,47 @@
+"""
+Benchmark: per-turn cost of fetching and logging run steps for each Run_Steps setting.
+
+Before Run_Steps every turn listed the run's steps and logged them, which is what
+"always" still does. "failed" and "sample" only list them for unsuccessful runs and a
+sampled fraction of the rest, so the common path saves a service round trip.
+
+Usage:
+    python -m benchmarks.bench_run_steps [--turns 200] [--call-latency 0.005] [--sample-rate 0.01]
+"""
+
+import argparse
+import time
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run step introspection benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(f"{'run steps':<10} {'turns':>6} {'steps.list':>10} {'ms/turn':>8}")
+    for mode in ("always", "sample", "failed", "never"):
+        configs = {AGENT_NAME: benchmark_config(AGENT_NAME, Run_Steps=mode, Run_Steps_Sample_Rate=args.sample_rate)}
+        restore = install_fake_backend(configs, call_latency=args.call_latency)
+        try:
+            session = agent._get_session(AGENT_NAME)
+            thread_id = None
+            start = time.perf_counter()
+            for turn in range(args.turns):
+                result = session.invoke(f"question {turn}", thread_id=thread_id, response_mode="delta")
+                thread_id = result["thread_id"]
+            elapsed = time.perf_counter() - start
+            listed = session.agents_client.calls["run_steps.list"]
+        finally:
+            restore()
+        print(f"{mode:<10} {args.turns:>6} {listed:>10} {elapsed / args.turns * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
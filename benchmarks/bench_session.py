@@ -0,0 +1,56 @@
+"""
+Benchmark: per-turn overhead of invoke_agent with and without session reuse.
+
+Compares building a fresh client, MCP tool and agent for every turn (the behaviour
+before AgentSession existed) with the cached session used by invoke_agent.
+
+Usage:
+    python -m benchmarks.bench_session [--turns 50] [--setup-latency 0.2] [--call-latency 0.005]
+"""
+
+import argparse
+import time
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import FakeProjectClient, benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+
+def _per_turn_sessions(turns):
+    """Build and close a new session for every turn"""
+    for _ in range(turns):
+        with agent.AgentSession(AGENT_NAME) as session:
+            session.invoke("Tell me about the call with Securebank?")
+
+
+def _cached_session(turns):
+    """Reuse the session cached by invoke_agent"""
+    thread_id = None
+    for _ in range(turns):
+        result = agent.invoke_agent(AGENT_NAME, "Tell me about the call with Securebank?", thread_id=thread_id)
+        thread_id = result["thread_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentSession reuse benchmark")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--setup-latency", type=float, default=0.2, help="Simulated client and credential setup time (s)")
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    configs = {AGENT_NAME: benchmark_config(AGENT_NAME)}
+    for label, scenario in (("per-turn setup", _per_turn_sessions), ("cached session", _cached_session)):
+        restore = install_fake_backend(configs, args.setup_latency, args.call_latency)
+        try:
+            start = time.perf_counter()
+            scenario(args.turns)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<16} turns={args.turns} total={elapsed:.3f}s "
+                  f"per_turn={elapsed / args.turns * 1000:.1f}ms clients_built={FakeProjectClient.instances}")
+        finally:
+            restore()
+
+
+if __name__ == "__main__":
+    main()
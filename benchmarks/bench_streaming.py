@@ -0,0 +1,65 @@
+"""
+Benchmark: time to first token of invoke_agent versus stream_agent.
+
+invoke_agent returns once the run has completed and its messages were fetched, so the
+first text a user sees arrives after the whole run. stream_agent yields the assistant
+text as the service produces it. The fake service spreads the answer's text deltas
+evenly over the run duration.
+
+Usage:
+    python -m benchmarks.bench_streaming [--turns 10] [--run-duration 2.0] [--call-latency 0.02]
+"""
+
+import argparse
+import statistics
+import time
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+INSTRUCTIONS = "You are a benchmark agent that answers with a long, multi sentence response about the call."
+
+
+def _invoke(message):
+    """Seconds until the response is available, and until the call returned"""
+    start = time.perf_counter()
+    agent.invoke_agent(AGENT_NAME, message)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def _stream(message):
+    """Seconds until the first text delta, and until the stream ended"""
+    start = time.perf_counter()
+    first_token = None
+    for event in agent.stream_agent(AGENT_NAME, message):
+        if event["type"] == "text" and first_token is None:
+            first_token = time.perf_counter() - start
+    return first_token, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first token benchmark")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--run-duration", type=float, default=2.0, help="Simulated run time (s)")
+    parser.add_argument("--call-latency", type=float, default=0.02, help="Simulated service round trip time (s)")
+    args = parser.parse_args()
+
+    print(f"{'api':<14} {'poll strategy':<14} {'first token p50':>15} {'total p50':>10}")
+    for label, scenario, poll_mode in (("invoke_agent", _invoke, "backoff"), ("invoke_agent", _invoke, "stream"),
+                                       ("stream_agent", _stream, "stream")):
+        configs = {AGENT_NAME: benchmark_config(AGENT_NAME, Agent_Instruction=INSTRUCTIONS,
+                                                Poll_Strategy={"Mode": poll_mode})}
+        restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration)
+        try:
+            samples = [scenario(f"question {turn}") for turn in range(args.turns)]
+        finally:
+            restore()
+        first_token = statistics.median(sample[0] for sample in samples)
+        total = statistics.median(sample[1] for sample in samples)
+        print(f"{label:<14} {poll_mode:<14} {first_token * 1000:>13.0f}ms {total * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: per-phase latency breakdown of a turn and the overhead of timing the phases.
+
+Runs turns for each poll strategy and reports the mean seconds per phase from the
+`timings` dict of the results, then the p50/p95 from the in-memory histograms as
+rendered for Prometheus. Finally measures what timing a phase costs on its own.
+
+Usage:
+    python -m benchmarks.bench_timings [--turns 50] [--call-latency 0.005] [--run-duration 0.05]
+"""
+
+import argparse
+import statistics
+import time
+from types import SimpleNamespace
+
+from ai_foundry_agent import agent, metrics_snapshot, reset_metrics
+from ai_foundry_agent.metrics import _timed, _timed_turn
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+PHASES = ("agent_init", "create", "poll", "approvals", "steps", "messages", "total")
+
+
+def _quantile(histogram, quantile):
+    """Upper bound of the bucket holding the quantile"""
+    target = histogram["count"] * quantile
+    for bound, count in histogram["buckets"].items():
+        if count >= target:
+            return bound
+    return "+Inf"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn timings benchmark")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    parser.add_argument("--run-duration", type=float, default=0.05, help="Simulated time a run takes (s)")
+    args = parser.parse_args()
+
+    print(f"{'poll':<8} " + " ".join(f"{phase:>10}" for phase in PHASES))
+    for mode in ("fixed", "backoff", "stream"):
+        reset_metrics()
+        configs = {AGENT_NAME: benchmark_config(AGENT_NAME, Delete_Agent_After_Run=True, Run_Steps="always",
+                                                Poll_Strategy={"Mode": mode, "Interval": 0.05})}
+        restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration)
+        try:
+            session = agent._get_session(AGENT_NAME)
+            timings = [session.invoke(f"question {turn}")["timings"] for turn in range(args.turns)]
+            agent.close_sessions()
+        finally:
+            restore()
+        means = [statistics.fmean(turn.get(phase, 0.0) for turn in timings) for phase in PHASES]
+        print(f"{mode:<8} " + " ".join(f"{mean * 1000:>8.2f}ms" for mean in means))
+        for histogram in metrics_snapshot()["histograms"]["ai_foundry_agent_phase_seconds"]:
+            if histogram["labels"]["phase"] in ("poll", "agent_delete"):
+                print(f"{'':<8} {histogram['labels']['phase']} p50 <= {_quantile(histogram, 0.5)}s "
+                      f"p95 <= {_quantile(histogram, 0.95)}s ({histogram['count']} observations)")
+
+    # Cost of the instrumentation itself, per timed phase
+    config = SimpleNamespace(agent_name=AGENT_NAME)
+    iterations = 100_000
+    with _timed_turn(config):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with _timed(config, "poll"):
+                pass
+        elapsed = time.perf_counter() - start
+    print(f"\nTiming overhead: {elapsed / iterations * 1e6:.2f} us per phase")
+    reset_metrics()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: MCP tool catalog caching, Allowed_Tools validation and tool narrowing.
+
+The MCP server stub advertises bench_tool plus --extra-tools admin tools, and every run
+calls bench_tool once. The benchmark reports
+
+- tools/list fetches when --sessions sessions start at once, one per TTL with the
+  catalog instead of one per session,
+- that an Allowed_Tools name the server does not advertise fails creating a session,
+  while loading the configuration makes no tools/list call,
+- tools exposed, their estimated schema tokens and the tokens saved per run while the
+  tool calls of the first Min_Runs runs are counted and once the tools are narrowed to
+  bench_tool, with the run_steps.list calls counting them takes.
+
+Usage:
+    python -m benchmarks.bench_tool_catalog [--extra-tools 40] [--min-runs 20] [--turns 40]
+"""
+
+import argparse
+import sys
+import threading
+
+from ai_foundry_agent import agent, config as config_module, tool_catalog
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+from benchmarks.mcp_stub import MCPStubServer
+
+AGENT_NAME = "bench-agent"
+
+
+def _catalog_settings(**overrides):
+    settings = {"Enabled": True, "TTL": 3600, "Validate": True}
+    settings.update(overrides)
+    return settings
+
+
+def _concurrent_sessions(stub, sessions):
+    """tools/list fetches made by sessions starting at once"""
+    configs = {AGENT_NAME: benchmark_config(AGENT_NAME, MCP_Server_URL=stub.url, Tool_Catalog=_catalog_settings())}
+    restore = install_fake_backend(configs)
+    tool_catalog._catalogs.clear()
+    initialized = stub.calls["initialize"]
+    try:
+        barrier = threading.Barrier(sessions)
+
+        def start():
+            barrier.wait()
+            agent.AgentSession(AGENT_NAME).close()
+
+        threads = [threading.Thread(target=start) for _ in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        restore()
+    return stub.calls["initialize"] - initialized
+
+
+def _validation_fails(stub, allowed_tools):
+    """Whether creating a session with the Allowed_Tools fails, and the tools/list fetches loading its configuration made"""
+    sections = {AGENT_NAME: benchmark_config(AGENT_NAME, MCP_Server_URL=stub.url, Allowed_Tools=allowed_tools,
+                                             Tool_Catalog=_catalog_settings())}
+    tool_catalog._catalogs.clear()
+    initialized = stub.calls["initialize"]
+    config_module._build_config(AGENT_NAME, sections)
+    load_fetches = stub.calls["initialize"] - initialized
+    restore = install_fake_backend(sections)
+    tool_catalog._catalogs.clear()
+    try:
+        agent.AgentSession(AGENT_NAME).close()
+    except config_module.AgentConfigError:
+        return True, load_fetches
+    finally:
+        restore()
+    return False, load_fetches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP tool catalog benchmark")
+    parser.add_argument("--extra-tools", type=int, default=40, help="Admin tools the MCP stub advertises")
+    parser.add_argument("--sessions", type=int, default=16, help="Sessions started at once")
+    parser.add_argument("--min-runs", type=int, default=20, help="Runs counted before narrowing")
+    parser.add_argument("--turns", type=int, default=40)
+    args = parser.parse_args()
+
+    failures = []
+    with MCPStubServer(extra_tools=args.extra_tools) as stub:
+        fetches = _concurrent_sessions(stub, args.sessions)
+        print(f"{args.sessions} sessions started at once listed the tools {fetches} time(s)")
+        if fetches != 1:
+            failures.append(f"expected a single tools/list fetch, got {fetches}")
+
+        unknown_fails, load_fetches = _validation_fails(stub, ["bench_tool", "no_such_tool"])
+        known_fails, _ = _validation_fails(stub, ["bench_tool"])
+        print(f"Allowed_Tools with an unknown tool {'fails' if unknown_fails else 'does not fail'} the session, "
+              f"with known tools it {'fails' if known_fails else 'starts'}, "
+              f"loading the configuration listed the tools {load_fetches} time(s)")
+        if not unknown_fails or known_fails:
+            failures.append("Allowed_Tools validation")
+        if load_fetches:
+            failures.append(f"expected no tools/list fetch when loading the configuration, got {load_fetches}")
+
+        configs = {AGENT_NAME: benchmark_config(
+            AGENT_NAME, MCP_Server_URL=stub.url, Approval_Mode="always", Run_Steps="never",
+            Tool_Catalog=_catalog_settings(Auto_Narrow=True, Min_Runs=args.min_runs),
+        )}
+        restore = install_fake_backend(configs, approval_steps=1, mcp_url=stub.url)
+        tool_catalog._catalogs.clear()
+        try:
+            session = agent._get_session(AGENT_NAME)
+            phases = {}
+            for turn in range(args.turns):
+                listed = session.agents_client.calls["run_steps.list"]
+                stats = session.invoke(f"question {turn}")["tool_catalog"]
+                phase = phases.setdefault("narrowed" if stats["narrowed"] else "learning", {"turns": 0, "steps": 0})
+                phase.update(stats)
+                phase["turns"] += 1
+                phase["steps"] += session.agents_client.calls["run_steps.list"] - listed
+            service_agent = session.agents_client._agents[session.agent.id]
+            exposed_tools = service_agent.tools[0].get("allowed_tools")
+        finally:
+            restore()
+
+    print(f"\n{'phase':<9} {'turns':>5} {'advertised':>10} {'exposed':>7} {'schema tokens':>13} "
+          f"{'saved/run':>9} {'steps.list':>10}")
+    for phase, stats in phases.items():
+        print(f"{phase:<9} {stats['turns']:>5} {stats['advertised']:>10} {stats['exposed']:>7} "
+              f"{stats['schema_tokens']:>13} {stats['tokens_saved']:>9} {stats['steps']:>10}")
+    print(f"\nAgent tools after narrowing: {exposed_tools}")
+    if exposed_tools != ["bench_tool"]:
+        failures.append(f"expected the agent narrowed to bench_tool, got {exposed_tools}")
+
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
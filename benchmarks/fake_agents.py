@@ -0,0 +1,765 @@
+"""
+Local stand-in for the `project_client.agents` surface used by ai_foundry_agent.
+
+Only the operations called by the package are implemented. Every call sleeps for a
+configurable latency and is counted, so benchmarks can report both timings and the
+number of service round trips. Runs stay in progress for a configurable duration
+before they complete, like a real model turn.
+
+With `approval_steps` a run stops that many times in `requires_action` with
+`tool_calls_per_approval` MCP tool calls per MCP server of the run to approve, splitting
+the run duration evenly around them. Approved calls are executed concurrently against the
+MCP server stub at `mcp_url` (see mcp_stub.py), or the stub of their server label when
+`mcp_url` is a dict, and take `tool_latency` seconds without a stub. They show up in the
+run steps. Declined calls are skipped and the run continues, like the service does.
+
+Completed runs report token usage, with the whole thread counted as prompt tokens at
+about four characters per token. With `token_latency` each prompt token also adds to the
+run duration, so runs of long threads take longer like they do with a real model.
+
+The synchronous client requests a token from its credential on its first call, without
+a lock like the bearer token policy of azure-core, so a burst of first requests shows up
+in `FakeCredential.token_requests`. With `shared_service` all project clients share one
+service, so agents created by one session are seen by the others like on a real project.
+
+With `service_rate` the service accepts that many calls per second and answers the calls
+beyond it with 429 and a `Retry-After` header for the rest of the second, like a
+throttled project. With `failure_rate` that fraction of the reads and deletions fails
+with a 500, calls that create something are left to the retries of the SDK's pipeline.
+Rejected calls are counted as "throttled" and "failed" instead of as their operation.
+
+FakeAgentsClient serves the synchronous code in agent.py, FakeAsyncAgentsClient the
+asynchronous code in aio.py.
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import math
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from collections import Counter
+from functools import partial
+from types import SimpleNamespace
+from urllib import request as urllib_request
+
+from azure.core.async_paging import AsyncItemPaged, AsyncList
+from azure.core.exceptions import HttpResponseError
+from azure.core.paging import ItemPaged
+from azure.ai.agents.models import (
+    RequiredMcpToolCall,
+    RunCompletionUsage,
+    SubmitToolApprovalAction,
+    SubmitToolApprovalDetails,
+)
+
+# Log file used by the benchmark agent configurations
+BENCHMARK_LOG_PATH = os.path.join(tempfile.gettempdir(), "ai_foundry_benchmarks", "agent_logs.txt")
+
+# Operations that return a pageable result instead of a single object
+_LIST_OPERATIONS = {"list_agents", "messages.list", "run_steps.list"}
+
+# Calls that fail at the failure rate, those the client may repeat
+_FAILING_OPERATIONS = {"list_agents", "get_agent", "delete_agent", "threads.get", "threads.delete",
+                       "messages.list", "runs.get", "run_steps.list"}
+
+# Operations that execute approved MCP tool calls
+_TOOL_OPERATIONS = {"runs.submit_tool_outputs", "runs.submit_tool_outputs_stream"}
+
+# Scope of the tokens requested by the agents client
+_TOKEN_SCOPE = "https://ai.azure.com/.default"
+
+
+def _tokens(text):
+    """Token count of a text at about four characters per token"""
+    return len(text) // 4 + 1
+
+
+class _FakeErrorResponse:
+    """HTTP response of a rejected call, as carried by HttpResponseError"""
+
+    def __init__(self, status_code, reason, headers=None):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers or {}
+
+    def text(self):
+        return ""
+
+
+class FakeStep(dict):
+    """Run step that supports both item and attribute access like the SDK models"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError as e:
+            raise AttributeError(name) from e
+
+
+class _Operations:
+    """Operation group such as `threads` or `runs`, dispatching to the fake client"""
+
+    def __init__(self, client, group, names):
+        for name in names:
+            setattr(self, name, partial(client._dispatch, f"{group}.{name}"))
+
+
+class FakeAgentsClient:
+    """In-memory agents service with per-call latency, run durations and call counters"""
+
+    def __init__(self, call_latency=0.0, run_duration=0.0, approval_steps=0, tool_latency=0.0, mcp_url=None,
+                 tool_calls_per_approval=1, token_latency=0.0, service_rate=0, failure_rate=0.0, list_page_size=0):
+        self.call_latency = call_latency
+        self.list_page_size = list_page_size
+        self.service_rate = service_rate
+        self.failure_rate = failure_rate
+        self._window = 0
+        self._window_calls = 0
+        self.run_duration = run_duration
+        self.token_latency = token_latency
+        self.approval_steps = approval_steps
+        self.tool_calls_per_approval = tool_calls_per_approval
+        self.tool_latency = tool_latency
+        self.mcp_url = mcp_url
+        self.calls = Counter()
+        self.credential = None
+        self._token = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._agents = {}
+        self._threads = {}
+        self._messages = {}
+        self._run_messages = {}
+        self._runs = {}
+        self._handlers = {
+            "list_agents": self._list_agents,
+            "get_agent": self._get_agent,
+            "create_agent": self._create_agent,
+            "update_agent": self._update_agent,
+            "delete_agent": self._delete_agent,
+            "threads.create": self._create_thread,
+            "threads.get": self._get_thread,
+            "threads.delete": self._delete_thread,
+            "messages.create": self._create_message,
+            "messages.list": self._list_messages,
+            "runs.create": self._create_run,
+            "runs.get": self._get_run,
+            "runs.cancel": self._cancel_run,
+            "runs.submit_tool_outputs": self._submit_tool_outputs,
+            "runs.submit_tool_outputs_stream": self._submit_tool_outputs_stream,
+            "runs.stream": self._stream_run,
+            "run_steps.list": self._list_run_steps,
+        }
+        self.threads = _Operations(self, "threads", ("create", "get", "delete"))
+        self.messages = _Operations(self, "messages", ("create", "list"))
+        self.runs = _Operations(self, "runs", ("create", "get", "cancel", "submit_tool_outputs",
+                                               "submit_tool_outputs_stream", "stream"))
+        self.run_steps = _Operations(self, "run_steps", ("list",))
+
+    def list_agents(self, **kwargs):
+        return self._dispatch("list_agents", **kwargs)
+
+    def get_agent(self, agent_id, **kwargs):
+        return self._dispatch("get_agent", agent_id, **kwargs)
+
+    def create_agent(self, **kwargs):
+        return self._dispatch("create_agent", **kwargs)
+
+    def update_agent(self, agent_id, **kwargs):
+        return self._dispatch("update_agent", agent_id, **kwargs)
+
+    def delete_agent(self, agent_id, **kwargs):
+        return self._dispatch("delete_agent", agent_id, **kwargs)
+
+    def _count(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+
+    def _authorize(self):
+        """Request a token on the first call, unlocked like the bearer token policy of azure-core"""
+        if self._token is None and self.credential is not None:
+            self._token = self.credential.get_token_info(_TOKEN_SCOPE)
+
+    def _reject(self, operation):
+        """Raise the 429 or 500 of a call beyond the service rate or failing at the failure rate"""
+        if self.service_rate:
+            now = time.monotonic()
+            with self._lock:
+                window = int(now)
+                if window != self._window:
+                    self._window, self._window_calls = window, 0
+                self._window_calls += 1
+                throttled = self._window_calls > self.service_rate
+                if throttled:
+                    self.calls["throttled"] += 1
+            if throttled:
+                retry_after = window + 1 - now
+                raise HttpResponseError(response=_FakeErrorResponse(429, "Too Many Requests", {
+                    "Retry-After": str(math.ceil(retry_after)),
+                    "retry-after-ms": str(int(retry_after * 1000)),
+                }))
+        if self.failure_rate and operation in _FAILING_OPERATIONS and random.random() < self.failure_rate:
+            with self._lock:
+                self.calls["failed"] += 1
+            raise HttpResponseError(response=_FakeErrorResponse(500, "Internal Server Error"))
+
+    def _dispatch(self, operation, *args, **kwargs):
+        """Count the call and simulate the service round trip"""
+        if operation in _LIST_OPERATIONS:
+            # Like the SDK's ItemPaged, each page is requested when the iteration reaches it
+            return ItemPaged(partial(self._list_page, operation, args, kwargs), _page_items)
+        self._authorize()
+        if self.call_latency:
+            time.sleep(self.call_latency)
+        self._reject(operation)
+        self._count(operation)
+        return self._handlers[operation](*args, **kwargs)
+
+    def _list_page(self, operation, args, kwargs, continuation_token=None):
+        """Request a page of a listing, returns the continuation token of the next page and the items"""
+        self._authorize()
+        if self.call_latency:
+            time.sleep(self.call_latency)
+        self._reject(operation)
+        self._count(operation)
+        return self._page(operation, args, kwargs, continuation_token)
+
+    def _page(self, operation, args, kwargs, continuation_token):
+        items = self._handlers[operation](*args, **kwargs)
+        start = int(continuation_token or 0)
+        end = start + self.list_page_size if self.list_page_size else len(items)
+        page = items[start:end]
+        if operation == "messages.list":
+            # Count the messages transferred, not just the requests
+            with self._lock:
+                self.calls["messages.list.items"] += len(page)
+        return (str(end) if end < len(items) else None), page
+
+    def _new_id(self, prefix):
+        # Unique across processes, like service IDs, for fake services in several gateway workers
+        return f"{prefix}_{os.getpid()}_{next(self._ids)}"
+
+    # Agents
+
+    def _list_agents(self, **kwargs):
+        return list(self._agents.values())
+
+    def _get_agent(self, agent_id, **kwargs):
+        return self._agents[agent_id]
+
+    def _create_agent(self, model=None, name=None, description=None, instructions=None, tools=None, **kwargs):
+        agent = SimpleNamespace(id=self._new_id("asst"), name=name, model=model, description=description,
+                                instructions=instructions, tools=tools, metadata=kwargs.get("metadata") or {})
+        self._agents[agent.id] = agent
+        return agent
+
+    def _update_agent(self, agent_id, **kwargs):
+        agent = self._agents[agent_id]
+        for name, value in kwargs.items():
+            setattr(agent, name, value)
+        return agent
+
+    def _delete_agent(self, agent_id, **kwargs):
+        self._agents.pop(agent_id, None)
+
+    # Threads and messages
+
+    def _create_thread(self, messages=None, **kwargs):
+        thread = SimpleNamespace(id=self._new_id("thread"))
+        self._threads[thread.id] = thread
+        self._messages[thread.id] = []
+        self._run_messages[thread.id] = {}
+        for message in messages or ():
+            self._add_message(thread.id, message.role, message.content)
+        return thread
+
+    def _get_thread(self, thread_id, **kwargs):
+        return self._threads[thread_id]
+
+    def _delete_thread(self, thread_id, **kwargs):
+        self._threads.pop(thread_id, None)
+        self._messages.pop(thread_id, None)
+        self._run_messages.pop(thread_id, None)
+
+    def _create_message(self, thread_id, role, content, **kwargs):
+        return self._add_message(thread_id, role, content)
+
+    def _add_message(self, thread_id, role, content, run_id=None):
+        text = SimpleNamespace(text=SimpleNamespace(value=content))
+        message = SimpleNamespace(id=self._new_id("msg"), role=role, run_id=run_id, text_messages=[text])
+        self._messages[thread_id].append(message)
+        self._run_messages[thread_id].setdefault(run_id, []).append(message)
+        return message
+
+    def _list_messages(self, thread_id, order=None, run_id=None, limit=None, **kwargs):
+        messages = self._messages[thread_id] if run_id is None else self._run_messages[thread_id].get(run_id, [])
+        if limit is not None:
+            messages = messages[-limit:]
+        return list(messages)
+
+    # Runs
+
+    def _create_run(self, thread_id, agent_id, tool_resources=None, **kwargs):
+        now = time.monotonic()
+        prompt_tokens = sum(_tokens(message.text_messages[-1].text.value) for message in self._messages[thread_id])
+        run = SimpleNamespace(id=self._new_id("run"), thread_id=thread_id, agent_id=agent_id, status="queued",
+                              required_action=None, last_error=None, tool_resources=tool_resources,
+                              created=now, segment_start=now, approvals=0, tool_calls=[], approved_calls=[],
+                              prompt_tokens=prompt_tokens, usage=None)
+        self._runs[run.id] = run
+        self._advance(run)
+        return run
+
+    def _segment_duration(self, run):
+        """Time a run works between tool approvals, longer with more prompt tokens"""
+        return (self.run_duration + run.prompt_tokens * self.token_latency) / (self.approval_steps + 1)
+
+    def _advance(self, run):
+        """Move the run along its state machine based on the time since it was created or last approved"""
+        if run.status not in ("queued", "in_progress"):
+            return
+        if time.monotonic() - run.segment_start < self._segment_duration(run):
+            run.status = "in_progress"
+            return
+        if run.approvals < self.approval_steps:
+            self._require_approval(run)
+            return
+        run.status = "completed"
+        answer = self._answer(run)
+        self._add_message(run.thread_id, "assistant", answer, run_id=run.id)
+        run.usage = RunCompletionUsage(prompt_tokens=run.prompt_tokens, completion_tokens=_tokens(answer),
+                                       total_tokens=run.prompt_tokens + _tokens(answer))
+
+    def _require_approval(self, run):
+        """Stop the run with the MCP tool calls to approve, tool_calls_per_approval for each of its MCP servers"""
+        servers = (run.tool_resources or {}).get("mcp") or [{}]
+        tool_calls = [
+            RequiredMcpToolCall(
+                id=f"call_{run.id}_{run.approvals}_{server_index}_{index}",
+                name="bench_tool",
+                arguments=json.dumps({"step": run.approvals, "call": index}),
+                server_label=server.get("server_label"),
+            )
+            for server_index, server in enumerate(servers)
+            for index in range(self.tool_calls_per_approval)
+        ]
+        run.status = "requires_action"
+        run.required_action = SubmitToolApprovalAction(
+            submit_tool_approval=SubmitToolApprovalDetails(tool_calls=tool_calls)
+        )
+
+    def _answer(self, run):
+        """Echo what the service saw so callers can check which configuration reached it"""
+        agent = self._agents[run.agent_id]
+        server = (run.tool_resources or {}).get("mcp", [{}])[0]
+        return f"{agent.name}|{agent.instructions}|{server.get('server_label')}|{server.get('headers', {}).get('Authorization', '')}"
+
+    def _get_run(self, thread_id, run_id, **kwargs):
+        run = self._runs[run_id]
+        self._advance(run)
+        return run
+
+    def _cancel_run(self, thread_id, run_id, **kwargs):
+        self._runs[run_id].status = "cancelled"
+
+    def _submit_tool_outputs(self, thread_id, run_id, tool_approvals=None, **kwargs):
+        """Run the approved tool calls and resume the run, skipping declined calls"""
+        run = self._runs[run_id]
+        if run.status != "requires_action":
+            raise ValueError(f"Run {run_id} does not require action")
+        pending = {call.id: call for call in run.required_action.submit_tool_approval.tool_calls}
+        approvals = {approval.tool_call_id: approval for approval in tool_approvals or ()}
+        if set(approvals) != set(pending):
+            raise ValueError(f"Run {run_id} expects approvals for {sorted(pending)}, got {sorted(approvals)}")
+        with self._lock:
+            self.calls["tool_approvals.declined"] += sum(not approval.approve for approval in approvals.values())
+        approved = [call for call_id, call in pending.items() if approvals[call_id].approve]
+        if len(approved) > 1:
+            # The service calls the MCP servers of an approval step concurrently
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(approved)) as executor:
+                outputs = list(executor.map(lambda call: self._call_tool(call, approvals[call.id].headers), approved))
+        else:
+            outputs = [self._call_tool(call, approvals[call.id].headers) for call in approved]
+        run.approved_calls = [
+            {"id": call.id, "type": "mcp", "name": call.name, "arguments": call.arguments,
+             "output": output, "server_label": call.server_label}
+            for call, output in zip(approved, outputs)
+        ]
+        run.tool_calls.extend(run.approved_calls)
+        run.approvals += 1
+        run.required_action = None
+        run.status = "in_progress"
+        run.segment_start = time.monotonic()
+        return run
+
+    def _submit_tool_outputs_stream(self, thread_id, run_id, tool_approvals=None, event_handler=None, **kwargs):
+        """Approve like _submit_tool_outputs, the stream passed as event handler then continues with the run"""
+        self._submit_tool_outputs(thread_id, run_id, tool_approvals)
+
+    def _call_tool(self, call, headers=None):
+        """Execute the tool call on the MCP server stub of its server, or simulate its latency"""
+        url = self.mcp_url.get(call.server_label) if isinstance(self.mcp_url, dict) else self.mcp_url
+        if not url:
+            if self.tool_latency:
+                time.sleep(self.tool_latency)
+            return json.dumps({"result": f"{call.name} done"})
+        return call_mcp_tool(url, call.name, json.loads(call.arguments or "{}"), headers)
+
+    def _stream_run(self, thread_id, agent_id, tool_resources=None, **kwargs):
+        return _FakeRunStream(self, self._create_run(thread_id, agent_id, tool_resources))
+
+    def _list_run_steps(self, thread_id, run_id, **kwargs):
+        run = self._runs.get(run_id)
+        steps = [FakeStep(id=f"step_{run_id}_tool_{index}", status="completed",
+                          step_details={"type": "tool_calls", "tool_calls": [call]})
+                 for index, call in enumerate(run.tool_calls if run else ())]
+        return steps + [FakeStep(id=f"step_{run_id}", status="completed", step_details={})]
+
+
+def call_mcp_tool(url, name, arguments, headers=None):
+    """Call a tool over MCP streamable HTTP as the agents service does, returns the text output"""
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                       "params": {"name": name, "arguments": arguments}}).encode("utf-8")
+    http_request = urllib_request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "Accept": "application/json, text/event-stream",
+        **(headers or {}),
+    })
+    with urllib_request.urlopen(http_request, timeout=30) as response:
+        result = json.loads(response.read())
+    return "".join(item.get("text", "") for item in result["result"]["content"])
+
+
+class _FakeRunStream:
+    """
+    Run event stream, usable both as the sync and the async SDK stream.
+
+    Tool approvals are announced with a requires_action run event, the consumer approves
+    them through submit_tool_outputs_stream before reading on. The answer is then streamed
+    as text deltas spread evenly over the last part of the run, followed by the completed
+    message, run step and run events.
+    """
+
+    def __init__(self, client, run):
+        self._client = client
+        self._run = run
+
+    def _deltas(self):
+        """Split the answer into word-sized text deltas"""
+        answer = self._client._answer(self._run)
+        return [SimpleNamespace(text=part) for part in re.findall(r"\S+\s*|\s+", answer)]
+
+    def _delay(self, index, count):
+        """Seconds to wait before the delta at index so the last one arrives when the run completes"""
+        due = self._client._segment_duration(self._run) * (index + 1) / count
+        return max(0.0, due - (time.monotonic() - self._run.segment_start))
+
+    def _approval_events(self):
+        """Events of a requires_action stop, None once the run needs no more approvals"""
+        self._client._advance(self._run)
+        if self._run.status != "requires_action":
+            return None
+        return [("thread.run.requires_action", self._run, None)]
+
+    def _tool_step_events(self):
+        """Run steps of the tool calls executed after the last approval"""
+        if self._run.status != "in_progress":
+            return []
+        return [
+            ("thread.run.step.completed",
+             FakeStep(id=f"step_{self._run.id}_tool_{call['id']}", status="completed",
+                      step_details={"type": "tool_calls", "tool_calls": [call]}),
+             None)
+            for call in self._run.approved_calls
+        ]
+
+    def _finish(self):
+        self._client._advance(self._run)
+        message = self._client._run_messages[self._run.thread_id][self._run.id][-1]
+        step = FakeStep(id=f"step_{self._run.id}", status="completed", step_details={})
+        return [
+            ("thread.message.completed", message, None),
+            ("thread.run.step.completed", step, None),
+            (f"thread.run.{self._run.status}", self._run, None),
+            ("done", "[DONE]", None),
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def __iter__(self):
+        yield "thread.run.created", self._run, None
+        for _ in range(self._client.approval_steps):
+            time.sleep(self._delay(0, 1))
+            events = self._approval_events()
+            if events is None:
+                break
+            yield from events
+            if self._run.status != "in_progress":
+                # Declined or cancelled instead of approved
+                yield f"thread.run.{self._run.status}", self._run, None
+                return
+            yield from self._tool_step_events()
+        deltas = self._deltas()
+        for index, delta in enumerate(deltas):
+            time.sleep(self._delay(index, len(deltas)))
+            yield "thread.message.delta", delta, None
+        yield from self._finish()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def __aiter__(self):
+        yield "thread.run.created", self._run, None
+        for _ in range(self._client.approval_steps):
+            await asyncio.sleep(self._delay(0, 1))
+            events = self._approval_events()
+            if events is None:
+                break
+            for event in events:
+                yield event
+            if self._run.status != "in_progress":
+                # Declined or cancelled instead of approved
+                yield f"thread.run.{self._run.status}", self._run, None
+                return
+            for event in self._tool_step_events():
+                yield event
+        deltas = self._deltas()
+        for index, delta in enumerate(deltas):
+            await asyncio.sleep(self._delay(index, len(deltas)))
+            yield "thread.message.delta", delta, None
+        for event in self._finish():
+            yield event
+
+
+def _page_items(page):
+    """Continuation token and items of a fetched page, for ItemPaged"""
+    return page[0], iter(page[1])
+
+
+async def _async_page_items(page):
+    """Continuation token and items of a fetched page, for AsyncItemPaged"""
+    return page[0], AsyncList(page[1])
+
+
+class FakeAsyncAgentsClient(FakeAgentsClient):
+    """Asynchronous facade over the same in-memory service"""
+
+    def _dispatch(self, operation, *args, **kwargs):
+        if operation in _LIST_OPERATIONS:
+            return AsyncItemPaged(partial(self._list_page_async, operation, args, kwargs), _async_page_items)
+        return self._dispatch_async(operation, args, kwargs)
+
+    async def _list_page_async(self, operation, args, kwargs, continuation_token=None):
+        if self.call_latency:
+            await asyncio.sleep(self.call_latency)
+        self._reject(operation)
+        self._count(operation)
+        return self._page(operation, args, kwargs, continuation_token)
+
+    async def _dispatch_async(self, operation, args, kwargs):
+        if self.call_latency:
+            await asyncio.sleep(self.call_latency)
+        self._reject(operation)
+        self._count(operation)
+        if operation in _TOOL_OPERATIONS:
+            # Tool calls block on the MCP server, keep them off the event loop
+            return await asyncio.to_thread(self._handlers[operation], *args, **kwargs)
+        return self._handlers[operation](*args, **kwargs)
+
+
+class FakeProjectClient:
+    """
+    Stand-in for AIProjectClient.
+
+    `setup_latency` models the cost of building a client with a fresh credential
+    (token acquisition, TLS handshake) that the real client pays on first use.
+    """
+
+    setup_latency = 0.0
+    call_latency = 0.0
+    run_duration = 0.0
+    approval_steps = 0
+    tool_calls_per_approval = 1
+    tool_latency = 0.0
+    token_latency = 0.0
+    service_rate = 0
+    failure_rate = 0.0
+    list_page_size = 0
+    mcp_url = None
+    instances = 0
+    shared_service = False
+    agents_client_class = FakeAgentsClient
+    # Agents clients shared by all project clients of a class with shared_service
+    _services = {}
+    _services_lock = threading.Lock()
+
+    def __init__(self, endpoint=None, credential=None):
+        FakeProjectClient.instances += 1
+        if self.setup_latency:
+            time.sleep(self.setup_latency)
+        if self.shared_service:
+            with FakeProjectClient._services_lock:
+                if type(self) not in self._services:
+                    self._services[type(self)] = self._agents_client()
+                self.agents = self._services[type(self)]
+        else:
+            self.agents = self._agents_client()
+        self.agents.credential = credential
+
+    def _agents_client(self):
+        return self.agents_client_class(
+            call_latency=self.call_latency,
+            run_duration=self.run_duration,
+            approval_steps=self.approval_steps,
+            tool_calls_per_approval=self.tool_calls_per_approval,
+            tool_latency=self.tool_latency,
+            mcp_url=self.mcp_url,
+            token_latency=self.token_latency,
+            service_rate=self.service_rate,
+            failure_rate=self.failure_rate,
+            list_page_size=self.list_page_size,
+        )
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FakeAsyncProjectClient(FakeProjectClient):
+    """Stand-in for the async AIProjectClient"""
+
+    agents_client_class = FakeAsyncAgentsClient
+
+    async def close(self):
+        pass
+
+
+class FakeCredential:
+    """Stand-in for DefaultAzureCredential, whose token requests take `latency` seconds and are counted"""
+
+    latency = 0.0
+    token_requests = 0
+    _lock = threading.Lock()
+
+    def get_token_info(self, *scopes, options=None):
+        with FakeCredential._lock:
+            FakeCredential.token_requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(token="fake-token", expires_on=int(time.time()) + 3600, refresh_on=None)
+
+    def close(self):
+        pass
+
+
+class FakeAsyncCredential:
+    """Stand-in for the async DefaultAzureCredential"""
+
+    async def close(self):
+        pass
+
+
+def benchmark_config(agent_name, **overrides):
+    """Agent configuration used by the benchmarks, shaped like an agent_config.yaml entry"""
+    config = {
+        "Agent_Instruction": "You are a benchmark agent.",
+        "Agent_Description": "Benchmark agent",
+        "MCP_Server_Label": agent_name.replace("-", "_"),
+        "MCP_Server_URL": "http://localhost:9000/mcp",
+        "Allowed_Tools": [],
+        "Approval_Mode": "never",
+        "Logging": True,
+        "Log_Path": BENCHMARK_LOG_PATH,
+        "Delete_Agent_After_Run": False,
+        "Ignore_Existing_Agent": False,
+        # Limits far above what the fake service serves, so calls go through the limiter without being shaped by it
+        "Rate_Limit": {"Control_Rate": 100000, "Control_Burst": 100000, "Poll_Rate": 100000, "Poll_Burst": 100000},
+    }
+    config.update(overrides)
+    return config
+
+
+def install_fake_backend(agent_configs, setup_latency=0.0, call_latency=0.0, run_duration=0.0,
+                         approval_steps=0, tool_latency=0.0, mcp_url=None, tool_calls_per_approval=1,
+                         token_latency=0.0, credential_latency=0.0, shared_service=False, service_rate=0,
+                         failure_rate=0.0, list_page_size=0):
+    """
+    Point ai_foundry_agent at the fake project clients and in-memory agent configurations.
+
+    Runs stop approval_steps times for tool_calls_per_approval MCP tool call approvals per
+    MCP server, executed against the MCP server stub at mcp_url if given (a URL, or a dict
+    of URLs by server label) and taking tool_latency seconds otherwise. Each prompt token
+    adds token_latency seconds to a run. Token requests of the credential take
+    credential_latency seconds, and with shared_service all clients share one service.
+    Calls beyond service_rate per second are throttled with 429 and failure_rate of the
+    reads and deletions fail with 500. Listings return list_page_size items per page request, all at
+    once with 0.
+
+    Returns a callable that restores the original module attributes and configuration cache.
+    """
+    from ai_foundry_agent import agent as agent_module
+    from ai_foundry_agent import aio as aio_module
+    from ai_foundry_agent import config as config_module
+
+    patches = {
+        (agent_module, "AIProjectClient"): FakeProjectClient,
+        (agent_module, "DefaultAzureCredential"): FakeCredential,
+        (aio_module, "AIProjectClient"): FakeAsyncProjectClient,
+        (aio_module, "DefaultAzureCredential"): FakeAsyncCredential,
+    }
+    originals = {target: getattr(*target) for target in patches}
+    cached_configs = dict(config_module._agent_configs)
+
+    FakeProjectClient.setup_latency = setup_latency
+    FakeProjectClient.call_latency = call_latency
+    FakeProjectClient.run_duration = run_duration
+    FakeProjectClient.approval_steps = approval_steps
+    FakeProjectClient.tool_calls_per_approval = tool_calls_per_approval
+    FakeProjectClient.tool_latency = tool_latency
+    FakeProjectClient.mcp_url = mcp_url
+    FakeProjectClient.token_latency = token_latency
+    FakeProjectClient.instances = 0
+    FakeProjectClient.shared_service = shared_service
+    FakeProjectClient.service_rate = service_rate
+    FakeProjectClient.failure_rate = failure_rate
+    FakeProjectClient.list_page_size = list_page_size
+    FakeProjectClient._services.clear()
+    FakeCredential.latency = credential_latency
+    FakeCredential.token_requests = 0
+    for (module, name), value in patches.items():
+        setattr(module, name, value)
+    for name, values in agent_configs.items():
+        config_module._agent_configs[name] = config_module.AgentConfig(
+            name,
+            values,
+            model_deployment_name="gpt-4.1-mini",
+            project_endpoint="https://localhost/api/projects/benchmark",
+        )
+
+    def restore():
+        agent_module.close_sessions()
+        aio_module._sessions.clear()
+        for (module, name), value in originals.items():
+            setattr(module, name, value)
+        config_module._agent_configs.clear()
+        config_module._agent_configs.update(cached_configs)
+
+    return restore
@@ -0,0 +1,184 @@
+"""
+Load test: the HTTP gateway with one worker and with several workers behind the router.
+
+Starts `python -m ai_foundry_agent.gateway` for each --workers count, with the fake agents
+backend installed in every worker through --worker-init. Each worker has its own fake
+service, so a turn sent to a worker other than the one that created its thread fails,
+like a thread missing from a session's history. Then over HTTP:
+
+- --conversations conversations of --turns turns each on POST /agents/{name}/invoke,
+  all at once, checking every turn of a conversation was served by the same worker,
+- --conversations turns at once on POST /agents/{name}/stream, timing the first text
+  event and the end of the stream,
+- GET /metrics, checking the gateway counters of every worker are exported.
+
+Reports requests per second, latency, time to first token, errors and affinity breaks,
+and fails on any error or affinity break. Needs the gateway extra (uvicorn).
+
+Usage:
+    python -m benchmarks.load_gateway [--workers 1 4] [--conversations 32] [--turns 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+from benchmarks.suite import percentile
+
+AGENT_NAME = "bench-agent"
+
+
+def install_backend():
+    """Worker init hook: point the worker's agents at a fake service with the latencies of the environment"""
+    from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+    configs = {AGENT_NAME: benchmark_config(AGENT_NAME, Poll_Strategy={"Mode": "fixed", "Interval": 0.02})}
+    install_fake_backend(
+        configs,
+        call_latency=float(os.environ.get("BENCH_GATEWAY_CALL_LATENCY", "0.005")),
+        run_duration=float(os.environ.get("BENCH_GATEWAY_RUN_DURATION", "0.1")),
+    )
+
+
+async def _wait_healthy(client, base_url, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Gateway exited with code {process.returncode}")
+        try:
+            async with client.get(f"{base_url}/healthz") as response:
+                if response.status == 200 and (await response.json())["status"] == "ok":
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Gateway did not become healthy")
+
+
+async def _conversation(client, base_url, index, turns, latencies, errors):
+    """Turns of one conversation, returns the workers that served them"""
+    thread_id = None
+    workers = set()
+    for turn in range(turns):
+        request = {"message": f"conversation {index} question {turn}", "response_mode": "delta"}
+        if thread_id:
+            request["thread_id"] = thread_id
+        start = time.perf_counter()
+        async with client.post(f"{base_url}/agents/{AGENT_NAME}/invoke", json=request) as response:
+            body = await response.json()
+            if response.status != 200:
+                errors.append(f"{response.status}: {body.get('error')}")
+                return workers
+            workers.add(response.headers.get("X-Gateway-Worker"))
+            thread_id = body["thread_id"]
+        latencies.append(time.perf_counter() - start)
+    return workers
+
+
+async def _stream(client, base_url, index, first_tokens, latencies, errors):
+    """One streamed turn, timing the first text event and the whole stream"""
+    start = time.perf_counter()
+    first_token = None
+    result = None
+    async with client.post(f"{base_url}/agents/{AGENT_NAME}/stream", json={"message": f"stream {index}"}) as response:
+        if response.status != 200:
+            errors.append(f"stream {response.status}: {await response.text()}")
+            return
+        async for line in response.content:
+            line = line.decode("utf-8").strip()
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:])
+            if event["type"] == "text" and first_token is None:
+                first_token = time.perf_counter() - start
+            elif event["type"] == "error":
+                errors.append(f"stream error: {event.get('error')}")
+            elif event["type"] == "result":
+                result = event["result"]
+    if result is None:
+        errors.append("stream ended without a result")
+        return
+    first_tokens.append(first_token if first_token is not None else time.perf_counter() - start)
+    latencies.append(time.perf_counter() - start)
+
+
+async def _load(base_url, process, workers, conversations, turns):
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as client:
+        await _wait_healthy(client, base_url, process)
+
+        latencies, errors = [], []
+        start = time.perf_counter()
+        served_by = await asyncio.gather(*(
+            _conversation(client, base_url, index, turns, latencies, errors) for index in range(conversations)
+        ))
+        elapsed = time.perf_counter() - start
+        affinity_breaks = sum(len(served) > 1 for served in served_by)
+        spread = len(set().union(*served_by))
+
+        first_tokens, stream_latencies = [], []
+        await asyncio.gather(*(
+            _stream(client, base_url, index, first_tokens, stream_latencies, errors) for index in range(conversations)
+        ))
+
+        async with client.get(f"{base_url}/metrics") as response:
+            metrics = await response.text()
+        exported = {str(worker) for worker in range(workers)
+                    if f'worker="{worker}"' in metrics or workers == 1}
+        if "ai_foundry_agent_gateway_requests_total" not in metrics or len(exported) != workers:
+            errors.append(f"gateway metrics of workers {sorted(exported)} exported, expected {workers}")
+    return latencies, elapsed, affinity_breaks, spread, first_tokens, stream_latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gateway load test against a local fake agents backend")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Worker counts to test")
+    parser.add_argument("--conversations", type=int, default=32, help="Conversations, and streams, at once")
+    parser.add_argument("--turns", type=int, default=4, help="Turns per conversation")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    parser.add_argument("--run-duration", type=float, default=0.1, help="Simulated time a run takes (s)")
+    args = parser.parse_args()
+
+    env = {**os.environ, "BENCH_GATEWAY_CALL_LATENCY": str(args.call_latency),
+           "BENCH_GATEWAY_RUN_DURATION": str(args.run_duration)}
+    print(f"{'workers':>7} {'requests':>8} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'spread':>6} "
+          f"{'affinity breaks':>15} {'ttft p50 ms':>11} {'stream p95 ms':>13} {'errors':>6}")
+    failures = []
+    for workers in args.workers:
+        port = args.port + workers * 100
+        process = subprocess.Popen([
+            sys.executable, "-m", "ai_foundry_agent.gateway", "--port", str(port), "--workers", str(workers),
+            "--worker-init", "benchmarks.load_gateway:install_backend", "--agents", AGENT_NAME,
+            "--log-level", "warning",
+        ], env=env)
+        try:
+            latencies, elapsed, breaks, spread, first_tokens, stream_latencies, errors = asyncio.run(
+                _load(f"http://127.0.0.1:{port}", process, workers, args.conversations, args.turns)
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+        p50 = percentile(latencies, 0.50) * 1000 if latencies else float("nan")
+        p95 = percentile(latencies, 0.95) * 1000 if latencies else float("nan")
+        ttft = percentile(first_tokens, 0.50) * 1000 if first_tokens else float("nan")
+        stream_p95 = percentile(stream_latencies, 0.95) * 1000 if stream_latencies else float("nan")
+        print(f"{workers:>7} {len(latencies):>8} {len(latencies) / elapsed:>7.1f} {p50:>7.1f} {p95:>7.1f} "
+              f"{spread:>6} {breaks:>15} {ttft:>11.1f} {stream_p95:>13.1f} {len(errors):>6}")
+        for error in errors[:5]:
+            print(f"  {error}", file=sys.stderr)
+        if errors or breaks:
+            failures.append(f"{workers} workers: {len(errors)} errors, {breaks} affinity breaks")
+
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
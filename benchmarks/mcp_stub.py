@@ -0,0 +1,186 @@
+"""
+Local MCP server stub speaking the streamable HTTP transport.
+
+Serves a single `bench_tool` on POST /mcp, answering JSON-RPC requests with JSON
+responses: initialize, notifications/initialized, tools/list and tools/call. Tool calls
+take a configurable latency and are counted, so benchmarks with tool approvals include a
+real HTTP round trip to an MCP server without any network dependency.
+
+With --extra-tools the stub also advertises that many admin tools with large schemas,
+like the Atlas administration tools of the MongoDB MCP server, listed in pages of
+TOOLS_PAGE_SIZE tools.
+
+Usage:
+    python -m benchmarks.mcp_stub [--port 9000] [--tool-latency 0.05] [--extra-tools 40]
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROTOCOL_VERSION = "2025-03-26"
+
+BENCH_TOOL = {
+    "name": "bench_tool",
+    "description": "Benchmark tool that echoes its arguments",
+    "inputSchema": {"type": "object", "properties": {"step": {"type": "integer"}}},
+}
+
+# Tools per tools/list page
+TOOLS_PAGE_SIZE = 25
+
+
+def _admin_tool(index):
+    """Administration tool with a schema the size of a typical Atlas admin tool"""
+    properties = {
+        "projectId": {"type": "string", "description": "Atlas project ID, a 24 character hexadecimal string"},
+        "clusterName": {"type": "string", "description": "Name of the cluster the operation applies to"},
+        "region": {"type": "string", "description": "Cloud provider region, e.g. US_EAST_1 or WESTEUROPE"},
+        "tier": {"type": "string", "enum": ["M0", "M10", "M20", "M30", "M40", "M50"],
+                 "description": "Instance size of the cluster nodes"},
+        "tags": {"type": "array", "items": {"type": "object", "properties": {
+            "key": {"type": "string"}, "value": {"type": "string"}}}, "description": "Resource tags to apply"},
+    }
+    return {
+        "name": f"atlas_admin_{index:02d}",
+        "description": f"Atlas administration operation {index}: manages projects, clusters, database users, "
+                       f"network access lists and alerts of an Atlas organization",
+        "inputSchema": {"type": "object", "properties": properties, "required": ["projectId"]},
+    }
+
+
+class _MCPRequestHandler(BaseHTTPRequestHandler):
+    """JSON-RPC over HTTP POST, one request per call"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/mcp":
+            self._respond(404)
+            return
+        try:
+            message = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            self._respond(400, {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}})
+            return
+        self.server.count(message.get("method"))
+        if "id" not in message:
+            # Notifications are acknowledged without a body
+            self._respond(202)
+            return
+        result, headers = self._handle(message.get("method"), message.get("params") or {})
+        if result is None:
+            body = {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32601, "message": "Method not found"}}
+        else:
+            body = {"jsonrpc": "2.0", "id": message["id"], "result": result}
+        self._respond(200, body, headers)
+
+    def do_DELETE(self):
+        # Session termination
+        self._respond(200)
+
+    def _handle(self, method, params):
+        """Result and extra headers of a JSON-RPC request, None for unknown methods"""
+        if method == "initialize":
+            return {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": "bench-mcp-stub", "version": "1.0.0"},
+            }, {"Mcp-Session-Id": uuid.uuid4().hex}
+        if method == "tools/list":
+            tools = self.server.tools
+            start = int(params.get("cursor") or 0)
+            result = {"tools": tools[start:start + TOOLS_PAGE_SIZE]}
+            if start + TOOLS_PAGE_SIZE < len(tools):
+                result["nextCursor"] = str(start + TOOLS_PAGE_SIZE)
+            return result, {}
+        if method == "tools/call":
+            if self.server.tool_latency:
+                time.sleep(self.server.tool_latency)
+            text = json.dumps({"tool": params.get("name"), "arguments": params.get("arguments", {})})
+            return {"content": [{"type": "text", "text": text}], "isError": False}, {}
+        if method == "ping":
+            return {}, {}
+        return None, {}
+
+    def _respond(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MCPStubServer(ThreadingHTTPServer):
+    """MCP server stub on a local port, run in a background thread with start() and stop()"""
+
+    daemon_threads = True
+    # Concurrent scenarios open more connections at once than the default backlog of 5
+    request_queue_size = 128
+
+    def __init__(self, host="127.0.0.1", port=0, tool_latency=0.0, extra_tools=0):
+        super().__init__((host, port), _MCPRequestHandler)
+        self.tool_latency = tool_latency
+        self.tools = [BENCH_TOOL] + [_admin_tool(index) for index in range(extra_tools)]
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/mcp"
+
+    def count(self, method):
+        with self._lock:
+            self.calls[method] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="mcp-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local MCP streamable HTTP server stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Seconds a tool call takes")
+    parser.add_argument("--extra-tools", type=int, default=0, help="Admin tools advertised besides bench_tool")
+    args = parser.parse_args()
+
+    server = MCPStubServer(args.host, args.port, args.tool_latency, args.extra_tools)
+    print(f"MCP stub listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Stress test: concurrent invoke_agent calls for different agents must not share state.
+
+Every agent gets its own instructions, MCP server label and auth token. The fake
+service echoes what it received for each run, and every response is checked against
+the configuration of the agent that was invoked.
+
+Usage:
+    python -m benchmarks.stress_concurrency [--agents 8] [--invocations 2000] [--workers 32]
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+
+
+def _agent_configs(count):
+    """Distinct configurations, half of them deleting their agent after every run"""
+    configs = {}
+    for index in range(count):
+        name = f"stress-agent-{index}"
+        configs[name] = benchmark_config(
+            name,
+            Agent_Instruction=f"instructions-{index}",
+            MCP_Server_Label=f"server_{index}",
+            Auth_Token=f"token-{index}",
+            Delete_Agent_After_Run=index % 2 == 1,
+            Ignore_Existing_Agent=index % 2 == 1,
+        )
+    return configs
+
+
+def _invoke(agent_name):
+    result = agent.invoke_agent(agent_name, f"question for {agent_name}")
+    return agent_name, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent invoke_agent isolation stress test")
+    parser.add_argument("--agents", type=int, default=8)
+    parser.add_argument("--invocations", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--call-latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    configs = _agent_configs(args.agents)
+    names = list(configs)
+    restore = install_fake_backend(configs, call_latency=args.call_latency)
+    leaks = 0
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(_invoke, (names[i % len(names)] for i in range(args.invocations))))
+        elapsed = time.perf_counter() - start
+
+        for agent_name, result in results:
+            values = configs[agent_name]
+            expected = f"{agent_name}|{values['Agent_Instruction']}|{values['MCP_Server_Label']}|Bearer {values['Auth_Token']}"
+            answers = [msg["content"] for msg in result["response"] if msg["role"] == "ASSISTANT"]
+            if result["agent_name"] != agent_name or answers != [expected]:
+                leaks += 1
+                print(f"State leak for {agent_name}: {result}")
+    finally:
+        restore()
+
+    print(f"agents={args.agents} invocations={args.invocations} workers={args.workers} "
+          f"elapsed={elapsed:.2f}s throughput={args.invocations / elapsed:.0f}/s leaks={leaks}")
+    sys.exit(1 if leaks else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Stress test: a burst of turns against a throttled project must be queued, not failed.
+
+The fake service accepts --service-rate calls per second and answers the calls beyond
+it with 429 and a Retry-After header. --requests turns are started at once, on threads
+through `invoke_agent` or as tasks through `invoke_agent_async`:
+
+- unlimited: without a `Rate_Limit`, throttled calls fail their turn,
+- limited: control and poll rates that add up to less than the service rate, so the
+  excess is queued on the client and hardly any call is throttled,
+- over_limit: rates above the service rate, throttled calls wait out the Retry-After
+  with the bucket paused and are retried,
+- failures: the limited rates while 5% of the reads and deletions fail with a 500 and
+  are retried within the retry budget,
+- async: the limited rates through `invoke_agent_async`.
+
+Listings return --list-page-size items per page, so each page request of a listing goes
+through the limiter like any other call.
+
+Reports failed turns, throttled and failed calls, retries, the peak queue depth and the
+latency per turn, and fails when a scenario with a `Rate_Limit` failed a turn.
+
+Usage:
+    python -m benchmarks.stress_rate_limit [--requests 50] [--service-rate 100] [--list-page-size 1]
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_foundry_agent import agent, aio, metrics_snapshot, reset_metrics
+from ai_foundry_agent import rate_limit
+from benchmarks.fake_agents import FakeProjectClient, benchmark_config, install_fake_backend
+from benchmarks.suite import percentile
+
+AGENT_NAME = "bench-agent"
+
+
+def _sum_metric(snapshot, kind, name):
+    return sum(item["value"] for item in snapshot[kind].get(name, ()))
+
+
+class _QueueSampler:
+    """Sample the queue depth gauges in the background, keeping the peak"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _sum_metric(metrics_snapshot(), "gauges",
+                                                   "ai_foundry_agent_rate_limit_queue_depth"))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def _timed(invoke, index):
+    """Seconds the turn took, None when it failed"""
+    start = time.perf_counter()
+    try:
+        invoke(index)
+    except Exception:
+        return None
+    return time.perf_counter() - start
+
+
+def _burst_threads(requests):
+    invoke = lambda index: agent.invoke_agent(AGENT_NAME, f"question {index}")
+    with ThreadPoolExecutor(max_workers=requests) as executor:
+        return list(executor.map(lambda index: _timed(invoke, index), range(requests)))
+
+
+def _burst_tasks(requests):
+    async def timed(index):
+        start = time.perf_counter()
+        try:
+            await aio.invoke_agent_async(AGENT_NAME, f"question {index}")
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    async def burst():
+        try:
+            return await asyncio.gather(*(timed(index) for index in range(requests)))
+        finally:
+            await aio.close_sessions_async()
+
+    return asyncio.run(burst())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiting stress test against a throttled fake service")
+    parser.add_argument("--requests", type=int, default=50, help="Turns started at once per scenario")
+    parser.add_argument("--service-rate", type=int, default=100, help="Calls per second the fake service accepts")
+    parser.add_argument("--call-latency", type=float, default=0.01, help="Simulated service round trip time (s)")
+    parser.add_argument("--run-duration", type=float, default=0.2, help="Simulated time a run takes (s)")
+    parser.add_argument("--list-page-size", type=int, default=1, help="Items per page of the fake listings")
+    args = parser.parse_args()
+
+    # Control and poll rates below, and above, the rate the service accepts
+    limited = {"Control_Rate": args.service_rate * 0.3, "Control_Burst": 10,
+               "Poll_Rate": args.service_rate * 0.6, "Poll_Burst": 10}
+    over_limit = {"Control_Rate": args.service_rate * 3, "Control_Burst": args.service_rate,
+                  "Poll_Rate": args.service_rate * 3, "Poll_Burst": args.service_rate}
+    # Rate limit, failure rate, burst and whether failed turns are expected
+    scenarios = {
+        "unlimited": ({"Enabled": False}, 0.0, _burst_threads, True),
+        "limited": (limited, 0.0, _burst_threads, False),
+        "over_limit": (over_limit, 0.0, _burst_threads, False),
+        "failures": (limited, 0.05, _burst_threads, False),
+        "async": (limited, 0.0, _burst_tasks, False),
+    }
+
+    print(f"{'scenario':<11} {'turns':>5} {'failed':>6} {'429s':>5} {'500s':>5} {'retries':>7} {'peak queue':>10} "
+          f"{'p50 s':>6} {'p95 s':>6} {'elapsed s':>9}")
+    failures = []
+    for scenario, (settings, failure_rate, burst, may_fail) in scenarios.items():
+        configs = {AGENT_NAME: benchmark_config(AGENT_NAME, Rate_Limit=settings,
+                                                Poll_Strategy={"Mode": "fixed", "Interval": 0.05})}
+        restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration,
+                                       shared_service=True, service_rate=args.service_rate,
+                                       failure_rate=failure_rate, list_page_size=args.list_page_size)
+        rate_limit._rate_limiters.clear()
+        reset_metrics()
+        try:
+            with _QueueSampler() as sampler:
+                start = time.perf_counter()
+                latencies = burst(args.requests)
+                elapsed = time.perf_counter() - start
+            service = next(iter(FakeProjectClient._services.values()))
+            calls = dict(service.calls)
+        finally:
+            restore()
+        snapshot = metrics_snapshot()
+        completed = [latency for latency in latencies if latency is not None]
+        failed = len(latencies) - len(completed)
+        retries = _sum_metric(snapshot, "counters", "ai_foundry_agent_retries_total")
+        p50 = percentile(completed, 0.50) if completed else float("nan")
+        p95 = percentile(completed, 0.95) if completed else float("nan")
+        print(f"{scenario:<11} {len(latencies):>5} {failed:>6} {calls.get('throttled', 0):>5} "
+              f"{calls.get('failed', 0):>5} {retries:>7} {sampler.peak:>10} {p50:>6.2f} {p95:>6.2f} {elapsed:>9.2f}")
+        if failed and not may_fail:
+            failures.append(f"{scenario}: {failed} of {len(latencies)} turns failed")
+
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
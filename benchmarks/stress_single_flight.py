@@ -0,0 +1,102 @@
+"""
+Stress test: simultaneous first requests must share one agent creation and token request.
+
+--requests threads wait on a barrier and then send the first request of a fresh process
+at the same moment, with `Ignore_Existing_Agent` so that every agent initialization
+creates an agent:
+
+- invoke_agent: all requests for one agent through `invoke_agent`,
+- sessions: every request on its own `AgentSession` of the same agent, e.g. front ends
+  creating their own sessions, against one shared fake service,
+- agents: the requests spread over --agents agents through `invoke_agent`, whose
+  sessions are created in parallel rather than one after the other,
+- private_agents: all requests for one agent with `Delete_Agent_After_Run`, which
+  creates an agent per turn by design, but must share the first token request.
+
+Reports the create_agent calls, token requests and project clients created, and fails when a
+scenario created more agents than expected.
+
+Usage:
+    python -m benchmarks.stress_single_flight [--requests 100] [--agents 10] [--call-latency 0.05]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_foundry_agent import agent
+from benchmarks.fake_agents import FakeCredential, FakeProjectClient, benchmark_config, install_fake_backend
+
+AGENT_NAME = "bench-agent"
+
+
+def _burst(requests, invoke):
+    """Run invoke(index) on as many threads released at the same moment, returns the seconds until all finished"""
+    barrier = threading.Barrier(requests)
+
+    def first_request(index):
+        barrier.wait()
+        return invoke(index)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=requests) as executor:
+        list(executor.map(first_request, range(requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-flight agent initialization stress test")
+    parser.add_argument("--requests", type=int, default=100, help="Simultaneous first requests per scenario")
+    parser.add_argument("--agents", type=int, default=10, help="Agents the requests of the agents scenario spread over")
+    parser.add_argument("--call-latency", type=float, default=0.05, help="Simulated service round trip time (s)")
+    parser.add_argument("--setup-latency", type=float, default=0.2, help="Simulated time to build a project client (s)")
+    parser.add_argument("--credential-latency", type=float, default=0.2, help="Simulated time of a token request (s)")
+    args = parser.parse_args()
+
+    names = [f"{AGENT_NAME}-{index}" for index in range(args.agents)]
+    invoke_one = lambda index: agent.invoke_agent(AGENT_NAME, f"question {index}")
+    # Agent names, settings, request and the agents the scenario may create
+    scenarios = {
+        "invoke_agent": ([AGENT_NAME], {}, invoke_one, 1),
+        "sessions": ([AGENT_NAME], {}, None, 1),
+        "agents": (names, {}, lambda index: agent.invoke_agent(names[index % len(names)], f"question {index}"),
+                   len(names)),
+        "private_agents": ([AGENT_NAME], {"Delete_Agent_After_Run": True}, invoke_one, args.requests),
+    }
+
+    print(f"{'scenario':<14} {'requests':>8} {'agents':>6} {'create_agent':>12} {'token requests':>14} "
+          f"{'clients':>7} {'elapsed s':>9}")
+    failures = []
+    for scenario, (agent_names, settings, invoke, expected) in scenarios.items():
+        configs = {name: benchmark_config(name, Ignore_Existing_Agent=True, **settings) for name in agent_names}
+        restore = install_fake_backend(configs, setup_latency=args.setup_latency, call_latency=args.call_latency,
+                                       credential_latency=args.credential_latency, shared_service=True)
+        try:
+            if invoke is None:
+                sessions = [agent.AgentSession(AGENT_NAME) for _ in range(args.requests)]
+                invoke = lambda index: sessions[index].invoke(f"question {index}")
+            else:
+                sessions = []
+            elapsed = _burst(args.requests, invoke)
+            service = FakeProjectClient._services[FakeProjectClient]
+            created = service.calls["create_agent"]
+            token_requests = FakeCredential.token_requests
+            clients = FakeProjectClient.instances
+            for session in sessions:
+                session.close()
+        finally:
+            restore()
+        print(f"{scenario:<14} {args.requests:>8} {len(agent_names):>6} {created:>12} {token_requests:>14} "
+              f"{clients:>7} {elapsed:>9.2f}")
+        if created > expected:
+            failures.append(f"{scenario}: {created} agents created, expected at most {expected}")
+
+    for failure in failures:
+        print(f"FAILED {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
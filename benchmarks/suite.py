@@ -0,0 +1,218 @@
+"""
+Benchmark suite: latency percentiles, throughput and service calls of the invoke path.
+
+Runs single-turn, multi-turn, concurrent, async and batch scenarios against the fake
+agents service, with runs that stop for MCP tool approvals executed against the local
+MCP server stub. Every scenario reports p50/p95/p99 latency per turn, throughput and the
+agents service and MCP calls per turn, so regressions show up in numbers.
+
+Results can be saved with --json and compared with a previous run with --baseline, which
+exits with status 1 when a scenario's p95 latency or calls per turn grew beyond the
+--tolerance. The suite also checks the import time budgets of bench_import and exits
+with status 1 when the package, its configuration or the chat client imports too slowly.
+
+Usage:
+    python -m benchmarks.suite [--requests 200] [--concurrency 8] [--approval-steps 1] [--json results.json]
+    python -m benchmarks.suite --baseline results.json [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_foundry_agent import agent, aio, invoke_agents_batch
+from benchmarks.bench_import import check_import_budgets, print_import_times
+from benchmarks.fake_agents import benchmark_config, install_fake_backend
+from benchmarks.mcp_stub import MCPStubServer
+
+AGENT_NAME = "bench-agent"
+
+# Counters of the fake service that count items rather than calls
+_ITEM_COUNTERS = {"messages.list.items", "tool_approvals.declined"}
+
+
+def percentile(values, quantile):
+    """Nearest-rank percentile of the values"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(quantile * len(ordered)) - 1)]
+
+
+def _timed_invoke(session, message, thread_id=None):
+    start = time.perf_counter()
+    result = session.invoke(message, thread_id=thread_id)
+    return time.perf_counter() - start, result
+
+
+def single_turn(args):
+    """One turn per request, one after the other"""
+    session = agent._get_session(AGENT_NAME)
+    return [_timed_invoke(session, f"question {turn}")[0] for turn in range(args.requests)], session
+
+
+def multi_turn(args):
+    """Conversations of --turns turns, one after the other"""
+    session = agent._get_session(AGENT_NAME)
+    latencies = []
+    for conversation in range(max(1, args.requests // args.turns)):
+        thread_id = None
+        for turn in range(args.turns):
+            latency, result = _timed_invoke(session, f"conversation {conversation} turn {turn}", thread_id)
+            thread_id = result["thread_id"]
+            latencies.append(latency)
+    return latencies, session
+
+
+def concurrent(args):
+    """One turn per request, --concurrency at a time on a thread pool"""
+    session = agent._get_session(AGENT_NAME)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda turn: _timed_invoke(session, f"question {turn}"), range(args.requests)))
+    return [latency for latency, _ in results], session
+
+
+def async_concurrent(args):
+    """One turn per request, --concurrency at a time on an event loop"""
+    async def run():
+        session = aio._get_session(AGENT_NAME)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def timed(turn):
+            async with semaphore:
+                start = time.perf_counter()
+                await session.invoke(f"question {turn}")
+                return time.perf_counter() - start
+
+        latencies = await asyncio.gather(*(timed(turn) for turn in range(args.requests)))
+        calls = dict(session.agents_client.calls)
+        await aio.close_sessions_async()
+        return latencies, calls
+
+    latencies, calls = asyncio.run(run())
+    return latencies, calls
+
+
+def batch(args):
+    """invoke_agents_batch over the requests with --concurrency in flight"""
+    requests = ({"agent_name": AGENT_NAME, "message": f"question {turn}"} for turn in range(args.requests))
+    records = list(invoke_agents_batch(requests, max_concurrency=args.concurrency))
+    failed = [record for record in records if record["error"]]
+    if failed:
+        raise RuntimeError(f"{len(failed)} batch requests failed, first: {failed[0]['error']}")
+    return [record["elapsed"] for record in records], agent._get_session(AGENT_NAME)
+
+
+SCENARIOS = {
+    "single_turn": single_turn,
+    "multi_turn": multi_turn,
+    "concurrent": concurrent,
+    "async": async_concurrent,
+    "batch": batch,
+}
+
+
+def run_scenario(name, args, mcp_server):
+    """Run a scenario on a fresh fake backend, returns its summary"""
+    configs = {AGENT_NAME: benchmark_config(
+        AGENT_NAME,
+        Approval_Mode="always" if args.approval_steps else "never",
+        Poll_Strategy={"Mode": args.poll_strategy, "Interval": 0.02, "Initial_Interval": 0.02},
+    )}
+    restore = install_fake_backend(configs, call_latency=args.call_latency, run_duration=args.run_duration,
+                                   approval_steps=args.approval_steps, mcp_url=mcp_server.url)
+    mcp_server.calls.clear()
+    try:
+        start = time.perf_counter()
+        latencies, session = SCENARIOS[name](args)
+        elapsed = time.perf_counter() - start
+        calls = session if isinstance(session, dict) else dict(session.agents_client.calls)
+    finally:
+        restore()
+    service_calls = sum(count for operation, count in calls.items() if operation not in _ITEM_COUNTERS)
+    return {
+        "scenario": name,
+        "turns": len(latencies),
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "throughput": len(latencies) / elapsed,
+        "calls_per_turn": service_calls / len(latencies),
+        "mcp_calls_per_turn": mcp_server.calls["tools/call"] / len(latencies),
+        "calls": calls,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of p95 latency and calls per turn against the baseline results"""
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        for metric in ("p95_ms", "calls_per_turn"):
+            if before[metric] and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{result['scenario']}: {metric} {before[metric]:.2f} -> {result[metric]:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="Turns per scenario")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per conversation in multi_turn")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--call-latency", type=float, default=0.005, help="Simulated service round trip time (s)")
+    parser.add_argument("--run-duration", type=float, default=0.05, help="Simulated time a run takes (s)")
+    parser.add_argument("--approval-steps", type=int, default=1, help="Tool approvals per run")
+    parser.add_argument("--tool-latency", type=float, default=0.01, help="Seconds an MCP tool call takes")
+    parser.add_argument("--poll-strategy", default="fixed", choices=("fixed", "backoff", "stream"))
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare with the results of a previous --json run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative growth before a regression")
+    parser.add_argument("--import-runs", type=int, default=5, help="Fresh interpreters per module for the import budgets")
+    parser.add_argument("--import-budget-scale", type=float, default=1.0,
+                        help="Multiplier for the import budgets, 0 to skip the import check")
+    args = parser.parse_args()
+
+    results = []
+    with MCPStubServer(tool_latency=args.tool_latency) as mcp_server:
+        print(f"{'scenario':<12} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'turns/s':>8} "
+              f"{'calls/turn':>10} {'mcp/turn':>8}")
+        for name in args.scenarios:
+            result = run_scenario(name, args, mcp_server)
+            results.append(result)
+            print(f"{name:<12} {result['turns']:>6} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                  f"{result['p99_ms']:>8.1f} {result['throughput']:>8.1f} {result['calls_per_turn']:>10.2f} "
+                  f"{result['mcp_calls_per_turn']:>8.2f}")
+
+    import_times, over_budget = [], []
+    if args.import_budget_scale:
+        print()
+        import_times, over_budget = check_import_budgets(args.import_runs, args.import_budget_scale)
+        print_import_times(import_times)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as results_file:
+            json.dump({"settings": {key: value for key, value in vars(args).items() if key not in ("json", "baseline")},
+                       "results": results, "imports": import_times}, results_file, indent=2)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+    for message in over_budget:
+        print(f"OVER BUDGET {message}", file=sys.stderr)
+    if args.baseline or over_budget:
+        sys.exit(1 if regressions or over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
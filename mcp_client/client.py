@@ -16,8 +16,10 @@ from typing import Optional
 # Add the parent directory to the path to import ai_foundry_agent
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Only the package is imported here, invoke_agent and stream_agent load the Azure SDK on
+# the first message, so help and a mistyped agent name don't wait for it
 try:
-    from ai_foundry_agent import invoke_agent
+    import ai_foundry_agent
 except ImportError as e:
     print(f"❌ Error importing ai_foundry_agent: {e}")
     print("Make sure the ai_foundry_agent package is available")
@@ -30,6 +32,7 @@ class AIFoundryChat:
         self.agent_name = agent_name
         self.thread_id: Optional[str] = None
         self.message_count = 0
+        self.conversation: Optional[dict] = None
         
     def send_message(self, user_message: str) -> dict:
         """Send a message to the AI Foundry agent"""
@@ -37,12 +40,14 @@ class AIFoundryChat:
             # For the first message, we don't have a thread_id yet
             # For subsequent messages, we'll pass the existing thread_id to continue the conversation
             
-            result = invoke_agent(self.agent_name, user_message, thread_id=self.thread_id)
+            result = ai_foundry_agent.invoke_agent(self.agent_name, user_message, thread_id=self.thread_id, response_mode="delta")
             
             # Store the thread_id from the first response
             if self.thread_id is None:
                 self.thread_id = result.get('thread_id')
                 print(f"🔗 Started new conversation (Thread: {self.thread_id})")
+            else:
+                self.track_thread(result)
             
             self.message_count += 1
             return result
@@ -50,6 +55,51 @@ class AIFoundryChat:
         except Exception as e:
             return {"error": str(e)}
     
+    def stream_message(self, user_message: str) -> dict:
+        """Send a message to the AI Foundry agent and print the response as it streams in"""
+        result = {}
+        streamed_text = False
+        try:
+            for event in ai_foundry_agent.stream_agent(self.agent_name, user_message, thread_id=self.thread_id, response_mode="delta"):
+                event_type = event.get("type")
+                if event_type == "thread" and self.thread_id is None:
+                    self.thread_id = event.get("thread_id")
+                    print(f"🔗 Started new conversation (Thread: {self.thread_id})")
+                elif event_type == "tool_call" and event.get("status") == "completed":
+                    print(f"🔧 Used tool: {event.get('name')}")
+                elif event_type == "text":
+                    # Print the assistant text as it arrives
+                    if not streamed_text:
+                        print(f"\n🤖 Assistant:")
+                        streamed_text = True
+                    print(event.get("delta", ""), end="", flush=True)
+                elif event_type == "error":
+                    print(f"\n❌ Error: {event.get('message')}")
+                elif event_type == "result":
+                    result = event.get("result", {})
+        except Exception as e:
+            result = {"error": str(e)}
+
+        if streamed_text:
+            print()
+        elif result:
+            # Nothing was streamed, show the final response instead
+            self.display_response(result)
+        if "error" not in result:
+            self.track_thread(result)
+            self.message_count += 1
+        elif streamed_text:
+            print(f"❌ Error: {result['error']}")
+        return result
+
+    def track_thread(self, result: dict):
+        """Follow the conversation to a new thread when the agent rolled it over"""
+        self.conversation = result.get('conversation') or self.conversation
+        thread_id = result.get('thread_id')
+        if thread_id and thread_id != self.thread_id:
+            print(f"🔄 Conversation continued in a new thread (Thread: {thread_id})")
+            self.thread_id = thread_id
+
     def display_response(self, result: dict):
         """Display the agent's response in a formatted way"""
         if "error" in result:
@@ -104,12 +154,8 @@ class AIFoundryChat:
                     print("Please enter a message or type 'help' for commands.")
                     continue
                 
-                # Send message to agent
-                print("🔄 Thinking...")
-                result = self.send_message(user_input)
-                
-                # Display the response
-                self.display_response(result)
+                # Send message to agent and display the response as it streams in
+                self.stream_message(user_input)
                 
             except KeyboardInterrupt:
                 print("\n\n👋 Chat interrupted. Goodbye!")
@@ -136,6 +182,9 @@ class AIFoundryChat:
         print(f"  Agent: {self.agent_name}")
         print(f"  Thread ID: {self.thread_id or 'Not started'}")
         print(f"  Messages sent: {self.message_count}")
+        if self.conversation:
+            print(f"  Prompt tokens: {self.conversation['prompt_tokens']}")
+            print(f"  Rollovers: {self.conversation['rollovers']} (tokens saved: {self.conversation['tokens_saved']})")
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -190,6 +239,9 @@ def main():
         else:
             agent_name = get_agent_name_from_user()
         
+        # Validate the agent configuration before the chat starts
+        ai_foundry_agent.load_agent_config(agent_name)
+        
         # Create and start the chat interface
         chat = AIFoundryChat(agent_name)
         chat.start_chat()
@@ -6,23 +6,41 @@ Features:
 - Agent name input
 - Chat interface with conversation history
 - Real-time display of agent metadata (Agent ID, Thread ID, Message Count)
+
+Agent turns run on a thread pool shared by all users of the Streamlit process, with one
+AgentSession per agent, so the client and agent are created once and a run never blocks
+the script. The response is rendered by a fragment that refreshes on its own while the
+run is in progress, without rerunning the app. The fragment is only rendered while a run
+is in progress, so an idle chat is not refreshed.
 """
 
 import streamlit as st
 import sys
 import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 
 # Add the parent directory to the path to import ai_foundry_agent
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Only the package is imported here, the Azure SDK is loaded with the first message
 try:
-    from ai_foundry_agent import invoke_agent
+    import ai_foundry_agent
 except ImportError as e:
     st.error(f"❌ Error importing ai_foundry_agent: {e}")
     st.error("Make sure the ai_foundry_agent package is available")
     st.stop()
 
+# Agent turns in flight at once across all users of the process
+MAX_CONCURRENT_RUNS = int(os.getenv("AI_FOUNDRY_CHAT_MAX_RUNS", "32"))
+
+# Seconds between refreshes of the response of a run in progress
+RUN_REFRESH_INTERVAL = 0.25
+
+# Messages of the history rendered at first, more are shown on request
+HISTORY_PAGE_SIZE = 50
+
 # Page configuration
 st.set_page_config(
     page_title="AI Foundry Chat",
@@ -50,23 +68,118 @@ if "message_count" not in st.session_state:
 if "chat_started" not in st.session_state:
     st.session_state.chat_started = False
 
-def send_message_to_agent(agent_name: str, user_message: str, thread_id: Optional[str] = None) -> Dict:
-    """Send a message to the AI Foundry agent"""
+if "conversation" not in st.session_state:
+    st.session_state.conversation = {}
+
+if "run" not in st.session_state:
+    st.session_state.run = None
+
+if "history_size" not in st.session_state:
+    st.session_state.history_size = HISTORY_PAGE_SIZE
+
+@st.cache_resource
+def get_run_executor() -> ThreadPoolExecutor:
+    """Thread pool running the agent turns of all users of the process"""
+    return ThreadPoolExecutor(max_workers=MAX_CONCURRENT_RUNS, thread_name_prefix="chat-run")
+
+def get_agent_session(agent_name: str):
+    """AgentSession of the agent, shared by the users chatting with it and with invoke_agent"""
+    # The cache of invoke_agent replaces a session whose configuration changed and closes it once idle
+    from ai_foundry_agent.agent import _get_session
+    with st.spinner("Connecting to the agent..."):
+        return _get_session(agent_name)
+
+def reset_chat():
+    """Forget the conversation, a run still in progress finishes unseen"""
+    st.session_state.messages = []
+    st.session_state.agent_id = ""
+    st.session_state.thread_id = ""
+    st.session_state.message_count = 0
+    st.session_state.conversation = {}
+    st.session_state.chat_started = False
+    st.session_state.run = None
+    st.session_state.history_size = HISTORY_PAGE_SIZE
+
+def run_turn(session, user_message: str, thread_id: Optional[str], events: queue.Queue):
+    """Stream a turn on a worker thread, handing its events to the script through the queue"""
+    error = "The agent returned no result"
     try:
-        result = invoke_agent(agent_name, user_message, thread_id=thread_id)
-        return result
+        for event in session.stream(user_message, thread_id=thread_id, response_mode="delta"):
+            events.put(event)
+            if event.get("type") == "result":
+                return
     except Exception as e:
-        return {
-            "error": str(e),
-            "agent_name": agent_name,
-            "thread_id": thread_id,
-            "response": [
-                {
-                    "role": "ERROR",
-                    "content": f"Failed to send message: {str(e)}"
-                }
-            ]
-        }
+        error = str(e)
+    # Every turn ends with a result, so render_run stops refreshing
+    events.put({"type": "result", "result": {
+        "error": error,
+        "agent_name": session.agent_name,
+        "thread_id": thread_id,
+        "response": []
+    }})
+
+def start_run(agent_name: str, user_message: str):
+    """Submit the turn to the background executor, its response is rendered by render_run"""
+    try:
+        session = get_agent_session(agent_name)
+    except Exception as e:
+        error_msg = f"Error: {e}"
+        st.error(error_msg)
+        st.session_state.messages.append({"role": "ERROR", "content": error_msg})
+        return
+    events = queue.Queue()
+    st.session_state.run = {"events": events, "text": "", "tools": []}
+    thread_id = st.session_state.thread_id if st.session_state.thread_id else None
+    get_run_executor().submit(run_turn, session, user_message, thread_id, events)
+
+def finish_run(result: Dict):
+    """Update the session information and the history with the result of a turn"""
+    if "error" in result:
+        st.session_state.messages.append({"role": "ERROR", "content": f"Error: {result['error']}"})
+        return
+
+    # Update session information, the thread changes when the conversation rolled over
+    st.session_state.agent_id = result.get("agent_id", "")
+    st.session_state.thread_id = result.get("thread_id", "")
+    st.session_state.conversation = result.get("conversation") or {}
+    st.session_state.chat_started = True
+    for msg in result.get("response", []):
+        role = msg.get("role", "UNKNOWN")
+        if role.upper() in ("ASSISTANT", "ERROR"):
+            st.session_state.messages.append({"role": role.upper(), "content": msg.get("content", "")})
+    st.session_state.message_count += 1
+
+@st.fragment(run_every=RUN_REFRESH_INTERVAL)
+def render_run():
+    """Render the response of the run in progress, refreshed on its own until the run finishes and the app reruns"""
+    run = st.session_state.run
+    if run is None:
+        return
+    result = None
+    while True:
+        try:
+            event = run["events"].get_nowait()
+        except queue.Empty:
+            break
+        event_type = event.get("type")
+        if event_type == "text":
+            run["text"] += event.get("delta", "")
+        elif event_type == "tool_call" and event.get("status") == "completed":
+            run["tools"].append(event.get("name"))
+        elif event_type == "result":
+            result = event.get("result", {})
+
+    if result is None:
+        with st.chat_message("assistant"):
+            for name in run["tools"]:
+                st.caption(f"🔧 Used tool: {name}")
+            st.write(run["text"] or "Thinking...")
+        return
+
+    # Move the response to the history and rerun the app once to refresh the session info
+    st.session_state.run = None
+    finish_run(result)
+    st.rerun()
 
 def display_chat_message(role: str, content: str):
     """Display a chat message with appropriate styling"""
@@ -105,12 +218,8 @@ def main():
         if agent_name_input != st.session_state.agent_name:
             st.session_state.agent_name = agent_name_input
             # Reset chat if agent name changed
-            if st.session_state.chat_started:
-                st.session_state.messages = []
-                st.session_state.agent_id = ""
-                st.session_state.thread_id = ""
-                st.session_state.message_count = 0
-                st.session_state.chat_started = False
+            if st.session_state.chat_started or st.session_state.run:
+                reset_chat()
                 st.rerun()
         
         st.markdown("---")
@@ -136,16 +245,20 @@ def main():
         
         st.markdown("**Message Count:**")
         st.code(str(st.session_state.message_count))
+
+        # Context budget of the thread, for agents with a Conversation section
+        if st.session_state.conversation:
+            st.markdown("**Prompt Tokens:**")
+            st.code(str(st.session_state.conversation.get("prompt_tokens", 0)))
+            st.markdown("**Thread Rollovers:**")
+            st.code(f"{st.session_state.conversation.get('rollovers', 0)} "
+                    f"(tokens saved: {st.session_state.conversation.get('tokens_saved', 0)})")
         
         st.markdown("---")
         
         # Clear chat button
         if st.button("🗑️ Clear Chat", use_container_width=True):
-            st.session_state.messages = []
-            st.session_state.agent_id = ""
-            st.session_state.thread_id = ""
-            st.session_state.message_count = 0
-            st.session_state.chat_started = False
+            reset_chat()
             st.rerun()
         
         # Instructions
@@ -166,14 +279,30 @@ def main():
             st.warning("⚠️ Please enter an agent name in the sidebar to start chatting.")
             return
         
-        # Display chat history
-        for message in st.session_state.messages:
+        # Validate the agent configuration before the first message
+        try:
+            ai_foundry_agent.load_agent_config(st.session_state.agent_name)
+        except ai_foundry_agent.AgentConfigError as e:
+            st.error(f"❌ {e}")
+            return
+        
+        # Display the most recent messages of the history, earlier ones on request
+        messages = st.session_state.messages
+        hidden = len(messages) - st.session_state.history_size
+        if hidden > 0:
+            if st.button(f"Show earlier messages ({hidden} more)"):
+                st.session_state.history_size += HISTORY_PAGE_SIZE
+                st.rerun()
+            messages = messages[hidden:]
+        for message in messages:
             display_chat_message(message["role"], message["content"])
         
-        # Chat input
-        user_input = st.chat_input("Type your message here...")
+        # Chat input, one turn of the conversation at a time
+        user_input = st.chat_input("Type your message here...", disabled=st.session_state.run is not None)
         
-        if user_input:
+        if user_input and st.session_state.run is not None:
+            st.warning("⚠️ Please wait for the response to your previous message.")
+        elif user_input:
             # Add user message to chat history
             st.session_state.messages.append({"role": "USER", "content": user_input})
             
@@ -181,43 +310,12 @@ def main():
             with st.chat_message("user"):
                 st.write(user_input)
             
-            # Send message to agent
-            with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    result = send_message_to_agent(
-                        st.session_state.agent_name,
-                        user_input,
-                        thread_id=st.session_state.thread_id if st.session_state.thread_id else None
-                    )
-                
-                # Handle response
-                if "error" in result:
-                    error_msg = f"Error: {result['error']}"
-                    st.error(error_msg)
-                    st.session_state.messages.append({"role": "ERROR", "content": error_msg})
-                else:
-                    # Update session information
-                    st.session_state.agent_id = result.get("agent_id", "")
-                    st.session_state.thread_id = result.get("thread_id", "")
-                    st.session_state.chat_started = True
-                    
-                    # Process response messages
-                    for msg in result.get("response", []):
-                        role = msg.get("role", "UNKNOWN")
-                        content = msg.get("content", "")
-                        
-                        if role.upper() == "ASSISTANT":
-                            st.write(content)
-                            st.session_state.messages.append({"role": "ASSISTANT", "content": content})
-                        elif role.upper() == "ERROR":
-                            st.error(content)
-                            st.session_state.messages.append({"role": "ERROR", "content": content})
-                    
-                    # Update message count
-                    st.session_state.message_count += 1
-            
-            # Force rerun to update the sidebar info
-            st.rerun()
+            # Run the turn in the background, render_run shows the response as it streams in
+            start_run(st.session_state.agent_name, user_input)
+        
+        # Only scheduled while a run is in progress, the rerun after the run finished stops the refreshes
+        if st.session_state.run is not None:
+            render_run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file